@@ -0,0 +1,18 @@
+"""
+Shared-secret authentication for admin/diagnostics endpoints
+"""
+import hmac
+import os
+
+from fastapi import Header, HTTPException
+
+# Admin endpoints are refused entirely unless a token is configured
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+async def require_admin(x_admin_token: str = Header(None)):
+    """FastAPI dependency: reject requests without the configured X-Admin-Token"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN not set)")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
@@ -0,0 +1,206 @@
+"""
+Response compression middleware (gzip, optionally brotli)
+"""
+import os
+import zlib
+from typing import Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+COMPRESSION_ENCODINGS = os.getenv("COMPRESSION_ENCODINGS", "br,gzip")
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml")
+
+# Suffixes appended to a strong ETag when the representation is encoded,
+# so the compressed and identity bodies never share a validator.
+ETAG_ENCODING_SUFFIXES = {"gzip": "-gzip", "br": "-br"}
+
+
+class _GzipEncoder:
+    def __init__(self, level: int):
+        # wbits=31 -> gzip container instead of raw zlib
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+def available_encodings(configured: str = COMPRESSION_ENCODINGS) -> list:
+    """Return the configured encodings this interpreter can actually produce, in preference order"""
+    encodings = []
+    for name in (e.strip().lower() for e in configured.split(",")):
+        if name == "gzip" or (name == "br" and brotli is not None):
+            encodings.append(name)
+    return encodings
+
+
+def select_encoding(accept_encoding: str, encodings: Sequence[str]) -> Optional[str]:
+    """
+    Pick the server-preferred encoding the client accepts
+
+    Args:
+        accept_encoding: Raw Accept-Encoding header value
+        encodings: Server encodings in preference order
+
+    Returns:
+        Encoding name, or None if the response should not be compressed
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+
+    for name in encodings:
+        q = accepted.get(name, accepted.get("*", 0.0))
+        if q > 0:
+            return name
+    return None
+
+
+def strip_encoding_suffix(etag: str) -> str:
+    """Map an encoded-representation ETag back to the identity ETag"""
+    etag = etag.strip()
+    if etag.startswith("W/"):
+        etag = etag[2:]
+    for suffix in ETAG_ENCODING_SUFFIXES.values():
+        if etag.endswith(suffix + '"'):
+            return etag[: -len(suffix) - 1] + '"'
+    return etag
+
+
+def _tag_etag(headers: MutableHeaders, encoding: str):
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/") and etag.endswith('"'):
+        headers["ETag"] = etag[:-1] + ETAG_ENCODING_SUFFIXES[encoding] + '"'
+
+
+def _is_compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES) or "+json" in content_type or "+xml" in content_type
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that compresses responses with gzip or brotli
+
+    Bodies below ``minimum_size`` bytes, non-text content, 204/304 responses
+    and responses that already carry a Content-Encoding pass through untouched.
+    Streaming responses are compressed incrementally.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+        encodings: str = COMPRESSION_ENCODINGS,
+        gzip_level: int = COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = COMPRESSION_BROTLI_QUALITY,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings(encodings)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _make_encoder(self, encoding: str):
+        if encoding == "br":
+            return _BrotliEncoder(self.brotli_quality)
+        return _GzipEncoder(self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = select_encoding(request_headers.get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        encoder = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, encoder, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if encoder is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                if start_message["status"] == 304 and ETAG_ENCODING_SUFFIXES[encoding] in request_headers.get("if-none-match", ""):
+                    # The client revalidated the encoded representation it holds
+                    _tag_etag(headers, encoding)
+                if (
+                    start_message["status"] in (204, 304)
+                    or "content-encoding" in headers
+                    or not _is_compressible(headers.get("content-type", ""))
+                    or (not more_body and len(body) < self.minimum_size)
+                ):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                encoder = self._make_encoder(encoding)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                _tag_etag(headers, encoding)
+
+                data = encoder.compress(body)
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    data += encoder.flush()
+                    headers["Content-Length"] = str(len(data))
+                await send(start_message)
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            data = encoder.compress(body)
+            if not more_body:
+                data += encoder.flush()
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,81 @@
+"""
+Admin diagnostics controller (requires X-Admin-Token)
+"""
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from ..admin_auth import require_admin
+from ..rate_limit import rate_limiter
+from ..service.memory_diagnostics_service import memory_report, take_baseline, top_allocators
+from ..service.sampling_profiler_service import ProfilerBusyError, run_profile
+from ..service.shadow_evaluation_service import get_shadow_report, reset_shadow_stats
+
+router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/memory")
+async def memory():
+    """RSS, ONNX Runtime arena growth and per-operation peak allocations"""
+    return memory_report()
+
+
+@router.post("/memory/snapshot")
+async def memory_snapshot():
+    """Take a new tracemalloc baseline for /memory/top to diff against"""
+    try:
+        return take_baseline()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/memory/top")
+async def memory_top(
+    limit: int = Query(20, ge=1, le=200),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$")
+):
+    """Allocation sites that grew the most since the last snapshot"""
+    try:
+        return {"top": top_allocators(limit, group_by)}
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.post("/profile")
+async def profile(
+    seconds: float = Query(10.0, gt=0, description="Profile duration (capped by PROFILER_MAX_SECONDS)"),
+    interval_ms: float = Query(5.0, ge=1.0, description="Sampling interval"),
+    format: str = Query("collapsed", pattern="^(collapsed|speedscope)$")
+):
+    """
+    Sample every thread's Python stack for N seconds
+    
+    Returns:
+        Collapsed stacks as text (flamegraph.pl / speedscope) or speedscope JSON
+    """
+    try:
+        # Sample from a worker thread so the event loop keeps serving (and is profiled)
+        result, metadata = await asyncio.to_thread(run_profile, seconds, interval_ms, format)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if format == "speedscope":
+        return result
+    headers = {f"X-Profile-{key.replace('_', '-').title()}": str(value) for key, value in metadata.items()}
+    return PlainTextResponse(result, headers=headers)
+
+
+@router.get("/shadow")
+async def shadow_report():
+    """Top-1/top-5 agreement and latency of the shadow candidate model vs the primary"""
+    return get_shadow_report()
+
+
+@router.post("/shadow/reset")
+async def shadow_reset():
+    """Reset the shadow comparison statistics"""
+    return reset_shadow_stats()
+
+
+@router.get("/rate-limits")
+async def rate_limits():
+    """Allowed/throttled requests per budget, most throttled paths and bucket table occupancy"""
+    return rate_limiter.stats()
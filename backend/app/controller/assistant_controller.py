@@ -0,0 +1,58 @@
+"""
+Plant care assistant controller (cached Gemini proxy)
+"""
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+from ..admin_auth import require_admin
+from ..service import garden_stats_service
+from ..service.gemini_proxy_service import (
+    GEMINI_PREWARM_TOP, PROMPT_TEMPLATES, UpstreamError, ask, get_proxy_stats, prewarm, prewarm_genera
+)
+
+router = APIRouter(prefix="/api/assistant", tags=["assistant"])
+
+
+class CareQuestionDto(BaseModel):
+    plant: str = Field(..., max_length=200)
+    topic: str = "care"
+
+
+@router.post("/care")
+async def care_question(question: CareQuestionDto):
+    """
+    Answer a care question about a plant
+    
+    Args:
+        question: Plant name (common, scientific or genus) and topic
+        
+    Returns:
+        Genus, topic, answer text and whether it was served from cache
+        (400 unless the name contains a genus the model knows)
+    """
+    try:
+        return await ask(question.plant, question.topic)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UpstreamError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+
+@router.get("/topics")
+async def topics():
+    """List the supported question topics"""
+    return {"topics": list(PROMPT_TEMPLATES)}
+
+
+@router.get("/stats")
+async def stats():
+    """Cache hit rate, coalesced requests and upstream call counts"""
+    return get_proxy_stats()
+
+
+@router.post("/prewarm", dependencies=[Depends(require_admin)])
+async def prewarm_cache(top: Optional[int] = Query(None, ge=1, le=500, description="Number of genera (default GEMINI_PREWARM_TOP)")):
+    """Pre-warm the cache for the most tracked genera, or GEMINI_PREWARM_GENERA (requires X-Admin-Token)"""
+    top = top or GEMINI_PREWARM_TOP
+    popular = garden_stats_service.get_global_stats(top)["popular_genera"]
+    return await prewarm(prewarm_genera(top, [entry["genus"] for entry in popular]))
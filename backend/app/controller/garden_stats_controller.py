@@ -0,0 +1,82 @@
+"""
+Garden statistics controller: plant/watering events in, O(1) dashboard reads out
+"""
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field
+from ..service import garden_stats_service
+
+router = APIRouter(prefix="/api/garden", tags=["garden"])
+
+
+class GardenPlantDto(BaseModel):
+    genus: Optional[str] = None
+    location: Optional[str] = None
+    watering_interval_days: Optional[float] = Field(None, gt=0, le=garden_stats_service.MAX_INTERVAL_DAYS)
+    last_watered: Optional[datetime] = None
+
+
+class WateringDto(BaseModel):
+    watered_at: Optional[datetime] = None
+
+
+def _timestamp(value):
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+@router.put("/users/{user_id}/plants/{plant_id}")
+async def upsert_plant(user_id: str, plant_id: str, plant: GardenPlantDto):
+    """Add or update a plant (genus, location, schedule) in the aggregates"""
+    try:
+        return garden_stats_service.upsert_plant(
+            user_id, plant_id, plant.genus, plant.location,
+            plant.watering_interval_days, _timestamp(plant.last_watered)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete("/users/{user_id}/plants/{plant_id}")
+async def remove_plant(user_id: str, plant_id: str):
+    """Remove a plant from the aggregates"""
+    if not garden_stats_service.remove_plant(user_id, plant_id):
+        raise HTTPException(status_code=404, detail="Plant not tracked")
+    return {"message": f"Plant '{plant_id}' removed"}
+
+
+@router.post("/users/{user_id}/plants/{plant_id}/waterings")
+async def record_watering(user_id: str, plant_id: str, watering: Optional[WateringDto] = None):
+    """
+    Record a watering
+
+    Returns:
+        Hours late against the schedule, whether it counted as on time, and the next due time
+    """
+    try:
+        return garden_stats_service.record_watering(
+            user_id, plant_id, _timestamp(watering.watered_at if watering else None)
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Plant not tracked")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/users/{user_id}/stats")
+async def user_stats(user_id: str):
+    """On-time rate, lateness histogram, overdue plants per location and genera for one user"""
+    try:
+        return garden_stats_service.get_user_stats(user_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="No garden data for this user")
+
+
+@router.get("/stats")
+async def global_stats(top: int = Query(10, ge=1, le=100, description="Number of genera/locations to list")):
+    """Plant counts, most popular genera, overdue plants per location and adherence across all users"""
+    return garden_stats_service.get_global_stats(top)
@@ -0,0 +1,67 @@
+"""
+Photo store controller: upload, metadata and cacheable (range-capable) photo reads
+"""
+from fastapi import APIRouter, File, HTTPException, Path, Request, UploadFile
+from ..http_cache import immutable_response
+from ..service.photo_store_service import ORIGINAL, PhotoStoreFullError, get_photo_store
+
+router = APIRouter(prefix="/api/photos", tags=["photos"])
+
+PHOTO_ID = Path(..., pattern="^[0-9a-f]{64}$", description="SHA-256 of the uploaded bytes")
+
+
+def photo_urls(info):
+    """Add the original and thumbnail URLs to a photo info dict"""
+    base = f"/api/photos/{info['photo_id']}"
+    return dict(info, url=base, thumbnails={str(size): f"{base}/thumbnails/{size}" for size in info["thumbnail_sizes"]})
+
+
+@router.post("")
+async def upload_photo(file: UploadFile = File(...)):
+    """
+    Store a photo (deduplicated by content hash) and generate its thumbnails
+    
+    Returns:
+        Photo id, dimensions, original/thumbnail URLs and whether it was already stored
+    """
+    try:
+        return photo_urls(get_photo_store().ingest(await file.read()))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PhotoStoreFullError as e:
+        raise HTTPException(status_code=507, detail=str(e))
+
+
+@router.get("/stats")
+async def photo_stats():
+    """Stored photos, bytes in packs and deduplicated uploads"""
+    return get_photo_store().stats()
+
+
+@router.get("/{photo_id}/info")
+async def photo_info(photo_id: str = PHOTO_ID):
+    """Dimensions, content type and thumbnail sizes of a stored photo"""
+    info = get_photo_store().info(photo_id)
+    if info is None:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    return photo_urls(info)
+
+
+def _serve(request, photo_id, variant):
+    blob = get_photo_store().open_blob(photo_id, variant)
+    if blob is None:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    body, content_type = blob
+    return immutable_response(request, body, content_type, f'"{photo_id[:32]}-{variant}"')
+
+
+@router.api_route("/{photo_id}", methods=["GET", "HEAD"])
+async def get_photo(request: Request, photo_id: str = PHOTO_ID):
+    """Original upload bytes (supports Range and If-None-Match)"""
+    return _serve(request, photo_id, ORIGINAL)
+
+
+@router.api_route("/{photo_id}/thumbnails/{size}", methods=["GET", "HEAD"])
+async def get_thumbnail(request: Request, size: int, photo_id: str = PHOTO_ID):
+    """Square JPEG thumbnail generated at upload (sizes from PHOTO_THUMBNAIL_SIZES)"""
+    return _serve(request, photo_id, str(size))
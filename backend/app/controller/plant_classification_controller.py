@@ -1,41 +1,246 @@
 """
 Plant classification controller
 """
-from fastapi import APIRouter, UploadFile, File, HTTPException
+import asyncio
+import time
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Request, Query, WebSocket, WebSocketDisconnect
 from fastapi.responses import JSONResponse
-from ..service.plant_classification_service import classify_plant, get_model_info, initialize_model
+from ..admin_auth import require_admin
+from ..http_cache import model_info_cache
+from ..service.plant_classification_service import (
+    classify_image, get_model_info, initialize_model, get_cascade_stats, decode_image, extract_embedding
+)
+from ..service.embedding_service import encode_embedding, get_vector_index
+from ..service.multi_plant_service import classify_regions
+from ..service.photo_store_service import PhotoStoreFullError, check_upload, get_photo_store
+from .photo_controller import photo_urls
+from ..service.live_classification_service import (
+    LIVE_MAX_FRAME_BYTES, LIVE_TOP_K, open_stream, close_stream, get_live_stats
+)
 
 router = APIRouter(prefix="/api/classify", tags=["classification"])
 
 
 @router.post("/plant")
-async def classify_plant_image(file: UploadFile = File(...)):
+async def classify_plant_image(
+    file: UploadFile = File(...),
+    mode: str = Query("single", pattern="^(single|multi)$", description="single, or multi for several plants per photo"),
+    store: bool = Query(False, description="Also keep the photo in the photo store and return its URLs")
+):
     """
     Classify a plant from an uploaded image
     
     Args:
         file: Image file (JPEG, PNG, etc.)
+        mode: "multi" returns one prediction per detected plant region with its bounding box
+        store: Store the photo (thumbnails are made from the same decoded image)
         
     Returns:
-        Classification results with top predictions
+        Classification results with top predictions; with store, "photo" holds the
+        photo URLs, or an "error" if the store is full (the classification is kept)
     """
     try:
         # Read image bytes
         image_bytes = await file.read()
+        if store:
+            # Refuse a photo the store would reject before paying for inference
+            check_upload(image_bytes)
+        img = decode_image(image_bytes)
         
         # Classify
-        result = classify_plant(image_bytes)
+        if mode == "multi":
+            result = classify_regions(img)
+        else:
+            result = classify_image(img)
+        
+        if store:
+            try:
+                result["photo"] = photo_urls(get_photo_store().ingest(image_bytes, img))
+            except PhotoStoreFullError as e:
+                result["photo"] = {"error": str(e)}
         
         return JSONResponse(content=result)
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/embedding")
+async def image_embedding(
+    file: UploadFile = File(...),
+    format: str = Query("float16", description="float32, float16 or pq")
+):
+    """
+    Return a compact, L2-normalized embedding of an uploaded image
+    
+    Args:
+        file: Image file (JPEG, PNG, etc.)
+        format: Encoding of the returned vector
+        
+    Returns:
+        Base64-encoded embedding with its dtype and dimension
+    """
+    try:
+        image_bytes = await file.read()
+        vector = extract_embedding(decode_image(image_bytes))
+        return encode_embedding(vector, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/embedding/index", dependencies=[Depends(require_admin)])
+async def index_image(file: UploadFile = File(...), key: str = Query(..., description="Photo or plant identifier")):
+    """Add an uploaded image's embedding to the similarity index (admin only: the index is persistent)"""
+    try:
+        image_bytes = await file.read()
+        vector = extract_embedding(decode_image(image_bytes))
+        index = get_vector_index()
+        index.add([key], vector)
+        return {"key": key, "index_size": len(index)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/similar")
+async def similar_images(
+    file: UploadFile = File(...),
+    k: int = Query(10, ge=1, le=100)
+):
+    """
+    Find the most similar indexed photos to an uploaded image
+    
+    Returns:
+        Top-k keys with cosine similarity scores
+    """
+    try:
+        image_bytes = await file.read()
+        vector = extract_embedding(decode_image(image_bytes))
+        index = get_vector_index()
+        matches = index.search(vector, k)[0]
+        return {
+            "results": [{"key": match_key, "score": score} for match_key, score in matches],
+            "index_size": len(index)
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.websocket("/live")
+async def live_classification(websocket: WebSocket, top_k: int = LIVE_TOP_K, stats_every: float = 2.0):
+    """
+    Classify a stream of camera frames, always processing only the newest one
+    
+    Clients send downscaled JPEG/PNG frames as binary messages. The server pushes
+    {"type": "prediction", ...} when the top genus or its confidence changes (a change
+    held back by the update interval is sent when the interval ends) and
+    {"type": "stats", ...} every `stats_every` seconds. Each classified frame costs
+    an inference rate-limit token; while the bucket is empty frames are skipped and
+    {"type": "throttled", "retry_after": s} is sent once per wait.
+    """
+    await websocket.accept()
+    try:
+        stream = open_stream(client=f"{websocket.client.host}:{websocket.client.port}" if websocket.client else None,
+                             top_k=max(1, min(top_k, 10)))
+    except RuntimeError as e:
+        await websocket.close(code=1011, reason=str(e))
+        return
+
+    async def receive_frames():
+        while True:
+            frame = await websocket.receive_bytes()
+            if len(frame) > LIVE_MAX_FRAME_BYTES:
+                stream.errors += 1
+                continue
+            stream.offer(frame)
+
+    # Set by RateLimitMiddleware unless rate limiting is disabled
+    charge = getattr(websocket.state, "rate_limit_charge", None)
+    throttled_until = 0.0
+    receiver = asyncio.create_task(receive_frames())
+    next_frame = None
+    last_stats = time.perf_counter()
+    try:
+        while not receiver.done():
+            if next_frame is None:
+                next_frame = asyncio.create_task(stream.next_frame())
+            timeout = stats_every
+            flush_delay = stream.flush_delay()
+            if flush_delay is not None:
+                timeout = min(timeout, flush_delay)
+            await asyncio.wait({receiver, next_frame}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if receiver.done():
+                break
+
+            if next_frame.done():
+                frame, next_frame = next_frame.result(), None
+                decision = charge() if charge is not None else None
+                if decision is not None and not decision.allowed:
+                    stream.throttled += 1
+                    if time.perf_counter() >= throttled_until:
+                        throttled_until = time.perf_counter() + decision.retry_after
+                        await websocket.send_json({"type": "throttled", "retry_after": decision.retry_after})
+                else:
+                    try:
+                        result = await asyncio.to_thread(stream.classify, frame)
+                    except ValueError as e:
+                        stream.errors += 1
+                        await websocket.send_json({"type": "error", "detail": str(e)})
+                    else:
+                        if stream.should_send(result):
+                            await websocket.send_json({"type": "prediction", "frame": stream.processed, **result})
+
+            due = stream.take_due_update()
+            if due is not None:
+                frame_number, result = due
+                await websocket.send_json({"type": "prediction", "frame": frame_number, **result})
+
+            if time.perf_counter() - last_stats >= stats_every:
+                await websocket.send_json({"type": "stats", **stream.stats()})
+                last_stats = time.perf_counter()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        if next_frame is not None:
+            next_frame.cancel()
+        # Wait for the receiver to finish and read its outcome so a failure is reported, not lost
+        await asyncio.wait({receiver})
+        if not receiver.cancelled():
+            error = receiver.exception()
+            if error is not None and not isinstance(error, WebSocketDisconnect):
+                print(f"[LiveClassification] Stream {stream.id} receiver failed: {error!r}")
+        close_stream(stream)
+        print(f"[LiveClassification] Stream {stream.id} closed: {stream.processed} processed, {stream.dropped} dropped")
+
+
+@router.get("/live/stats")
+async def live_stats():
+    """Get frame rate and dropped-frame counts for open live classification streams"""
+    return get_live_stats()
+
+
 @router.get("/model-info")
-async def model_info():
+async def model_info(request: Request):
     """Get information about the loaded model"""
-    return get_model_info()
+    info = get_model_info()
+    if info.get("status") != "ready":
+        # Don't let clients cache the pre-initialization placeholder
+        return info
+    return model_info_cache.respond(request, "model-info", lambda: info)
+
+
+@router.get("/cascade-stats")
+async def cascade_stats():
+    """Get cascade escalation rate and per-tier latency"""
+    return get_cascade_stats()
 
 
 @router.post("/initialize")
@@ -43,6 +248,7 @@ async def initialize():
     """Initialize the model (called on startup)"""
     try:
         initialize_model()
+        model_info_cache.invalidate()
         return {"status": "success", "message": "Model initialized"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,38 +1,40 @@
-from fastapi import APIRouter, Query, Depends, HTTPException
+from fastapi import APIRouter, Query, Depends, HTTPException, Request
 from typing import List
 from sqlalchemy.orm import Session
 from app.database import get_db
+from app.http_cache import catalog_cache
 from app.models import PlantData
-from app.service.plant_data_service import PlantDataService
-from app.repository.plant_data_repository import PlantDataRepository
+from app.service.plant_data_service import PlantDataService, plant_data_service
 
 class PlantDataController:
     def __init__(self, service: PlantDataService = None):
+        self.service = service or plant_data_service
         self.router = APIRouter(prefix="/api/plants", tags=["Plant Database"])
         self._setup_routes()
 
     def _setup_routes(self):
         @self.router.get("/", response_model=List[dict])
-        async def get_all_plants(db: Session = Depends(get_db)):
+        async def get_all_plants(request: Request, db: Session = Depends(get_db)):
             """Get all plants from the database"""
             try:
-                repo = PlantDataRepository()
-                repo.set_db_session(db)
-                service = PlantDataService(repo)
-                plants = service.get_all_plants()
-                return [self._plant_to_dict(plant) for plant in plants]
+                def build():
+                    plants = self.service.get_all_plants(db)
+                    return [self._plant_to_dict(plant) for plant in plants]
+
+                return catalog_cache.respond(request, "all", build)
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
         @self.router.get("/search", response_model=List[dict])
-        async def search_plant_by_name(name: str = Query(..., description="Plant name to search for"), db: Session = Depends(get_db)):
+        async def search_plant_by_name(request: Request, name: str = Query(..., description="Plant name to search for"), db: Session = Depends(get_db)):
             """Search for a plant by name (case-insensitive partial match)"""
             try:
-                repo = PlantDataRepository()
-                repo.set_db_session(db)
-                service = PlantDataService(repo)
-                plants = service.search_plant_by_name(name)
-                return [self._plant_to_dict(plant) for plant in plants]
+                def build():
+                    plants = self.service.search_plant_by_name(db, name)
+                    return [self._plant_to_dict(plant) for plant in plants]
+
+                # ILIKE is case-insensitive, so case variants share one entry
+                return catalog_cache.respond(request, f"search:{name.lower()}", build)
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
@@ -40,10 +42,7 @@ class PlantDataController:
         async def get_plant_by_id(plant_id: int, db: Session = Depends(get_db)):
             """Get a specific plant by ID"""
             try:
-                repo = PlantDataRepository()
-                repo.set_db_session(db)
-                service = PlantDataService(repo)
-                plant = service.get_plant_by_id(plant_id)
+                plant = self.service.get_plant_by_id(db, plant_id)
                 if not plant:
                     raise HTTPException(status_code=404, detail="Plant not found")
                 return self._plant_to_dict(plant)
@@ -53,7 +52,7 @@ class PlantDataController:
                 raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
     def _plant_to_dict(self, plant: PlantData) -> dict:
-        """Convert SQLAlchemy model to dictionary"""
+        """Convert a PlantData row or model to dictionary"""
         return {
             "id": plant.id,
             "name": plant.name,
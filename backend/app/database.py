@@ -1,8 +1,12 @@
 import os
 import logging
-from sqlalchemy import create_engine, text
+import itertools
+import threading
+import time
+from sqlalchemy import create_engine, text, event, Select
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
 from dotenv import load_dotenv
 
 # Set up logging
@@ -37,8 +41,130 @@ try:
 except Exception as e:
     logger.error(f"❌ Failed to connect to database: {e}")
 
+# Optional read replicas (comma-separated URLs). Read-only queries are routed to
+# a healthy replica; writes, and reads in a session that has already written
+# (read-your-writes), go to the primary.
+DATABASE_REPLICA_URLS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+READ_YOUR_WRITES = os.getenv("READ_YOUR_WRITES", "1") == "1"
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+
+
+def _describe(replica):
+    return replica.url.host or replica.url.database
+
+
+class ReplicaPool:
+    """Round-robin over replica engines, skipping ones that recently failed"""
+
+    def __init__(self, engines, retry_seconds=REPLICA_RETRY_SECONDS):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self._failed_at = {}
+        self._cycle = itertools.cycle(range(len(engines))) if engines else None
+        self._lock = threading.Lock()
+
+    def mark_failed(self, replica):
+        with self._lock:
+            if replica not in self._failed_at:
+                logger.warning(f"⚠️  Read replica {_describe(replica)} marked unhealthy, failing over to primary")
+            self._failed_at[replica] = time.monotonic()
+
+    def _probe(self, replica):
+        """Cheap health check before putting a failed replica back into rotation"""
+        try:
+            with replica.connect() as connection:
+                connection.execute(text("SELECT 1"))
+        except Exception:
+            self.mark_failed(replica)
+            return False
+        with self._lock:
+            self._failed_at.pop(replica, None)
+        logger.info(f"✅ Read replica {_describe(replica)} healthy again")
+        return True
+
+    def choose(self):
+        """A healthy replica engine, or None to fall back to the primary"""
+        if not self.engines:
+            return None
+        for _ in range(len(self.engines)):
+            with self._lock:
+                replica = self.engines[next(self._cycle)]
+                failed_at = self._failed_at.get(replica)
+            if failed_at is None:
+                return replica
+            if time.monotonic() - failed_at >= self.retry_seconds and self._probe(replica):
+                return replica
+        return None
+
+    def status(self):
+        with self._lock:
+            return [
+                {"host": _describe(replica), "healthy": replica not in self._failed_at}
+                for replica in self.engines
+            ]
+
+
+replica_pool = ReplicaPool([create_engine(url, pool_pre_ping=True) for url in DATABASE_REPLICA_URLS])
+if replica_pool.engines:
+    logger.info(f"🔁 {len(replica_pool.engines)} read replica(s) configured")
+
+for _replica in replica_pool.engines:
+    @event.listens_for(_replica, "handle_error")
+    def _on_replica_error(context, replica=_replica):
+        if context.is_disconnect or isinstance(context.original_exception, (OSError, ConnectionError)) \
+                or context.connection is None:
+            replica_pool.mark_failed(replica)
+
+
+class RoutingSession(Session):
+    """Session that sends plain SELECTs to a replica and everything else to the primary"""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get("use_primary") or self._flushing or not isinstance(clause, Select):
+            return engine
+        replica = replica_pool.choose()
+        if replica is None:
+            return engine
+        self.info["last_read_bind"] = replica
+        return replica
+
+    def use_primary(self):
+        """Pin the rest of this session to the primary"""
+        self.info["use_primary"] = True
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _pin_after_write(session, flush_context):
+    if READ_YOUR_WRITES:
+        session.info["use_primary"] = True
+
+
+def read_with_failover(db: Session, query):
+    """
+    Run a read callable, retrying once on the primary if its replica fails
+
+    Args:
+        db: Session the callable uses
+        query: Zero-argument callable executing the read
+
+    Returns:
+        The callable's result
+    """
+    db.info.pop("last_read_bind", None)
+    try:
+        return query()
+    except DBAPIError:
+        replica = db.info.get("last_read_bind")
+        if replica is None or db.info.get("use_primary"):
+            raise
+        replica_pool.mark_failed(replica)
+        db.rollback()
+        db.info["use_primary"] = True
+        return query()
+
+
 # Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
 
 # Create Base class for models
 Base = declarative_base()
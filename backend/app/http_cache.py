@@ -0,0 +1,192 @@
+"""
+HTTP caching helpers: strong ETags, Cache-Control policies and conditional GET
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from fastapi import Request, Response
+
+from app.compression import strip_encoding_suffix
+
+CATALOG_CACHE_CONTROL = os.getenv("CATALOG_CACHE_CONTROL", "public, max-age=300, stale-while-revalidate=60")
+MODEL_INFO_CACHE_CONTROL = os.getenv("MODEL_INFO_CACHE_CONTROL", "public, max-age=3600")
+# Upper bound on how long a worker trusts its serialized catalog before
+# re-reading the database (catches writes made by other workers).
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "300"))
+CATALOG_CACHE_MAX_ENTRIES = int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", "256"))
+# Content-addressed bodies never change under the same URL
+IMMUTABLE_CACHE_CONTROL = os.getenv("IMMUTABLE_CACHE_CONTROL", "public, max-age=31536000, immutable")
+
+
+def serialize_json(payload) -> bytes:
+    """Serialize a payload to compact UTF-8 JSON bytes"""
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def compute_etag(body: bytes) -> str:
+    """Compute a strong ETag from the exact response body"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check the request's If-None-Match header against an ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(strip_encoding_suffix(candidate) == etag for candidate in header.split(","))
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: Optional[str], length: int) -> Optional[tuple]:
+    """
+    Parse a single-range Range header
+
+    Args:
+        header: Raw Range header value
+        length: Full body length
+
+    Returns:
+        (start, end) inclusive, or None to send the whole body (no header,
+        malformed, invalid such as last < first, or multi-range)
+
+    Raises:
+        RangeNotSatisfiable: If a valid range starts past the end of the body
+            or is an empty suffix
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[6:].strip()
+    if "," in spec:
+        return None
+    first, sep, last = spec.partition("-")
+    if not sep or not (first or last) or not all(part.isdigit() for part in (first, last) if part):
+        return None
+    if first == "":
+        if int(last) == 0 or length == 0:
+            raise RangeNotSatisfiable()
+        suffix = int(last)
+        return max(0, length - suffix), length - 1
+    start = int(first)
+    if last and int(last) < start:
+        # RFC 9110 14.1.1: an invalid range is ignored, not answered with 416
+        return None
+    if start >= length:
+        raise RangeNotSatisfiable()
+    end = min(int(last), length - 1) if last else length - 1
+    return start, end
+
+
+def immutable_response(request: Request, body, media_type: str, etag: str) -> Response:
+    """
+    Serve a content-addressed body with ETag revalidation and byte ranges
+
+    Args:
+        request: Incoming request (If-None-Match, Range, If-Range)
+        body: bytes or memoryview, sent without copying
+        media_type: Content type of the body
+        etag: Strong ETag identifying the body
+
+    Returns:
+        200, 206, 304 or 416 response
+    """
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL, "Accept-Ranges": "bytes"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    if_range = request.headers.get("if-range")
+    try:
+        byte_range = None if if_range and if_range.strip() != etag else parse_range(request.headers.get("range"), len(body))
+    except RangeNotSatisfiable:
+        headers["Content-Range"] = f"bytes */{len(body)}"
+        return Response(status_code=416, headers=headers)
+    if byte_range is None:
+        return Response(content=body, media_type=media_type, headers=headers)
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{len(body)}"
+    return Response(content=body[start:end + 1], status_code=206, media_type=media_type, headers=headers)
+
+
+class _Representation:
+    __slots__ = ("body", "etag", "created_at")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = compute_etag(body)
+        self.created_at = time.monotonic()
+
+
+class RepresentationCache:
+    """
+    Serialized JSON responses keyed by route/query, served with ETag validation
+
+    A conditional GET whose ETag matches a cached entry is answered with 304
+    before the builder runs, so no database query or serialization happens.
+    Call invalidate() after any write that changes the underlying data.
+    """
+
+    def __init__(self, cache_control: str, ttl: Optional[float] = None, max_entries: int = CATALOG_CACHE_MAX_ENTRIES):
+        self.cache_control = cache_control
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _Representation]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Drop every cached representation"""
+        with self._lock:
+            self._entries.clear()
+
+    def _get(self, key: str) -> Optional[_Representation]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self.ttl is not None and time.monotonic() - entry.created_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _put(self, key: str, entry: _Representation):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def respond(self, request: Request, key: str, build: Callable[[], object]) -> Response:
+        """
+        Return a cached JSON response, a 304, or build and cache a fresh one
+
+        Args:
+            request: Incoming request (for If-None-Match)
+            key: Cache key identifying the representation
+            build: Callable producing the JSON-serializable payload on a miss
+
+        Returns:
+            Response with ETag and Cache-Control headers
+        """
+        entry = self._get(key)
+        if entry is None:
+            entry = _Representation(serialize_json(build()))
+            self._put(key, entry)
+
+        headers = {"ETag": entry.etag, "Cache-Control": self.cache_control}
+        if etag_matches(request, entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+# Shared caches for the catalog and model-info endpoints
+catalog_cache = RepresentationCache(CATALOG_CACHE_CONTROL, ttl=CATALOG_CACHE_TTL)
+model_info_cache = RepresentationCache(MODEL_INFO_CACHE_CONTROL, max_entries=1)
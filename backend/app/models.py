@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, ForeignKey, Index, text
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -21,8 +21,9 @@ class UserPlant(Base):
     __tablename__ = "user_plants"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(String(100), nullable=False, index=True)  # Can be device ID or user ID
-    plant_data_id = Column(Integer, nullable=False)  # Reference to plant_data.id
+    user_id = Column(String(100), nullable=False)  # Can be device ID or user ID
+    plant_data_id = Column(Integer, ForeignKey("plant_data.id", name="fk_user_plants_plant_data_id"),
+                           nullable=False, index=True)
     nickname = Column(String(100))
     date_planted = Column(DateTime(timezone=True))
     last_watered = Column(DateTime(timezone=True))
@@ -32,4 +33,13 @@ class UserPlant(Base):
     custom_watering_frequency = Column(Integer)  # Override default frequency
     location = Column(String(100))  # "living room", "balcony", etc.
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Kept in sync with migrations/versions (v002); partial indexes cover active plants only
+    __table_args__ = (
+        Index("ix_user_plants_user_id_is_active", "user_id", "is_active"),
+        Index("ix_user_plants_active_due", "user_id", "last_watered",
+              postgresql_where=text("is_active"), sqlite_where=text("is_active = 1")),
+        Index("ix_user_plants_active_last_watered", "last_watered",
+              postgresql_where=text("is_active"), sqlite_where=text("is_active = 1")),
+    )
@@ -0,0 +1,409 @@
+"""
+Per-device token-bucket admission control
+
+Requests are keyed by the X-Device-Id header (or a ``device_id`` query
+parameter for WebSockets, falling back to the client address) and charged
+against a separate bucket per budget: inference endpoints share one budget,
+catalog endpoints another. Bucket state is bounded. In process it is an LRU
+dict that forgets the least recently seen key past RATE_LIMIT_MAX_KEYS; with
+RATE_LIMIT_SHARED_PATH set, every worker on the host uses one fixed-size
+set-associative table in a memory-mapped file and a full set gives up its
+stalest key. A forgotten key starts over with a full bucket.
+
+Device ids are client-supplied, so two limits bound a client that rotates
+them: every request is also charged to a per-address backstop bucket
+(RATE_LIMIT_IP_MULTIPLIER times the device budget), and once an address has
+presented RATE_LIMIT_MAX_DEVICES_PER_IP ids within
+RATE_LIMIT_DEVICE_WINDOW_SECONDS, further new ids are charged to its address
+bucket instead.
+"""
+import fcntl
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs
+
+import numpy as np
+from starlette.datastructures import Headers, MutableHeaders
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+RATE_LIMIT_INFERENCE_PER_MINUTE = float(os.getenv("RATE_LIMIT_INFERENCE_PER_MINUTE", "30"))
+RATE_LIMIT_INFERENCE_BURST = int(os.getenv("RATE_LIMIT_INFERENCE_BURST", "10"))
+RATE_LIMIT_CATALOG_PER_MINUTE = float(os.getenv("RATE_LIMIT_CATALOG_PER_MINUTE", "300"))
+RATE_LIMIT_CATALOG_BURST = int(os.getenv("RATE_LIMIT_CATALOG_BURST", "60"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "50000"))
+RATE_LIMIT_IP_MULTIPLIER = float(os.getenv("RATE_LIMIT_IP_MULTIPLIER", "10"))  # 0 disables the backstop
+RATE_LIMIT_MAX_DEVICES_PER_IP = int(os.getenv("RATE_LIMIT_MAX_DEVICES_PER_IP", "20"))
+RATE_LIMIT_DEVICE_WINDOW_SECONDS = float(os.getenv("RATE_LIMIT_DEVICE_WINDOW_SECONDS", "600"))
+RATE_LIMIT_SHARED_PATH = os.getenv("RATE_LIMIT_SHARED_PATH")  # e.g. /dev/shm/ikigotchi_ratelimit
+
+# Path prefixes per budget; anything else (health, docs, admin, stats) is not limited
+INFERENCE_PREFIXES = ("/api/classify/plant", "/api/classify/embedding", "/api/classify/similar",
+                      "/api/classify/live", "/api/vision")
+CATALOG_PREFIXES = ("/api/plants", "/api/classify/model-info", "/api/assistant/care", "/api/garden", "/api/photos")
+# Uploads that decode an image and write to disk are charged as inference even under a catalog prefix
+INFERENCE_UPLOAD_PREFIXES = ("/api/photos",)
+# Read-only stats under a limited prefix
+UNLIMITED_PATHS = ("/api/classify/live/stats",)
+
+RATE_LIMIT_HEADERS = ["RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset", "RateLimit-Policy", "Retry-After"]
+
+
+class Budget:
+    """Token bucket parameters shared by a group of endpoints"""
+
+    def __init__(self, name: str, per_minute: float, burst: int, prefixes, upload_prefixes=()):
+        self.name = name
+        self.per_minute = per_minute
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.prefixes = tuple(prefixes)
+        self.upload_prefixes = tuple(upload_prefixes)  # matched for POST only, before any other budget
+        self.policy = f"{burst};w={math.ceil(burst / self.rate)};comment=\"{per_minute:g}/min\""
+
+
+def refill(tokens: float, updated: float, now: float, budget: Budget, cost: float):
+    """
+    Refill a bucket for the elapsed time and try to take `cost` tokens
+
+    Returns:
+        (allowed, tokens left)
+    """
+    tokens = min(budget.burst, tokens + max(0.0, now - updated) * budget.rate)
+    if tokens >= cost:
+        return True, tokens - cost
+    return False, tokens
+
+
+class LocalBucketStore:
+    """Buckets for this process only, LRU-bounded"""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self.evictions = 0
+        self._buckets = OrderedDict()  # key -> (tokens, updated)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, budget: Budget, cost: float, now: float):
+        with self._lock:
+            state = self._buckets.pop(key, None)
+            tokens, updated = state if state is not None else (budget.burst, now)
+            allowed, tokens = refill(tokens, updated, now, budget, cost)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+        return allowed, tokens
+
+    def size(self) -> int:
+        return len(self._buckets)
+
+
+class SharedBucketStore:
+    """
+    Buckets shared by all workers on a host through a memory-mapped table
+
+    The table has RATE_LIMIT_MAX_KEYS slots in sets of WAYS; a key hashes to one
+    set and, if it is not there, takes an empty slot or the slot touched least
+    recently. Updates are serialized with an flock on a sibling lock file.
+    time.monotonic() is system-wide on Linux, so workers agree on elapsed time.
+    """
+
+    WAYS = 8
+    DTYPE = np.dtype([("key", "<u8"), ("tokens", "<f8"), ("updated", "<f8")])
+
+    def __init__(self, path, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.path = Path(path)
+        self.sets = max(1, -(-max_keys // self.WAYS))
+        self.max_keys = self.sets * self.WAYS
+        self.evictions = 0
+        self._thread_lock = threading.Lock()
+        self._lock_file = open(self.path.with_name(self.path.name + ".lock"), "a+")
+        size = self.max_keys * self.DTYPE.itemsize
+        with self._locked():
+            if not self.path.exists() or self.path.stat().st_size != size:
+                with open(self.path, "wb") as f:
+                    f.truncate(size)
+        self._table = np.memmap(self.path, dtype=self.DTYPE, mode="r+", shape=(self.sets, self.WAYS))
+
+    @contextmanager
+    def _locked(self):
+        with self._thread_lock:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        # 0 marks an empty slot
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+    def take(self, key: str, budget: Budget, cost: float, now: float):
+        hashed = self._hash(key)
+        with self._locked():
+            row = self._table[hashed % self.sets]
+            match = np.flatnonzero(row["key"] == hashed)
+            if match.size:
+                slot = int(match[0])
+                tokens, updated = float(row["tokens"][slot]), float(row["updated"][slot])
+            else:
+                empty = np.flatnonzero(row["key"] == 0)
+                if empty.size:
+                    slot = int(empty[0])
+                else:
+                    slot = int(np.argmin(row["updated"]))
+                    self.evictions += 1
+                tokens, updated = budget.burst, now
+            allowed, tokens = refill(tokens, updated, now, budget, cost)
+            row[slot] = (hashed, tokens, now)
+        return allowed, tokens
+
+    def size(self) -> int:
+        return int(np.count_nonzero(self._table["key"]))
+
+
+class DevicesPerAddress:
+    """
+    Device ids recently seen from each client address (this process only)
+
+    An address keeps at most max_devices ids seen within the last window
+    seconds; addresses are LRU-bounded like the local bucket store.
+    """
+
+    def __init__(self, max_devices: int = RATE_LIMIT_MAX_DEVICES_PER_IP,
+                 window: float = RATE_LIMIT_DEVICE_WINDOW_SECONDS, max_addresses: int = RATE_LIMIT_MAX_KEYS):
+        self.max_devices = max_devices
+        self.window = window
+        self.max_addresses = max_addresses
+        self.refused = 0
+        self._seen = OrderedDict()  # address -> OrderedDict(device id -> last seen), oldest first
+        self._lock = threading.Lock()
+
+    def admit(self, address: str, device_id: str, now: float) -> bool:
+        """Whether device_id may have its own buckets, recording it if so"""
+        with self._lock:
+            devices = self._seen.pop(address, None)
+            if devices is None:
+                devices = OrderedDict()
+            self._seen[address] = devices
+            if len(self._seen) > self.max_addresses:
+                self._seen.popitem(last=False)
+            while devices and next(iter(devices.values())) < now - self.window:
+                devices.popitem(last=False)
+            if device_id not in devices and len(devices) >= self.max_devices:
+                self.refused += 1
+                return False
+            devices.pop(device_id, None)
+            devices[device_id] = now
+            return True
+
+    def size(self) -> int:
+        return len(self._seen)
+
+
+class Decision:
+    __slots__ = ("budget", "allowed", "remaining", "reset", "retry_after")
+
+    def __init__(self, budget: Budget, allowed: bool, tokens: float):
+        self.budget = budget
+        self.allowed = allowed
+        self.remaining = int(tokens)
+        # Seconds until the bucket is full again / until the next request fits
+        self.reset = math.ceil((budget.burst - tokens) / budget.rate)
+        self.retry_after = 0 if allowed else max(1, math.ceil((1 - tokens) / budget.rate))
+
+    def headers(self):
+        headers = [
+            ("RateLimit-Limit", str(self.budget.burst)),
+            ("RateLimit-Remaining", str(self.remaining)),
+            ("RateLimit-Reset", str(self.reset)),
+            ("RateLimit-Policy", self.budget.policy),
+        ]
+        if not self.allowed:
+            headers.append(("Retry-After", str(self.retry_after)))
+        return headers
+
+
+class RateLimiter:
+    """Budgets, bucket store and throttling metrics"""
+
+    def __init__(self, budgets, store, recent_throttles: int = 20, ip_multiplier: float = RATE_LIMIT_IP_MULTIPLIER,
+                 devices: DevicesPerAddress = None):
+        self.budgets = budgets
+        self.store = store
+        # Per-address bucket charged alongside every device bucket
+        self.backstops = {
+            budget.name: Budget(f"{budget.name}-ip", budget.per_minute * ip_multiplier,
+                                max(1, int(budget.burst * ip_multiplier)), budget.prefixes)
+            for budget in budgets
+        } if ip_multiplier > 0 else {}
+        self.devices = devices or DevicesPerAddress()
+        self.allowed = Counter()
+        self.throttled = Counter()
+        self.throttled_paths = Counter()
+        self.recent_throttles = deque(maxlen=recent_throttles)
+        self.started_at = time.time()
+
+    def budget_for(self, path: str, method: Optional[str] = None) -> Optional[Budget]:
+        if path.rstrip("/") in UNLIMITED_PATHS:
+            return None
+        if method == "POST":
+            for budget in self.budgets:
+                if budget.upload_prefixes and path.startswith(budget.upload_prefixes):
+                    return budget
+        for budget in self.budgets:
+            if path.startswith(budget.prefixes):
+                return budget
+        return None
+
+    def check(self, key: str, budget: Budget, path: str, cost: float = 1.0) -> Decision:
+        allowed, tokens = self.store.take(f"{budget.name}:{key}", budget, cost, time.monotonic())
+        if allowed:
+            self.allowed[budget.name] += 1
+        else:
+            self.throttled[budget.name] += 1
+            self.throttled_paths[path] += 1
+            self.recent_throttles.append({"at": time.time(), "budget": budget.name, "key": key, "path": path})
+        return Decision(budget, allowed, tokens)
+
+    def check_client(self, device_id: Optional[str], address: str, budget: Budget, path: str) -> Decision:
+        """
+        Charge a request to its device (or address) bucket, then to the address backstop
+
+        Returns:
+            The device decision, or the backstop decision if only that one rejects
+        """
+        key = "ip:" + address
+        if device_id and self.devices.admit(address, device_id, time.monotonic()):
+            key = "device:" + device_id
+        decision = self.check(key, budget, path)
+        backstop = self.backstops.get(budget.name)
+        if decision.allowed and backstop is not None:
+            backstop_decision = self.check("ip:" + address, backstop, path)
+            if not backstop_decision.allowed:
+                return backstop_decision
+        return decision
+
+    def stats(self):
+        """Allowed/throttled counts per budget (this process) and bucket store occupancy"""
+        budgets = {}
+        for budget in self.budgets + list(self.backstops.values()):
+            allowed, throttled = self.allowed[budget.name], self.throttled[budget.name]
+            budgets[budget.name] = {
+                "per_minute": budget.per_minute,
+                "burst": budget.burst,
+                "allowed": allowed,
+                "throttled": throttled,
+                "throttle_rate": round(throttled / (allowed + throttled), 4) if allowed + throttled else None,
+            }
+        return {
+            "enabled": RATE_LIMIT_ENABLED,
+            "since": self.started_at,
+            "store": "shared" if isinstance(self.store, SharedBucketStore) else "local",
+            "tracked_keys": self.store.size(),
+            "max_keys": self.store.max_keys,
+            "evictions": self.store.evictions,
+            "tracked_addresses": self.devices.size(),
+            "max_devices_per_ip": self.devices.max_devices,
+            "refused_device_ids": self.devices.refused,
+            "budgets": budgets,
+            "throttled_paths": dict(self.throttled_paths.most_common(20)),
+            "recent_throttles": list(self.recent_throttles),
+        }
+
+
+def _make_store():
+    if RATE_LIMIT_SHARED_PATH:
+        try:
+            return SharedBucketStore(RATE_LIMIT_SHARED_PATH)
+        except OSError as e:
+            print(f"[RateLimit] Shared bucket table unavailable ({e}), using per-process buckets")
+    return LocalBucketStore()
+
+
+rate_limiter = RateLimiter(
+    [
+        Budget("inference", RATE_LIMIT_INFERENCE_PER_MINUTE, RATE_LIMIT_INFERENCE_BURST, INFERENCE_PREFIXES,
+               INFERENCE_UPLOAD_PREFIXES),
+        Budget("catalog", RATE_LIMIT_CATALOG_PER_MINUTE, RATE_LIMIT_CATALOG_BURST, CATALOG_PREFIXES),
+    ],
+    _make_store(),
+)
+
+
+def client_identity(scope):
+    """
+    (device id from X-Device-Id / ?device_id= or None, client address)
+    """
+    device_id = Headers(scope=scope).get("x-device-id")
+    if not device_id and scope["type"] == "websocket":
+        device_id = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("device_id", [None])[0]
+    client = scope.get("client")
+    return (device_id[:128] if device_id else None), (client[0] if client else "unknown")
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware that admits or rejects requests per device (and address) and budget
+
+    Limited HTTP responses carry RateLimit-* headers; rejected requests get a
+    429 with Retry-After. A WebSocket is charged once when it connects and is
+    closed with code 1008 before being accepted when over budget. Once
+    accepted, the endpoint finds a ``charge()`` callable in the connection
+    state (``websocket.state.rate_limit_charge``) to charge each unit of work,
+    e.g. every live frame it classifies.
+    """
+
+    def __init__(self, app, limiter: RateLimiter = None, enabled: bool = RATE_LIMIT_ENABLED):
+        self.app = app
+        self.limiter = limiter or rate_limiter
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] not in ("http", "websocket") or scope.get("method") == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        budget = self.limiter.budget_for(scope["path"], scope.get("method"))
+        if budget is None:
+            await self.app(scope, receive, send)
+            return
+
+        identity = client_identity(scope)
+        decision = self.limiter.check_client(*identity, budget, scope["path"])
+        if not decision.allowed:
+            if scope["type"] == "websocket":
+                await receive()  # websocket.connect
+                await send({"type": "websocket.close", "code": 1008, "reason": "Rate limit exceeded"})
+                return
+            body = json.dumps({"detail": f"Rate limit exceeded for {budget.name} requests, "
+                                         f"retry in {decision.retry_after}s"}).encode()
+            headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+            headers += [(name.lower().encode(), value.encode()) for name, value in decision.headers()]
+            await send({"type": "http.response.start", "status": 429, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        if scope["type"] == "websocket":
+            scope.setdefault("state", {})["rate_limit_charge"] = (
+                lambda: self.limiter.check_client(*identity, budget, scope["path"])
+            )
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in decision.headers():
+                    headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,72 +1,78 @@
 from typing import List, Optional
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from app.models import PlantData
+from app.database import READ_YOUR_WRITES, read_with_failover
+
+_table = PlantData.__table__
+
+# Statements are built once at import. Reusing the same statement objects skips
+# per-call query construction, and their compiled form stays in SQLAlchemy's
+# compiled cache. Reads select table columns, so results hydrate as lightweight
+# Row tuples (attribute access like ORM objects, no identity map or instrumentation).
+_SELECT_ALL = select(*_table.c)
+_SELECT_BY_ID = select(*_table.c).where(_table.c.id == bindparam("plant_id"))
+_SEARCH_BY_NAME = select(*_table.c).where(_table.c.name.ilike(bindparam("pattern")))
+_DELETE_BY_ID = delete(_table).where(_table.c.id == bindparam("plant_id"))
+_MAX_ID = select(_table.c.id).order_by(_table.c.id.desc()).limit(1)
+_UPDATABLE_COLUMNS = frozenset(column.name for column in _table.c) - {"id", "created_at"}
+
 
 class PlantDataRepository:
-    def __init__(self):
-        # Database session will be injected
-        self.db: Optional[Session] = None
-    
-    def set_db_session(self, db: Session):
-        """Set database session for this repository"""
-        self.db = db
-    
-    def find_all(self) -> List[PlantData]:
+    """Stateless repository; one instance is shared and each call takes the request's session"""
+
+    def find_all(self, db: Session) -> List[Row]:
         """Get all plant data"""
-        if not self.db:
-            raise RuntimeError("Database session not set")
-        return self.db.query(PlantData).all()
-    
-    def find_by_id(self, plant_id: int) -> Optional[PlantData]:
+        return read_with_failover(db, lambda: db.execute(_SELECT_ALL).all())
+
+    def find_by_id(self, db: Session, plant_id: int) -> Optional[Row]:
         """Find plant by ID"""
-        if not self.db:
-            raise RuntimeError("Database session not set")
-        return self.db.query(PlantData).filter(PlantData.id == plant_id).first()
-    
-    def find_by_name(self, name: str) -> List[PlantData]:
+        return read_with_failover(db, lambda: db.execute(_SELECT_BY_ID, {"plant_id": plant_id}).first())
+
+    def find_by_name(self, db: Session, name: str) -> List[Row]:
         """Find plants by name (case-insensitive partial match)"""
-        if not self.db:
-            raise RuntimeError("Database session not set")
-        return self.db.query(PlantData).filter(
-            PlantData.name.ilike(f"%{name}%")
-        ).all()
-    
-    def save(self, plant_data: PlantData) -> PlantData:
+        return read_with_failover(db, lambda: db.execute(_SEARCH_BY_NAME, {"pattern": f"%{name}%"}).all())
+
+    def save(self, db: Session, plant_data: PlantData) -> PlantData:
         """Save plant data to database"""
-        if not self.db:
-            raise RuntimeError("Database session not set")
-        self.db.add(plant_data)
-        self.db.commit()
-        self.db.refresh(plant_data)
+        db.add(plant_data)
+        db.commit()
+        db.refresh(plant_data)
         return plant_data
-    
-    def update(self, plant_id: int, updated_data: dict) -> Optional[PlantData]:
-        """Update plant data"""
-        if not self.db:
-            raise RuntimeError("Database session not set")
-        plant = self.find_by_id(plant_id)
-        if plant:
-            for key, value in updated_data.items():
-                if hasattr(plant, key):
-                    setattr(plant, key, value)
-            self.db.commit()
-            self.db.refresh(plant)
+
+    def update(self, db: Session, plant_id: int, updated_data: dict) -> Optional[Row]:
+        """Update plant data in one UPDATE ... RETURNING round trip (None if not found)"""
+        values = {key: value for key, value in updated_data.items() if key in _UPDATABLE_COLUMNS}
+        if not values:
+            # Nothing to change; still report whether the plant exists, from the primary
+            db.info["use_primary"] = True
+            return self.find_by_id(db, plant_id)
+        statement = update(_table).where(_table.c.id == plant_id).values(**values).returning(*_table.c)
+        plant = db.execute(statement).first()
+        db.commit()
+        self._pin_after_write(db)
         return plant
-    
-    def delete_by_id(self, plant_id: int) -> bool:
+
+    def delete_by_id(self, db: Session, plant_id: int) -> bool:
         """Delete plant by ID"""
-        if not self.db:
-            raise RuntimeError("Database session not set")
-        plant = self.find_by_id(plant_id)
-        if plant:
-            self.db.delete(plant)
-            self.db.commit()
-            return True
-        return False
-    
-    def generate_id(self) -> int:
+        deleted = db.execute(_DELETE_BY_ID, {"plant_id": plant_id}).rowcount > 0
+        db.commit()
+        self._pin_after_write(db)
+        return deleted
+
+    @staticmethod
+    def _pin_after_write(db: Session):
+        # Core statements don't flush, so the session's after_flush pin doesn't fire
+        if READ_YOUR_WRITES:
+            db.info["use_primary"] = True
+
+    def generate_id(self, db: Session) -> int:
         """Generate next available ID"""
-        if not self.db:
-            raise RuntimeError("Database session not set")
-        max_id = self.db.query(PlantData.id).order_by(PlantData.id.desc()).first()
-        return (max_id[0] + 1) if max_id else 1
\ No newline at end of file
+        db.info["use_primary"] = True
+        max_id = db.execute(_MAX_ID).scalar()
+        return (max_id + 1) if max_id else 1
+
+
+# Application-scoped instance
+plant_data_repository = PlantDataRepository()
@@ -19,9 +19,14 @@ class UserPlantRepository:
         return plant
 
     def delete_by_id(self, plant_id: str) -> bool:
-        initial_length = len(self._user_plants)
-        self._user_plants = [p for p in self._user_plants if p.id != plant_id]
-        return len(self._user_plants) < initial_length
+        return self.remove_by_id(plant_id) is not None
+
+    def remove_by_id(self, plant_id: str) -> Optional[UserPlant]:
+        """Delete a plant and return it (None if not found) in a single pass"""
+        for index, plant in enumerate(self._user_plants):
+            if plant.id == plant_id:
+                return self._user_plants.pop(index)
+        return None
 
     def generate_id(self) -> str:
         return str(len(self._user_plants) + 1)
\ No newline at end of file
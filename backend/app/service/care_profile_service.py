@@ -0,0 +1,87 @@
+"""
+Genus -> care profile lookup table joined into classification results
+"""
+from typing import Dict, List, Optional
+
+# Indexed by genus id (0..num_classes-1); None where the catalog has no match
+_care_profiles: List[Optional[dict]] = []
+
+CARE_PROFILE_FIELDS = (
+    "name",
+    "scientific_name",
+    "care_instructions",
+    "watering_frequency_days",
+    "sunlight_requirement",
+    "difficulty_level",
+)
+
+
+def _genus_of(plant) -> Optional[str]:
+    """Genus is the first word of the binomial scientific name"""
+    if not plant.scientific_name:
+        return None
+    return plant.scientific_name.split()[0].capitalize()
+
+
+def build_care_profiles(genus_to_id: Dict[str, int], plants) -> List[Optional[dict]]:
+    """
+    Build the genus id -> care profile table
+
+    Args:
+        genus_to_id: Genus name to class id mapping from label_mapping.json
+        plants: Iterable of PlantData rows
+
+    Returns:
+        List indexed by genus id holding a care profile dict or None
+    """
+    table: List[Optional[dict]] = [None] * len(genus_to_id)
+    # Lowest plant id wins when several catalog entries share a genus (e.g. Ficus)
+    for plant in sorted(plants, key=lambda p: p.id):
+        genus_id = genus_to_id.get(_genus_of(plant))
+        if genus_id is None or table[genus_id] is not None:
+            continue
+        profile = {"plant_data_id": plant.id}
+        for field in CARE_PROFILE_FIELDS:
+            profile[field] = getattr(plant, field)
+        table[genus_id] = profile
+    return table
+
+
+def load_care_profiles(genus_to_id: Dict[str, int]) -> int:
+    """
+    Load the catalog once and build the in-memory care profile table
+
+    Database problems are logged and leave the table empty, so classification
+    keeps working without care info.
+
+    Returns:
+        Number of genera with a care profile
+    """
+    global _care_profiles
+
+    try:
+        # Imported lazily: classification-only deployments may run without a database
+        from app.database import SessionLocal
+        from app.service.plant_data_service import plant_data_service
+
+        db = SessionLocal()
+        try:
+            plants = plant_data_service.get_all_plants(db)
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"[CareProfiles] Could not load plant catalog, care profiles disabled: {e}")
+        _care_profiles = [None] * len(genus_to_id)
+        return 0
+
+    _care_profiles = build_care_profiles(genus_to_id, plants)
+    matched = sum(profile is not None for profile in _care_profiles)
+    print(f"[CareProfiles] Care profiles available for {matched}/{len(genus_to_id)} genera")
+    return matched
+
+
+def get_care_profile(genus_id: int) -> Optional[dict]:
+    """O(1) care profile lookup by genus id"""
+    if 0 <= genus_id < len(_care_profiles):
+        return _care_profiles[genus_id]
+    return None
@@ -0,0 +1,273 @@
+"""
+Image embeddings and a memory-mapped vector index for similar-plant lookup
+"""
+import base64
+import json
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+EMBEDDING_INDEX_DIR = Path(os.getenv("EMBEDDING_INDEX_DIR", str(DATA_DIR / "embedding_index")))
+# float16 halves the file size, but numpy's float16 -> float32 upcast makes
+# single queries several times slower than float32 storage
+EMBEDDING_INDEX_DTYPE = os.getenv("EMBEDDING_INDEX_DTYPE", "float32")
+PQ_CODEBOOK_PATH = Path(os.getenv("PQ_CODEBOOK_PATH", str(DATA_DIR / "pq_codebook.npz")))
+
+# Rows scored per matrix multiply; bounds the float32 scratch to chunk x dim
+SEARCH_CHUNK_ROWS = int(os.getenv("EMBEDDING_SEARCH_CHUNK_ROWS", "32768"))
+
+_index = None
+_index_lock = threading.Lock()
+_pq = None
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows so inner product equals cosine similarity"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class ProductQuantizer:
+    """
+    Product quantizer: splits a vector into m sub-vectors and stores each as
+    the id of its nearest of 256 centroids (m bytes per vector)
+    """
+
+    def __init__(self, codebooks: np.ndarray):
+        # (m, 256, sub_dim)
+        self.codebooks = codebooks.astype(np.float32)
+        self.m, self.ks, self.sub_dim = self.codebooks.shape
+
+    @classmethod
+    def train(cls, vectors: np.ndarray, m: int = 48, ks: int = 256, iterations: int = 20, seed: int = 0):
+        """Fit per-subspace k-means codebooks on a sample of vectors"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n, dim = vectors.shape
+        if dim % m:
+            raise ValueError(f"Dimension {dim} is not divisible by m={m}")
+        rng = np.random.default_rng(seed)
+        sub_dim = dim // m
+        codebooks = np.empty((m, ks, sub_dim), dtype=np.float32)
+        for j in range(m):
+            sub = vectors[:, j * sub_dim:(j + 1) * sub_dim]
+            centroids = sub[rng.choice(n, ks, replace=n < ks)].copy()
+            for _ in range(iterations):
+                assign = cls._nearest(sub, centroids)
+                for c in range(ks):
+                    members = sub[assign == c]
+                    if len(members):
+                        centroids[c] = members.mean(axis=0)
+            codebooks[j] = centroids
+        return cls(codebooks)
+
+    @staticmethod
+    def _nearest(sub: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        # argmin ||x - c||^2 = argmin (||c||^2 - 2 x.c)
+        distances = (centroids ** 2).sum(axis=1) - 2 * sub @ centroids.T
+        return distances.argmin(axis=1)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        codes = np.empty((len(vectors), self.m), dtype=np.uint8)
+        for j in range(self.m):
+            sub = vectors[:, j * self.sub_dim:(j + 1) * self.sub_dim]
+            codes[:, j] = self._nearest(sub, self.codebooks[j])
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        codes = np.atleast_2d(codes)
+        return np.concatenate([self.codebooks[j][codes[:, j]] for j in range(self.m)], axis=1)
+
+    def save(self, path: Path):
+        np.savez(path, codebooks=self.codebooks)
+
+    @classmethod
+    def load(cls, path: Path):
+        with np.load(path) as data:
+            return cls(data["codebooks"])
+
+
+def get_product_quantizer() -> Optional[ProductQuantizer]:
+    """Load the trained PQ codebook once, or None if none has been trained"""
+    global _pq
+    if _pq is None and PQ_CODEBOOK_PATH.exists():
+        _pq = ProductQuantizer.load(PQ_CODEBOOK_PATH)
+    return _pq
+
+
+def encode_embedding(vector: np.ndarray, fmt: str = "float32") -> dict:
+    """
+    Serialize a normalized embedding compactly
+
+    Args:
+        vector: Embedding vector
+        fmt: "float32", "float16" or "pq"
+
+    Returns:
+        Dictionary with base64 data and the information needed to decode it
+    """
+    vector = normalize(vector)
+    if fmt == "pq":
+        pq = get_product_quantizer()
+        if pq is None:
+            raise ValueError(f"No PQ codebook at {PQ_CODEBOOK_PATH}")
+        data = pq.encode(vector)[0].tobytes()
+        dtype = "uint8"
+    elif fmt in ("float32", "float16"):
+        data = vector.astype(fmt).tobytes()
+        dtype = fmt
+    else:
+        raise ValueError(f"Unsupported embedding format '{fmt}'")
+    return {
+        "format": fmt,
+        "dim": int(vector.shape[-1]),
+        "dtype": dtype,
+        "bytes": len(data),
+        "data": base64.b64encode(data).decode("ascii"),
+    }
+
+
+class VectorIndex:
+    """
+    Append-only, memory-mapped store of normalized vectors with exact top-k search
+
+    Files in the index directory:
+        vectors.npy  (capacity, dim) array opened with np.memmap
+        keys.txt     one key per stored vector, in row order
+        meta.json    dim, dtype and the number of valid rows
+    """
+
+    def __init__(self, directory: Path, dim: Optional[int] = None, dtype: str = EMBEDDING_INDEX_DTYPE):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._vectors_path = self.directory / "vectors.npy"
+        self._keys_path = self.directory / "keys.txt"
+        self._meta_path = self.directory / "meta.json"
+        self._lock = threading.RLock()
+
+        if self._meta_path.exists():
+            with open(self._meta_path) as f:
+                meta = json.load(f)
+            self.dim, self.dtype, self.count = meta["dim"], meta["dtype"], meta["count"]
+            self._vectors = np.load(self._vectors_path, mmap_mode="r+")
+            with open(self._keys_path, encoding="utf-8") as f:
+                self.keys = [line.rstrip("\n") for line in f]
+            if len(self.keys) > self.count:
+                # Interrupted add(): keys were appended but meta never counted them
+                self.keys = self.keys[:self.count]
+                with open(self._keys_path, "w", encoding="utf-8") as f:
+                    f.writelines(key + "\n" for key in self.keys)
+        else:
+            self.dim, self.dtype, self.count = dim, dtype, 0
+            self._vectors = None
+            self.keys = []
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Read-only view of the stored rows"""
+        if self._vectors is None:
+            return np.empty((0, self.dim or 0), dtype=self.dtype)
+        view = self._vectors[:self.count]
+        view.flags.writeable = False
+        return view
+
+    def _write_meta(self):
+        tmp = self._meta_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"dim": self.dim, "dtype": self.dtype, "count": self.count}, f)
+        os.replace(tmp, self._meta_path)
+
+    def _ensure_capacity(self, needed: int):
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(1024, capacity * 2, needed)
+        tmp_path = self.directory / "vectors.tmp.npy"
+        grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=self.dtype, shape=(new_capacity, self.dim))
+        if self.count:
+            grown[:self.count] = self._vectors[:self.count]
+        grown.flush()
+        del grown
+        self._vectors = None
+        os.replace(tmp_path, self._vectors_path)
+        self._vectors = np.load(self._vectors_path, mmap_mode="r+")
+
+    def add(self, keys: Sequence[str], vectors: np.ndarray):
+        """Append vectors (normalized on the way in) under the given keys"""
+        vectors = normalize(np.atleast_2d(vectors))
+        if len(keys) != len(vectors):
+            raise ValueError("keys and vectors must have the same length")
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+            if vectors.shape[1] != self.dim:
+                raise ValueError(f"Expected dimension {self.dim}, got {vectors.shape[1]}")
+            self._ensure_capacity(self.count + len(vectors))
+            self._vectors[self.count:self.count + len(vectors)] = vectors.astype(self.dtype)
+            self._vectors.flush()
+            with open(self._keys_path, "a", encoding="utf-8") as f:
+                for key in keys:
+                    f.write(str(key).replace("\n", " ") + "\n")
+            self.keys.extend(str(key) for key in keys)
+            self.count += len(vectors)
+            self._write_meta()
+
+    def search(self, queries: np.ndarray, k: int = 10) -> List[List[Tuple[str, float]]]:
+        """
+        Exact cosine top-k via chunked matrix multiplies over the memory map
+
+        Args:
+            queries: (dim,) or (q, dim) query vectors
+            k: Results per query
+
+        Returns:
+            One list of (key, score) per query, best first
+        """
+        queries = normalize(np.atleast_2d(queries))
+        with self._lock:
+            count, vectors = self.count, self._vectors
+        k = min(k, count)
+        if k == 0:
+            return [[] for _ in range(len(queries))]
+
+        best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        best_ids = np.zeros((len(queries), k), dtype=np.int64)
+        for start in range(0, count, SEARCH_CHUNK_ROWS):
+            block = np.asarray(vectors[start:min(start + SEARCH_CHUNK_ROWS, count)], dtype=np.float32)
+            scores = queries @ block.T
+            if scores.shape[1] > k:
+                top = np.argpartition(scores, -k, axis=1)[:, -k:]
+                scores = np.take_along_axis(scores, top, axis=1)
+                ids = top + start
+            else:
+                ids = np.broadcast_to(np.arange(start, start + scores.shape[1]), scores.shape)
+            merged_scores = np.concatenate([best_scores, scores], axis=1)
+            merged_ids = np.concatenate([best_ids, ids], axis=1)
+            keep = np.argpartition(merged_scores, -k, axis=1)[:, -k:]
+            best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+            best_ids = np.take_along_axis(merged_ids, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_ids = np.take_along_axis(best_ids, order, axis=1)
+        return [
+            [(self.keys[i], float(score)) for i, score in zip(row_ids, row_scores)]
+            for row_ids, row_scores in zip(best_ids, best_scores)
+        ]
+
+
+def get_vector_index() -> VectorIndex:
+    """Get or open the process-wide vector index"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = VectorIndex(EMBEDDING_INDEX_DIR)
+        return _index
@@ -0,0 +1,445 @@
+"""
+Garden statistics maintained incrementally from plant and watering events
+
+Every plant mutation and watering updates per-user and global counters in
+place, so the dashboard reads (on-time rate, lateness histogram, plants
+overdue per location, most popular genera) never scan user_plants. "Overdue"
+depends on the clock rather than on events; it is kept as per-location counts
+of plants by due day that are rolled into the overdue total one day at a time
+as days pass (amortized O(1) per read).
+
+Genus and location come from clients, so both are bounded: genera are matched
+against the model's label mapping (anything else is not ranked) and at most
+GARDEN_MAX_LOCATIONS distinct locations are tracked, later ones counting as
+"other". Per-location reads therefore walk a fixed number of counters.
+
+Aggregates live in memory and are snapshotted to a JSON file periodically and
+on shutdown. Only the per-plant state and the watering counters are stored;
+the plant-derived counts are rebuilt from the plant state on load.
+"""
+import asyncio
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+
+from .plant_classification_service import known_genus
+
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+GARDEN_STATS_PATH = Path(os.getenv("GARDEN_STATS_PATH", str(DATA_DIR / "garden_stats.json")))
+GARDEN_STATS_SNAPSHOT_SECONDS = float(os.getenv("GARDEN_STATS_SNAPSHOT_SECONDS", "60"))
+GARDEN_ON_TIME_GRACE_HOURS = float(os.getenv("GARDEN_ON_TIME_GRACE_HOURS", "12"))
+GARDEN_MAX_LOCATIONS = int(os.getenv("GARDEN_MAX_LOCATIONS", "100"))
+
+UNASSIGNED_LOCATION = "unassigned"
+OTHER_LOCATION = "other"
+LOCATION_MAX_LENGTH = 40
+DAY_SECONDS = 86400
+MAX_INTERVAL_DAYS = 365
+# Accepted timestamp range for last_watered / watered_at
+MIN_TIMESTAMP = 946684800  # 2000-01-01
+MAX_CLOCK_SKEW_SECONDS = DAY_SECONDS
+
+# Upper bounds (days late) of the lateness histogram buckets; the last bucket is open-ended
+LATENESS_BOUNDS_DAYS = [GARDEN_ON_TIME_GRACE_HOURS / 24, 1, 2, 4, 7]
+LATENESS_LABELS = ["on_time", "<1d", "1-2d", "2-4d", "4-7d", "7d+"]
+
+_lock = threading.Lock()
+_plants = {}  # (user_id, plant_id) -> plant state
+_users = {}   # user_id -> _Aggregate
+_dirty = False
+
+
+def _day(timestamp):
+    return int(timestamp // DAY_SECONDS)
+
+
+class _DueCounter:
+    """Plants overdue as of today, advanced lazily one due-day bucket at a time"""
+
+    def __init__(self, day):
+        self.day = day      # plants due before this day are counted in overdue
+        self.overdue = 0
+        self.pending = {}   # due day -> plants not overdue yet
+
+    def add(self, due_day):
+        if due_day < self.day:
+            self.overdue += 1
+        else:
+            self.pending[due_day] = self.pending.get(due_day, 0) + 1
+
+    def remove(self, due_day):
+        if due_day < self.day:
+            self.overdue -= 1
+            return
+        remaining = self.pending[due_day] - 1
+        if remaining:
+            self.pending[due_day] = remaining
+        else:
+            del self.pending[due_day]
+
+    def advance(self, today):
+        while self.day < today:
+            self.overdue += self.pending.pop(self.day, 0)
+            self.day += 1
+        return self.overdue
+
+
+class _Aggregate:
+    """Counters for one user, or for every user when global"""
+
+    def __init__(self):
+        self.plants = 0
+        self.by_location = Counter()
+        self.by_genus = Counter()
+        self.due = {}  # location -> _DueCounter
+        self.due_all = _DueCounter(_day(time.time()))  # running total across locations
+        self.waterings = 0
+        self.unscheduled_waterings = 0
+        self.on_time = 0
+        self.lateness_hours_sum = 0.0
+        self.lateness = [0] * len(LATENESS_LABELS)
+
+    def add_plant(self, plant, due_day, sign=1):
+        location = plant["location"]
+        self.plants += sign
+        self.by_location[location] += sign
+        if plant["genus"]:
+            self.by_genus[plant["genus"]] += sign
+            if self.by_genus[plant["genus"]] <= 0:
+                del self.by_genus[plant["genus"]]
+        if due_day is not None:
+            counter = self.due.get(location)
+            if counter is None:
+                counter = self.due[location] = _DueCounter(_day(time.time()))
+            if sign > 0:
+                counter.add(due_day)
+                self.due_all.add(due_day)
+            else:
+                counter.remove(due_day)
+                self.due_all.remove(due_day)
+        if self.by_location[location] <= 0:
+            # No plants left there, so its due counter is empty too
+            del self.by_location[location]
+            self.due.pop(location, None)
+
+    def add_watering(self, late_hours):
+        self.waterings += 1
+        if late_hours is None:
+            self.unscheduled_waterings += 1
+            return
+        bucket = bisect_left(LATENESS_BOUNDS_DAYS, late_hours / 24)
+        self.lateness[bucket] += 1
+        self.on_time += int(bucket == 0)
+        self.lateness_hours_sum += max(0.0, late_hours)
+
+    def adherence(self):
+        scheduled = self.waterings - self.unscheduled_waterings
+        return {
+            "waterings": self.waterings,
+            "scheduled_waterings": scheduled,
+            "on_time": self.on_time,
+            "on_time_rate": round(self.on_time / scheduled, 4) if scheduled else None,
+            "mean_hours_late": round(self.lateness_hours_sum / scheduled, 2) if scheduled else None,
+            "lateness_histogram": dict(zip(LATENESS_LABELS, self.lateness)),
+        }
+
+    def overdue(self, today, top=None):
+        by_location = Counter({location: counter.advance(today) for location, counter in self.due.items()})
+        return {
+            "total": self.due_all.advance(today),
+            "by_location": {location: n for location, n in by_location.most_common(top) if n},
+        }
+
+    def counters(self):
+        return {
+            "waterings": self.waterings,
+            "unscheduled_waterings": self.unscheduled_waterings,
+            "on_time": self.on_time,
+            "lateness_hours_sum": self.lateness_hours_sum,
+            "lateness": list(self.lateness),
+        }
+
+    def restore_counters(self, data):
+        lateness = [int(n) for n in data["lateness"]]
+        if len(lateness) != len(LATENESS_LABELS):
+            raise ValueError("lateness histogram has the wrong number of buckets")
+        waterings, unscheduled, on_time = int(data["waterings"]), int(data["unscheduled_waterings"]), int(data["on_time"])
+        hours_sum = float(data["lateness_hours_sum"])
+        if not math.isfinite(hours_sum):
+            raise ValueError("lateness_hours_sum is not finite")
+        self.waterings, self.unscheduled_waterings, self.on_time = waterings, unscheduled, on_time
+        self.lateness_hours_sum = hours_sum
+        self.lateness = lateness
+
+
+_global = _Aggregate()
+
+
+def _due_at(plant):
+    if plant["last_watered"] is None or not plant["watering_interval_days"]:
+        return None
+    return plant["last_watered"] + plant["watering_interval_days"] * DAY_SECONDS
+
+
+def _due_day(plant):
+    due_at = _due_at(plant)
+    return None if due_at is None else _day(due_at)
+
+
+def _check_timestamp(name, value):
+    if value is not None and not MIN_TIMESTAMP <= value <= time.time() + MAX_CLOCK_SKEW_SECONDS:
+        raise ValueError(f"{name} must be between 2000-01-01 and now")
+
+
+def _resolve_location(location):
+    """Normalized location, or "other" once GARDEN_MAX_LOCATIONS are tracked (call under _lock)"""
+    location = " ".join((location or "").lower().split())[:LOCATION_MAX_LENGTH] or UNASSIGNED_LOCATION
+    if location in _global.by_location or len(_global.by_location) < GARDEN_MAX_LOCATIONS:
+        return location
+    return OTHER_LOCATION
+
+
+def _validate(plant):
+    """Reject plant state whose due date could not be computed or stored"""
+    interval = plant["watering_interval_days"]
+    if interval is not None and not 0 < interval <= MAX_INTERVAL_DAYS:
+        raise ValueError(f"watering_interval_days must be in (0, {MAX_INTERVAL_DAYS}]")
+    _check_timestamp("last_watered", plant["last_watered"])
+
+
+def _user(user_id):
+    aggregate = _users.get(user_id)
+    if aggregate is None:
+        aggregate = _users[user_id] = _Aggregate()
+    return aggregate
+
+
+def _apply_plant(user_id, plant, due_day, sign):
+    _user(user_id).add_plant(plant, due_day, sign)
+    _global.add_plant(plant, due_day, sign)
+
+
+def upsert_plant(user_id, plant_id, genus=None, location=None, watering_interval_days=None, last_watered=None):
+    """
+    Add a plant or replace its tracked state
+
+    Args:
+        user_id: Owner (device) id
+        plant_id: Plant id, unique per user
+        genus: Genus or plant name; only genera the model knows are ranked
+        location: Free-form location ("kitchen", "balcony", ...), normalized and capped
+        watering_interval_days: Days between waterings
+        last_watered: Epoch seconds of the last watering
+
+    Returns:
+        Stored plant state
+
+    Raises:
+        ValueError: If the interval or timestamp is out of range
+    """
+    global _dirty
+    plant = {
+        "genus": known_genus(genus) if genus else None,
+        "location": location,
+        "watering_interval_days": watering_interval_days,
+        "last_watered": last_watered,
+    }
+    _validate(plant)
+    due_day = _due_day(plant)
+    with _lock:
+        previous = _plants.get((user_id, plant_id))
+        if previous is not None:
+            _apply_plant(user_id, previous, _due_day(previous), -1)
+        plant["location"] = _resolve_location(location)
+        _plants[(user_id, plant_id)] = plant
+        _apply_plant(user_id, plant, due_day, 1)
+        _dirty = True
+    return dict(plant, plant_id=plant_id)
+
+
+def remove_plant(user_id, plant_id):
+    """
+    Stop tracking a plant (its past waterings stay in the adherence counters)
+
+    Returns:
+        True if the plant was tracked
+    """
+    global _dirty
+    with _lock:
+        plant = _plants.pop((user_id, plant_id), None)
+        if plant is None:
+            return False
+        _apply_plant(user_id, plant, _due_day(plant), -1)
+        _dirty = True
+    return True
+
+
+def record_watering(user_id, plant_id, watered_at=None):
+    """
+    Count a watering against the plant's schedule and move its due date
+
+    Args:
+        user_id: Owner (device) id
+        plant_id: Tracked plant id
+        watered_at: Epoch seconds (default now)
+
+    Returns:
+        Hours late (negative when early, None without a schedule) and the next due time
+
+    Raises:
+        KeyError: If the plant is not tracked
+        ValueError: If watered_at is out of range or not after the last watering
+    """
+    global _dirty
+    watered_at = time.time() if watered_at is None else watered_at
+    _check_timestamp("watered_at", watered_at)
+    with _lock:
+        plant = _plants[(user_id, plant_id)]
+        due_at = _due_at(plant)
+        if plant["last_watered"] is not None and watered_at <= plant["last_watered"]:
+            raise ValueError("watered_at is not after the plant's last watering")
+        late_hours = None if due_at is None else (watered_at - due_at) / 3600
+        watered = dict(plant, last_watered=watered_at)
+        old_day, new_day = _due_day(plant), _due_day(watered)
+
+        _apply_plant(user_id, plant, old_day, -1)
+        _plants[(user_id, plant_id)] = plant = watered
+        _apply_plant(user_id, plant, new_day, 1)
+        _user(user_id).add_watering(late_hours)
+        _global.add_watering(late_hours)
+        _dirty = True
+        next_due = _due_at(plant)
+    return {
+        "plant_id": plant_id,
+        "hours_late": None if late_hours is None else round(late_hours, 2),
+        "on_time": None if late_hours is None else late_hours / 24 <= LATENESS_BOUNDS_DAYS[0],
+        "next_due_at": next_due,
+    }
+
+
+def get_user_stats(user_id):
+    """
+    Dashboard numbers for one user
+
+    Raises:
+        KeyError: If nothing has been recorded for the user
+    """
+    with _lock:
+        aggregate = _users[user_id]
+        return {
+            "user_id": user_id,
+            "plants": aggregate.plants,
+            "plants_by_location": dict(aggregate.by_location),
+            "genera": dict(aggregate.by_genus),
+            "overdue": aggregate.overdue(_day(time.time())),
+            "adherence": aggregate.adherence(),
+        }
+
+
+def get_global_stats(top=10):
+    """Dashboard numbers across all users, with the top genera by plant count"""
+    with _lock:
+        # Genera are limited to the model's classes and locations to GARDEN_MAX_LOCATIONS
+        return {
+            "users": len(_users),
+            "plants": _global.plants,
+            "plants_by_location": dict(_global.by_location.most_common(top)),
+            "popular_genera": [{"genus": g, "plants": n} for g, n in _global.by_genus.most_common(top)],
+            "overdue": _global.overdue(_day(time.time()), top),
+            "adherence": _global.adherence(),
+        }
+
+
+def save_snapshot(path=None):
+    """Write plant state and watering counters atomically; returns False when unchanged"""
+    global _dirty
+    path = Path(path or GARDEN_STATS_PATH)
+    with _lock:
+        if not _dirty:
+            return False
+        data = {
+            "saved_at": time.time(),
+            "plants": [[user_id, plant_id, plant] for (user_id, plant_id), plant in _plants.items()],
+            "users": {user_id: aggregate.counters() for user_id, aggregate in _users.items()},
+            "global": _global.counters(),
+        }
+        _dirty = False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    try:
+        with open(tmp, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        with _lock:
+            _dirty = True  # retry on the next snapshot
+        raise
+    return True
+
+
+def load_snapshot(path=None):
+    """
+    Replace the in-memory aggregates with a saved snapshot (if one exists)
+
+    Plants that fail validation are skipped, and an unreadable snapshot is
+    ignored, so a bad file never keeps the app from starting.
+    """
+    global _global, _dirty
+    path = Path(path or GARDEN_STATS_PATH)
+    if not path.exists():
+        return False
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        plants, users, global_counters = data["plants"], data["users"], data["global"]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"[GardenStats] Ignoring unreadable snapshot {path}: {e}")
+        return False
+
+    skipped = 0
+    with _lock:
+        _plants.clear()
+        _users.clear()
+        _global = _Aggregate()
+        for row in plants:
+            try:
+                user_id, plant_id, plant = row
+                plant = {key: plant[key] for key in ("genus", "location", "watering_interval_days", "last_watered")}
+                _validate(plant)
+                due_day = _due_day(plant)
+                plant["genus"] = known_genus(plant["genus"]) if plant["genus"] else None
+                plant["location"] = _resolve_location(plant["location"])
+            except (ValueError, KeyError, TypeError, AttributeError):
+                skipped += 1
+                continue
+            _plants[(user_id, plant_id)] = plant
+            _apply_plant(user_id, plant, due_day, 1)
+        for user_id, counters in users.items():
+            try:
+                _user(user_id).restore_counters(counters)
+            except (ValueError, KeyError, TypeError):
+                skipped += 1
+        try:
+            _global.restore_counters(global_counters)
+        except (ValueError, KeyError, TypeError):
+            skipped += 1
+        _dirty = bool(skipped)
+    if skipped:
+        print(f"[GardenStats] Skipped {skipped} invalid snapshot entries")
+    print(f"[GardenStats] Loaded {len(_plants)} plants for {len(_users)} users from {path}")
+    return True
+
+
+async def snapshot_loop():
+    """Persist the aggregates every GARDEN_STATS_SNAPSHOT_SECONDS while they change"""
+    while True:
+        await asyncio.sleep(GARDEN_STATS_SNAPSHOT_SECONDS)
+        try:
+            await asyncio.to_thread(save_snapshot)
+        except OSError as e:
+            print(f"[GardenStats] Snapshot failed: {e}")
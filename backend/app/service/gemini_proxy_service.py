@@ -0,0 +1,312 @@
+"""
+Gemini proxy with a shared, genus-keyed response cache
+
+Care questions are built from fixed prompt templates and keyed by
+(topic, genus), so "Ficus lyrata", "ficus" and "Fiddle leaf fig (Ficus)" all
+share one cached answer. Only genera the model knows are accepted, so client
+text never reaches the prompt and the cache has a fixed key space. Identical requests that arrive while
+an upstream call is in flight wait on that call instead of starting their own.
+Answers are kept in a SQLite store bounded by entry count and total size,
+with a TTL, so they survive restarts.
+"""
+import asyncio
+import importlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from .plant_classification_service import known_genus
+
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash-lite")
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta")
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "30"))
+# "gemini", "stub", or "package.module:factory" returning an object with generate(prompt)
+GEMINI_UPSTREAM = os.getenv("GEMINI_UPSTREAM", "gemini")
+
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+GEMINI_CACHE_PATH = Path(os.getenv("GEMINI_CACHE_PATH", str(DATA_DIR / "gemini_cache.sqlite3")))
+GEMINI_CACHE_TTL = float(os.getenv("GEMINI_CACHE_TTL", str(7 * 24 * 3600)))
+GEMINI_CACHE_MAX_ENTRIES = int(os.getenv("GEMINI_CACHE_MAX_ENTRIES", "20000"))
+GEMINI_CACHE_MAX_MB = float(os.getenv("GEMINI_CACHE_MAX_MB", "64"))
+
+GEMINI_PREWARM_TOP = int(os.getenv("GEMINI_PREWARM_TOP", "0"))  # 0 disables pre-warming
+GEMINI_PREWARM_GENERA = os.getenv("GEMINI_PREWARM_GENERA", "")
+GEMINI_PREWARM_TOPICS = os.getenv("GEMINI_PREWARM_TOPICS", "care")
+GEMINI_PREWARM_CONCURRENCY = int(os.getenv("GEMINI_PREWARM_CONCURRENCY", "4"))
+
+PROMPT_TEMPLATES = {
+    "care": "Give concise care instructions for houseplants of the genus {genus}: watering, light, "
+            "soil, humidity and temperature. Answer in under 150 words of plain ASCII text.",
+    "watering": "How often and how much should plants of the genus {genus} be watered, and what are "
+                "the signs of over- and under-watering? Answer in under 100 words of plain ASCII text.",
+    "light": "What light conditions do plants of the genus {genus} need indoors? "
+             "Answer in under 80 words of plain ASCII text.",
+    "problems": "List the most common pests, diseases and care problems of plants of the genus {genus} "
+                "and how to fix each. Answer in under 150 words of plain ASCII text.",
+    "fun_fact": "Tell one short, surprising fact about plants of the genus {genus}. "
+                "Answer in one or two sentences of plain ASCII text.",
+}
+
+
+class UpstreamError(RuntimeError):
+    pass
+
+
+class GeminiUpstream:
+    """Text-only generateContent call over the Gemini REST API"""
+
+    def __init__(self, api_key=GEMINI_API_KEY, model=GEMINI_MODEL, base_url=GEMINI_BASE_URL, timeout=GEMINI_TIMEOUT):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def generate(self, prompt):
+        if not self.api_key:
+            raise UpstreamError("GEMINI_API_KEY is not configured")
+        request = urllib.request.Request(
+            f"{self.base_url}/models/{self.model}:generateContent",
+            data=json.dumps({"contents": [{"parts": [{"text": prompt}]}]}).encode("utf-8"),
+            headers={"Content-Type": "application/json", "x-goog-api-key": self.api_key},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = json.loads(response.read())
+        except (urllib.error.URLError, TimeoutError, ValueError) as e:
+            raise UpstreamError(f"Gemini request failed: {e}") from e
+        try:
+            parts = body["candidates"][0]["content"]["parts"]
+        except (KeyError, IndexError) as e:
+            raise UpstreamError("Gemini returned no candidates") from e
+        return "".join(part.get("text", "") for part in parts).strip()
+
+
+class StubUpstream:
+    """Deterministic local stand-in for tests and offline development"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = 0
+
+    def generate(self, prompt):
+        self.calls += 1
+        time.sleep(self.delay)
+        return f"[stub] {prompt}"
+
+
+def make_upstream(spec=GEMINI_UPSTREAM):
+    if spec == "gemini":
+        return GeminiUpstream()
+    if spec == "stub":
+        return StubUpstream()
+    module_name, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attr)()
+
+
+class ResponseStore:
+    """SQLite response cache with a TTL, evicting least recently used entries past its bounds"""
+
+    def __init__(self, path=GEMINI_CACHE_PATH, ttl=GEMINI_CACHE_TTL,
+                 max_entries=GEMINI_CACHE_MAX_ENTRIES, max_bytes=int(GEMINI_CACHE_MAX_MB * 1024 * 1024)):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        path = str(path)
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+                "size INTEGER NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+            self._conn.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return row[0]
+
+    def put(self, key, response):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, response, len(response.encode("utf-8")), now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        self._conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        removed = 0
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            count -= 1
+            total -= size
+            removed += 1
+        print(f"[GeminiProxy] Evicted {removed} cached responses ({count} entries, {total / 1e6:.1f} MB left)")
+
+    def stats(self):
+        with self._lock:
+            count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"entries": count, "bytes": total, "max_entries": self.max_entries, "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl}
+
+
+def normalize_request(plant_name, topic="care"):
+    """
+    Returns:
+        (cache key, genus, prompt) tuple
+
+    Raises:
+        ValueError: If the topic is unknown or the name has no genus from label_mapping.json
+    """
+    if topic not in PROMPT_TEMPLATES:
+        raise ValueError(f"Unknown topic '{topic}'. Choose from: {', '.join(PROMPT_TEMPLATES)}")
+    genus = known_genus(plant_name)
+    if not genus:
+        raise ValueError("No known genus in the plant name")
+    key = f"{GEMINI_MODEL}:{topic}:{genus.lower()}"
+    return key, genus, PROMPT_TEMPLATES[topic].format(genus=genus)
+
+
+_store = None
+_upstream = None
+_inflight = {}
+_stats = {"requests": 0, "hits": 0, "misses": 0, "coalesced": 0, "upstream_calls": 0,
+          "upstream_errors": 0, "upstream_seconds": 0.0}
+
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = ResponseStore()
+    return _store
+
+
+def get_upstream():
+    global _upstream
+    if _upstream is None:
+        _upstream = make_upstream()
+    return _upstream
+
+
+def set_upstream(upstream):
+    """Swap the upstream (e.g. a StubUpstream in tests)"""
+    global _upstream
+    _upstream = upstream
+
+
+async def _call_upstream(key, prompt):
+    start = time.perf_counter()
+    _stats["upstream_calls"] += 1
+    try:
+        response = await asyncio.to_thread(get_upstream().generate, prompt)
+    except Exception:
+        _stats["upstream_errors"] += 1
+        raise
+    finally:
+        _stats["upstream_seconds"] += time.perf_counter() - start
+    await asyncio.to_thread(get_store().put, key, response)
+    return response
+
+
+async def ask(plant_name, topic="care"):
+    """
+    Answer a care question about a plant, from cache when possible
+
+    Returns:
+        Dictionary with the genus, topic, answer text and where it came from
+        ("cache", "upstream" or "coalesced")
+    """
+    key, genus, prompt = normalize_request(plant_name, topic)
+    _stats["requests"] += 1
+
+    cached = await asyncio.to_thread(get_store().get, key)
+    if cached is not None:
+        _stats["hits"] += 1
+        return {"genus": genus, "topic": topic, "answer": cached, "source": "cache"}
+
+    pending = _inflight.get(key)
+    if pending is not None:
+        _stats["coalesced"] += 1
+        # shield: a waiter disconnecting must not cancel the shared call
+        return {"genus": genus, "topic": topic, "answer": await asyncio.shield(pending), "source": "coalesced"}
+
+    _stats["misses"] += 1
+    task = asyncio.ensure_future(_call_upstream(key, prompt))
+    _inflight[key] = task
+    task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return {"genus": genus, "topic": topic, "answer": await asyncio.shield(task), "source": "upstream"}
+
+
+def prewarm_genera(top_n=GEMINI_PREWARM_TOP, ranked=()):
+    """
+    Genera to pre-warm: GEMINI_PREWARM_GENERA if set, else the first top_n of ranked
+
+    Args:
+        ranked: Genera by actual usage, most used first (e.g. garden statistics)
+    """
+    if GEMINI_PREWARM_GENERA.strip():
+        ranked = GEMINI_PREWARM_GENERA.split(",")
+    genera = []
+    for name in ranked:
+        genus = known_genus(name)
+        if genus and genus not in genera:
+            genera.append(genus)
+    return genera[:top_n or None]
+
+
+async def prewarm(genera=None, topics=None, concurrency=GEMINI_PREWARM_CONCURRENCY):
+    """Fill the cache for the given genera and topics; already cached entries cost nothing"""
+    genera = prewarm_genera() if genera is None else genera
+    topics = [t.strip() for t in GEMINI_PREWARM_TOPICS.split(",") if t.strip()] if topics is None else topics
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    counts = {"cache": 0, "upstream": 0, "coalesced": 0, "errors": 0}
+
+    async def warm(genus, topic):
+        async with semaphore:
+            try:
+                counts[(await ask(genus, topic))["source"]] += 1
+            except Exception as e:
+                counts["errors"] += 1
+                print(f"[GeminiProxy] Pre-warm failed for {genus}/{topic}: {e}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(warm(genus, topic) for genus in genera for topic in topics))
+    print(f"[GeminiProxy] Pre-warmed {len(genera)} genera x {len(topics)} topics in "
+          f"{time.perf_counter() - start:.1f}s: {counts}")
+    return counts
+
+
+def get_proxy_stats():
+    stats = dict(_stats)
+    calls = stats["upstream_calls"]
+    stats["avg_upstream_ms"] = round(stats.pop("upstream_seconds") / calls * 1000, 1) if calls else None
+    stats["hit_rate"] = round((stats["hits"] + stats["coalesced"]) / stats["requests"], 4) if stats["requests"] else None
+    stats["in_flight"] = len(_inflight)
+    stats["store"] = get_store().stats()
+    return stats
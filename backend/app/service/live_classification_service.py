@@ -0,0 +1,176 @@
+"""
+Live camera classification sessions
+
+Each WebSocket connection owns a LiveStream: a single latest-frame slot that
+the receiver overwrites (counting the frame it replaced as dropped), a
+preallocated model input buffer that every frame is normalized into, and the
+last pushed result used to debounce updates. A change that arrives inside the
+update interval is held back and flushed once the interval ends, so the final
+result always reaches the client. Inference always runs on the
+newest frame, so a slow model lowers the processed frame rate instead of
+building up latency.
+"""
+import asyncio
+import itertools
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from .plant_classification_service import classify_prepared, decode_image, get_input_size, prepare_input
+
+LIVE_MIN_UPDATE_INTERVAL_MS = float(os.getenv("LIVE_MIN_UPDATE_INTERVAL_MS", "150"))
+LIVE_CONFIDENCE_DELTA = float(os.getenv("LIVE_CONFIDENCE_DELTA", "0.05"))
+LIVE_MAX_FRAME_BYTES = int(os.getenv("LIVE_MAX_FRAME_BYTES", str(512 * 1024)))
+LIVE_TOP_K = int(os.getenv("LIVE_TOP_K", "3"))
+
+_FPS_WINDOW_SECONDS = 5.0
+
+_ids = itertools.count(1)
+_streams_lock = threading.Lock()
+_streams = {}
+
+
+class LiveStream:
+    def __init__(self, client=None, top_k=LIVE_TOP_K):
+        self.id = next(_ids)
+        self.client = client
+        self.top_k = top_k
+        self.started_at = time.time()
+
+        size = get_input_size()
+        self.buffer = np.empty((1, 3, size, size), dtype=np.float32)
+
+        self._latest = None
+        self._frame_ready = asyncio.Event()
+        self._last_sent = None
+        self._last_sent_at = 0.0
+        self._pending = None
+        self._processed_times = deque()
+
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.throttled = 0
+        self.updates_sent = 0
+        self.inference_ms = 0.0
+
+    def offer(self, frame_bytes):
+        """Store a new frame, replacing (and dropping) one not yet picked up"""
+        self.received += 1
+        if self._latest is not None:
+            self.dropped += 1
+        self._latest = frame_bytes
+        self._frame_ready.set()
+
+    async def next_frame(self):
+        """Wait for and take the newest pending frame"""
+        await self._frame_ready.wait()
+        self._frame_ready.clear()
+        frame, self._latest = self._latest, None
+        return frame
+
+    def classify(self, frame_bytes):
+        """Decode a frame into the preallocated buffer and classify it (blocking)"""
+        start = time.perf_counter()
+        img = decode_image(frame_bytes)
+        result = classify_prepared(prepare_input(img, self.buffer.shape[2], out=self.buffer), self.top_k)
+        now = time.perf_counter()
+        self.inference_ms = (now - start) * 1000
+        self.processed += 1
+        self._processed_times.append(now)
+        return result
+
+    def should_send(self, result):
+        """Debounce: push only a new top genus or a meaningful confidence change, rate-limited"""
+        top = result["top_prediction"]
+        if self._last_sent is not None:
+            same_genus = top["genus"] == self._last_sent["genus"]
+            if same_genus and abs(top["confidence"] - self._last_sent["confidence"]) < LIVE_CONFIDENCE_DELTA:
+                self._pending = None  # back to what the client already shows
+                return False
+            if self._interval_remaining() > 0:
+                # Too soon: hold it back so the trailing flush sends it
+                self._pending = (self.processed, result)
+                return False
+        self._mark_sent(top)
+        return True
+
+    def flush_delay(self):
+        """Seconds until a held-back result may be sent (None when nothing is pending)"""
+        if self._pending is None:
+            return None
+        return self._interval_remaining()
+
+    def take_due_update(self):
+        """
+        Trailing edge of the debounce
+        
+        Returns:
+            (frame number, result) of the held-back result once the update interval
+            has passed, else None
+        """
+        if self._pending is None or self.flush_delay() > 0:
+            return None
+        pending, self._pending = self._pending, None
+        self._mark_sent(pending[1]["top_prediction"])
+        return pending
+
+    def _interval_remaining(self):
+        elapsed_ms = (time.perf_counter() - self._last_sent_at) * 1000
+        return max(0.0, (LIVE_MIN_UPDATE_INTERVAL_MS - elapsed_ms) / 1000)
+
+    def _mark_sent(self, top):
+        self._last_sent = top
+        self._last_sent_at = time.perf_counter()
+        self._pending = None
+        self.updates_sent += 1
+
+    def fps(self):
+        """Processed frames per second over the recent window"""
+        cutoff = time.perf_counter() - _FPS_WINDOW_SECONDS
+        times = self._processed_times
+        while times and times[0] < cutoff:
+            times.popleft()
+        return len(times) / _FPS_WINDOW_SECONDS
+
+    def stats(self):
+        return {
+            "id": self.id,
+            "client": self.client,
+            "connected_seconds": round(time.time() - self.started_at, 1),
+            "frames_received": self.received,
+            "frames_processed": self.processed,
+            "frames_dropped": self.dropped,
+            "errors": self.errors,
+            "frames_throttled": self.throttled,
+            "updates_sent": self.updates_sent,
+            "fps": round(self.fps(), 2),
+            "last_inference_ms": round(self.inference_ms, 2),
+        }
+
+
+def open_stream(client=None, top_k=LIVE_TOP_K):
+    """Create and register a LiveStream for a new connection"""
+    stream = LiveStream(client, top_k)
+    with _streams_lock:
+        _streams[stream.id] = stream
+    return stream
+
+
+def close_stream(stream):
+    with _streams_lock:
+        _streams.pop(stream.id, None)
+
+
+def get_live_stats():
+    """Per-connection frame rate and drop counts for all open live streams"""
+    with _streams_lock:
+        streams = list(_streams.values())
+    return {
+        "active_connections": len(streams),
+        "connections": [stream.stats() for stream in streams],
+    }
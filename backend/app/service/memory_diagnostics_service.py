@@ -0,0 +1,195 @@
+"""
+Opt-in memory accounting for long-running API workers
+
+Reports process RSS, ONNX Runtime arena settings and growth, tracemalloc top
+allocators diffed against a baseline snapshot, and peak allocation per tracked
+operation. A soft RSS ceiling is logged and, when MEMORY_RECYCLE_SIGTERM=1
+says a process manager will restart the worker, triggers a graceful recycle
+(SIGTERM to self; uvicorn/gunicorn finish in-flight requests and the process
+manager starts a fresh worker).
+"""
+import asyncio
+import functools
+import os
+import signal
+import threading
+import time
+import tracemalloc
+
+MEMORY_DIAGNOSTICS = os.getenv("MEMORY_DIAGNOSTICS", "0") == "1"
+TRACEMALLOC_FRAMES = int(os.getenv("TRACEMALLOC_FRAMES", "1"))
+MEMORY_SOFT_LIMIT_MB = float(os.getenv("MEMORY_SOFT_LIMIT_MB", "0"))  # 0 disables recycling
+MEMORY_CHECK_INTERVAL = float(os.getenv("MEMORY_CHECK_INTERVAL", "30"))
+# Only safe under a process manager; a lone uvicorn process would just stop
+MEMORY_RECYCLE_SIGTERM = os.getenv("MEMORY_RECYCLE_SIGTERM", "0") == "1"
+
+# ONNX Runtime does not expose arena counters through its Python API; these
+# settings bound arena growth and RSS deltas around session.run() approximate it.
+ORT_ENABLE_CPU_ARENA = os.getenv("ORT_ENABLE_CPU_ARENA", "1") == "1"
+
+_lock = threading.Lock()
+_baseline = None
+_operation_stats = {}
+_ort_stats = {"runs": 0, "rss_growth_bytes": 0, "max_run_rss_growth_bytes": 0}
+_recycle_requested = False
+_nesting = threading.local()
+
+
+def enable():
+    """Start tracemalloc and take the initial baseline snapshot"""
+    global MEMORY_DIAGNOSTICS, _baseline
+    MEMORY_DIAGNOSTICS = True
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    _baseline = tracemalloc.take_snapshot()
+    print(f"[MemoryDiagnostics] tracemalloc started ({TRACEMALLOC_FRAMES} frame(s))")
+
+
+def get_rss_bytes():
+    """Current resident set size (Linux /proc, falling back to peak RSS elsewhere)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource  # Unix only
+        # ru_maxrss is KiB on Linux, bytes on macOS; this is the peak, not current
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def ort_session_options():
+    """SessionOptions applying the configured arena policy"""
+    import onnxruntime as ort
+    options = ort.SessionOptions()
+    options.enable_cpu_mem_arena = ORT_ENABLE_CPU_ARENA
+    return options
+
+
+class _OperationStats:
+    __slots__ = ("calls", "peak_bytes", "last_peak_bytes", "rss_growth_bytes")
+
+    def __init__(self):
+        self.calls = 0
+        self.peak_bytes = 0
+        self.last_peak_bytes = 0
+        self.rss_growth_bytes = 0
+
+    def summary(self):
+        return {
+            "calls": self.calls,
+            "peak_alloc_bytes": self.peak_bytes,
+            "last_peak_alloc_bytes": self.last_peak_bytes,
+            "rss_growth_bytes": self.rss_growth_bytes,
+        }
+
+
+def track_memory(name, ort_run=False):
+    """
+    Decorator recording peak Python allocation and RSS growth per call
+
+    Peaks come from tracemalloc's process-wide peak counter, so overlapping
+    calls on other threads can inflate a reading, and a call nested inside
+    another tracked call reports an upper bound (only the outermost call
+    resets the peak). Costs one flag check when diagnostics are disabled.
+
+    Args:
+        name: Operation name in the report
+        ort_run: Also attribute the RSS growth to ONNX Runtime
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not MEMORY_DIAGNOSTICS or not tracemalloc.is_tracing():
+                return func(*args, **kwargs)
+            depth = getattr(_nesting, "depth", 0)
+            rss_before = get_rss_bytes()
+            current_before, _ = tracemalloc.get_traced_memory()
+            if depth == 0:
+                tracemalloc.reset_peak()
+            _nesting.depth = depth + 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _nesting.depth = depth
+                _, peak = tracemalloc.get_traced_memory()
+                rss_growth = max(0, get_rss_bytes() - rss_before)
+                with _lock:
+                    stats = _operation_stats.setdefault(name, _OperationStats())
+                    stats.calls += 1
+                    stats.last_peak_bytes = max(0, peak - current_before)
+                    stats.peak_bytes = max(stats.peak_bytes, stats.last_peak_bytes)
+                    stats.rss_growth_bytes += rss_growth
+                    if ort_run:
+                        _ort_stats["runs"] += 1
+                        _ort_stats["rss_growth_bytes"] += rss_growth
+                        _ort_stats["max_run_rss_growth_bytes"] = max(_ort_stats["max_run_rss_growth_bytes"], rss_growth)
+        return wrapper
+    return decorator
+
+
+def take_baseline():
+    """Replace the baseline snapshot that top_allocators() diffs against"""
+    global _baseline
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("Memory diagnostics are not enabled (set MEMORY_DIAGNOSTICS=1)")
+    _baseline = tracemalloc.take_snapshot()
+    return {"baseline_taken_at": time.time(), "traced_bytes": tracemalloc.get_traced_memory()[0]}
+
+
+def top_allocators(limit=20, group_by="lineno"):
+    """Allocation sites that grew the most since the baseline snapshot"""
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("Memory diagnostics are not enabled (set MEMORY_DIAGNOSTICS=1)")
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    diff = snapshot.compare_to(_baseline, group_by) if _baseline is not None else snapshot.statistics(group_by)
+    top = []
+    for stat in diff[:limit]:
+        frame = stat.traceback[0]
+        top.append({
+            "location": f"{frame.filename}:{frame.lineno}",
+            "size_bytes": stat.size,
+            "size_diff_bytes": getattr(stat, "size_diff", stat.size),
+            "count": stat.count,
+            "count_diff": getattr(stat, "count_diff", stat.count),
+        })
+    return top
+
+
+def memory_report():
+    """Process memory summary for the diagnostics endpoint"""
+    traced, traced_peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (None, None)
+    with _lock:
+        operations = {name: stats.summary() for name, stats in _operation_stats.items()}
+        ort_stats = dict(_ort_stats)
+    return {
+        "enabled": MEMORY_DIAGNOSTICS,
+        "pid": os.getpid(),
+        "rss_bytes": get_rss_bytes(),
+        "soft_limit_bytes": int(MEMORY_SOFT_LIMIT_MB * 1024 * 1024) or None,
+        "recycle_requested": _recycle_requested,
+        "recycle_sigterm": MEMORY_RECYCLE_SIGTERM,
+        "tracemalloc": {"traced_bytes": traced, "peak_bytes": traced_peak},
+        "onnxruntime": {"cpu_mem_arena": ORT_ENABLE_CPU_ARENA, **ort_stats},
+        "operations": operations,
+    }
+
+
+async def memory_watchdog():
+    """Recycle this worker gracefully (or only warn) once RSS crosses the soft limit"""
+    global _recycle_requested
+    limit = MEMORY_SOFT_LIMIT_MB * 1024 * 1024
+    while not _recycle_requested:
+        await asyncio.sleep(MEMORY_CHECK_INTERVAL)
+        rss = get_rss_bytes()
+        if rss > limit:
+            _recycle_requested = True
+            if not MEMORY_RECYCLE_SIGTERM:
+                print(f"[MemoryDiagnostics] RSS {rss / 1e6:.0f} MB exceeds soft limit "
+                      f"{MEMORY_SOFT_LIMIT_MB:.0f} MB in worker {os.getpid()}; restart it "
+                      f"(set MEMORY_RECYCLE_SIGTERM=1 under a process manager to recycle automatically)")
+                return
+            print(f"[MemoryDiagnostics] RSS {rss / 1e6:.0f} MB exceeds soft limit "
+                  f"{MEMORY_SOFT_LIMIT_MB:.0f} MB, recycling worker {os.getpid()}")
+            os.kill(os.getpid(), signal.SIGTERM)
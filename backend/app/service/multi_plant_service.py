@@ -0,0 +1,188 @@
+"""
+Multi-plant detection by classifying a grid of crops in one batched call
+
+For each window scale the decoded image is resized once so a window is exactly
+the model's input size, and the crops are strided views into that resized
+image (np.lib.stride_tricks.sliding_window_view); the crops themselves are
+never copied before the normalization into the batch array. Confident crops of the same genus
+that overlap are merged into one region, and lower-confidence regions of a
+different genus that mostly cover a stronger one are suppressed.
+"""
+import os
+import time
+
+import cv2 as cv
+import numpy as np
+
+from .plant_classification_service import batch_probabilities, format_predictions, get_genus_name, get_input_size
+
+# Window side as a fraction of the image's shorter side
+MULTI_WINDOW_SCALES = [float(s) for s in os.getenv("MULTI_WINDOW_SCALES", "1.0,0.6").split(",") if s.strip()]
+MULTI_WINDOW_OVERLAP = float(os.getenv("MULTI_WINDOW_OVERLAP", "0.5"))
+MULTI_MAX_CROPS = int(os.getenv("MULTI_MAX_CROPS", "24"))
+MULTI_MIN_CONFIDENCE = float(os.getenv("MULTI_MIN_CONFIDENCE", "0.35"))
+MULTI_MERGE_OVERLAP = float(os.getenv("MULTI_MERGE_OVERLAP", "0.3"))
+MULTI_SUPPRESS_OVERLAP = float(os.getenv("MULTI_SUPPRESS_OVERLAP", "0.7"))
+# Longer side over shorter side; the resized image grows with it, so extreme panoramas are refused
+MULTI_MAX_ASPECT_RATIO = float(os.getenv("MULTI_MAX_ASPECT_RATIO", "10"))
+
+
+def _window_grid(height, width, scale, size, overlap, max_windows=None):
+    """
+    Resized image dimensions and strided grid for one window scale
+
+    The resized dimensions are snapped so the windows tile the image exactly
+    with a constant stride, which keeps the crops a plain strided slice. With
+    max_windows the stride is widened (less overlap, or gaps between windows)
+    until the grid fits.
+
+    Returns:
+        (resized_height, resized_width, stride, rows, cols)
+    """
+    factor = size / (scale * min(height, width))
+    stride = max(1, int(round(size * (1.0 - overlap))))
+    while True:
+        rows = max(1, int(round((height * factor - size) / stride)) + 1)
+        cols = max(1, int(round((width * factor - size) / stride)) + 1)
+        if max_windows is None or rows * cols <= max_windows:
+            return size + stride * (rows - 1), size + stride * (cols - 1), stride, rows, cols
+        stride = int(stride * 1.25) + 1
+
+
+def plan_crops(height, width, size, scales=None, overlap=None, max_crops=None):
+    """
+    Window grids per scale, coarsest first, never exceeding max_crops in total
+
+    The coarsest scale is always planned (thinned out to max_crops if needed);
+    finer scales are added while they fit.
+
+    Raises:
+        ValueError: If the image is more elongated than MULTI_MAX_ASPECT_RATIO
+    """
+    scales = MULTI_WINDOW_SCALES if scales is None else scales
+    overlap = MULTI_WINDOW_OVERLAP if overlap is None else overlap
+    max_crops = MULTI_MAX_CROPS if max_crops is None else max_crops
+    if max(height, width) > MULTI_MAX_ASPECT_RATIO * min(height, width):
+        raise ValueError(f"Image aspect ratio exceeds {MULTI_MAX_ASPECT_RATIO:g}:1, multi mode is not supported")
+    plan = []
+    total = 0
+    for scale in sorted(scales, reverse=True):
+        grid = _window_grid(height, width, scale, size, overlap, max_crops if not plan else None)
+        count = grid[3] * grid[4]
+        if plan and total + count > max_crops:
+            break
+        plan.append(grid)
+        total += count
+    return plan, total
+
+
+def extract_crops(img, plan, size):
+    """
+    Normalize all planned crops into one (N, 3, size, size) float32 batch
+
+    Returns:
+        (batch, boxes) where boxes are (x, y, width, height) in original image pixels
+    """
+    height, width = img.shape[:2]
+    total = sum(rows * cols for _, _, _, rows, cols in plan)
+    batch = np.empty((total, 3, size, size), dtype=np.float32)
+    boxes = []
+    offset = 0
+    for resized_h, resized_w, stride, rows, cols in plan:
+        # Same interpolation as prepare_input; one small CHW copy keeps the crop reads contiguous
+        resized = np.ascontiguousarray(cv.resize(img, (resized_w, resized_h)).transpose(2, 0, 1))
+        windows = np.lib.stride_tricks.sliding_window_view(resized, (size, size), axis=(1, 2))
+        # (3, rows, cols, size, size) -> (rows, cols, 3, size, size), still a view
+        windows = windows[:, ::stride, ::stride].transpose(1, 2, 0, 3, 4)
+        target = batch[offset:offset + rows * cols].reshape(rows, cols, 3, size, size)
+        np.divide(windows, np.float32(255.0), out=target)
+        offset += rows * cols
+
+        scale_y, scale_x = height / resized_h, width / resized_w
+        for row in range(rows):
+            for col in range(cols):
+                boxes.append((col * stride * scale_x, row * stride * scale_y, size * scale_x, size * scale_y))
+    return batch, boxes
+
+
+def _overlap(a, b):
+    """Intersection area over the smaller box's area"""
+    ix = max(0.0, min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0]))
+    iy = max(0.0, min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1]))
+    return (ix * iy) / min(a[2] * a[3], b[2] * b[3])
+
+
+def _union(a, b):
+    x0, y0 = min(a[0], b[0]), min(a[1], b[1])
+    x1, y1 = max(a[0] + a[2], b[0] + b[2]), max(a[1] + a[3], b[1] + b[3])
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def merge_regions(boxes, probabilities, min_confidence=None):
+    """
+    Group confident crops into regions
+
+    Returns:
+        List of {"box", "class_id", "confidence", "crop_index", "crops"} sorted by confidence
+    """
+    min_confidence = MULTI_MIN_CONFIDENCE if min_confidence is None else min_confidence
+    top_ids = probabilities.argmax(axis=1)
+    top_conf = probabilities[np.arange(len(top_ids)), top_ids]
+
+    regions = []
+    for index in np.argsort(-top_conf):
+        if top_conf[index] < min_confidence:
+            break
+        box, class_id = boxes[index], int(top_ids[index])
+        for region in regions:
+            overlap = _overlap(region["box"], box)
+            if region["class_id"] == class_id and overlap >= MULTI_MERGE_OVERLAP:
+                region["box"] = _union(region["box"], box)
+                region["crops"] += 1
+                break
+            if region["class_id"] != class_id and overlap >= MULTI_SUPPRESS_OVERLAP:
+                break  # a stronger region of another genus already covers this crop
+        else:
+            regions.append({"box": box, "class_id": class_id, "confidence": float(top_conf[index]),
+                            "crop_index": int(index), "crops": 1})
+    return regions
+
+
+def classify_regions(img, top_k=3):
+    """
+    Detect and classify several plants in one decoded image
+
+    Returns:
+        Dictionary with one prediction per region and the crop/latency summary
+    """
+    size = get_input_size()
+    height, width = img.shape[:2]
+    start = time.perf_counter()
+    plan, _ = plan_crops(height, width, size)
+    batch, boxes = extract_crops(img, plan, size)
+    prepared = time.perf_counter()
+    probabilities = batch_probabilities(batch)
+    inferred = time.perf_counter()
+
+    results = []
+    for region in merge_regions(boxes, probabilities):
+        x, y, w, h = region["box"]
+        prediction = format_predictions(probabilities[region["crop_index"]], top_k)
+        results.append({
+            "box": {"x": int(round(x)), "y": int(round(y)), "width": int(round(w)), "height": int(round(h))},
+            "genus": get_genus_name(region["class_id"]),
+            "confidence": region["confidence"],
+            "merged_crops": region["crops"],
+            "top_prediction": prediction["top_prediction"],
+            "all_predictions": prediction["all_predictions"],
+        })
+
+    return {
+        "mode": "multi",
+        "regions": results,
+        "image_size": {"width": width, "height": height},
+        "crop_count": len(boxes),
+        "preprocess_ms": round((prepared - start) * 1000, 2),
+        "inference_ms": round((inferred - prepared) * 1000, 2),
+        "model_type": "ONNX FP32",
+    }
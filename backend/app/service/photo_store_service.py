@@ -0,0 +1,276 @@
+"""
+Content-addressed photo store backed by append-only pack files
+
+Uploads are keyed by the SHA-256 of their bytes, so the same photo uploaded
+twice is stored once. The original and its fixed-size square JPEG thumbnails
+(made once at ingest from the array classification already decoded) are
+appended together to the current pack file; packs are never rewritten, and a
+new one is started past PHOTO_PACK_MAX_MB. A small SQLite index maps
+(photo, variant) to (pack, offset, length). Reads return memoryview slices of
+read-only memory maps of the packs, so serving a photo does not copy it.
+"""
+import fcntl
+import hashlib
+import mmap
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import cv2 as cv
+
+from .memory_diagnostics_service import track_memory
+from .plant_classification_service import decode_image
+
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+PHOTO_STORE_DIR = Path(os.getenv("PHOTO_STORE_DIR", str(DATA_DIR / "photos")))
+PHOTO_PACK_MAX_MB = float(os.getenv("PHOTO_PACK_MAX_MB", "256"))
+PHOTO_MAX_MB = float(os.getenv("PHOTO_MAX_MB", "15"))
+PHOTO_STORE_MAX_GB = float(os.getenv("PHOTO_STORE_MAX_GB", "20"))
+PHOTO_THUMBNAIL_SIZES = [int(s) for s in os.getenv("PHOTO_THUMBNAIL_SIZES", "128,384").split(",") if s.strip()]
+PHOTO_THUMBNAIL_QUALITY = int(os.getenv("PHOTO_THUMBNAIL_QUALITY", "82"))
+
+ORIGINAL = "original"
+
+# Leading bytes -> content type of the stored original
+_SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF8", "image/gif"),
+    (b"BM", "image/bmp"),
+]
+
+
+class PhotoStoreFullError(RuntimeError):
+    pass
+
+
+def check_upload(image_bytes):
+    """
+    Reject uploads the store would refuse, before any work is done on them
+
+    Raises:
+        ValueError: If the upload is empty or larger than PHOTO_MAX_MB
+    """
+    if not image_bytes:
+        raise ValueError("Empty upload")
+    if len(image_bytes) > PHOTO_MAX_MB * 1024 * 1024:
+        raise ValueError(f"Photo is larger than {PHOTO_MAX_MB:g} MB")
+
+
+def sniff_content_type(data):
+    """Image media type from magic bytes (application/octet-stream if unknown)"""
+    for signature, content_type in _SIGNATURES:
+        if data.startswith(signature):
+            return content_type
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+def make_thumbnail(img, size, quality=PHOTO_THUMBNAIL_QUALITY):
+    """
+    Center-crop a decoded RGB image to a square and encode it as a size x size JPEG
+
+    Returns:
+        JPEG bytes
+    """
+    height, width = img.shape[:2]
+    side = min(height, width)
+    top, left = (height - side) // 2, (width - side) // 2
+    square = img[top:top + side, left:left + side]
+    interpolation = cv.INTER_AREA if side > size else cv.INTER_LINEAR
+    thumb = cv.resize(square, (size, size), interpolation=interpolation)
+    ok, encoded = cv.imencode(".jpg", cv.cvtColor(thumb, cv.COLOR_RGB2BGR), [cv.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("Could not encode thumbnail")
+    return encoded.tobytes()
+
+
+class PhotoStore:
+    """Pack files plus an index of where each photo variant lives"""
+
+    def __init__(self, directory=PHOTO_STORE_DIR, pack_max_bytes=int(PHOTO_PACK_MAX_MB * 1024 * 1024),
+                 thumbnail_sizes=PHOTO_THUMBNAIL_SIZES, max_bytes=int(PHOTO_STORE_MAX_GB * 1024 ** 3)):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.pack_max_bytes = pack_max_bytes
+        self.max_bytes = max_bytes
+        self.rejected_full = 0
+        self.thumbnail_sizes = sorted(set(thumbnail_sizes))
+        self.ingested = 0
+        self.deduplicated = 0
+        self._maps = {}  # pack number -> read-only mmap
+        self._lock = threading.Lock()
+        # Serializes appends between worker processes
+        self._pack_lock = open(self.directory / "packs.lock", "a+")
+        self._conn = sqlite3.connect(str(self.directory / "index.sqlite3"), check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS blobs (photo_id TEXT NOT NULL, variant TEXT NOT NULL, "
+                "pack INTEGER NOT NULL, offset INTEGER NOT NULL, length INTEGER NOT NULL, "
+                "content_type TEXT NOT NULL, width INTEGER, height INTEGER, created_at REAL NOT NULL, "
+                "PRIMARY KEY (photo_id, variant))"
+            )
+            self._conn.commit()
+
+    def _pack_path(self, pack):
+        return self.directory / f"pack-{pack:06d}.bin"
+
+    def _current_pack(self):
+        packs = sorted(self.directory.glob("pack-*.bin"))
+        return int(packs[-1].stem.split("-")[1]) if packs else 1
+
+    def _append(self, blobs):
+        """
+        Append blobs to the current pack (rolling over when full); returns (pack, offset) per blob
+
+        Raises:
+            PhotoStoreFullError: If the packs would grow past max_bytes
+        """
+        total = sum(len(blob) for blob in blobs)
+        fcntl.flock(self._pack_lock, fcntl.LOCK_EX)
+        try:
+            if sum(p.stat().st_size for p in self.directory.glob("pack-*.bin")) + total > self.max_bytes:
+                with self._lock:
+                    self.rejected_full += 1
+                raise PhotoStoreFullError(f"Photo store is full ({self.max_bytes / 1024 ** 3:g} GB)")
+            pack = self._current_pack()
+            path = self._pack_path(pack)
+            if path.exists() and path.stat().st_size and path.stat().st_size + total > self.pack_max_bytes:
+                pack += 1
+                path = self._pack_path(pack)
+            with open(path, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                locations = []
+                for blob in blobs:
+                    locations.append((pack, offset))
+                    f.write(blob)
+                    offset += len(blob)
+                f.flush()
+                os.fsync(f.fileno())
+        finally:
+            fcntl.flock(self._pack_lock, fcntl.LOCK_UN)
+        return locations
+
+    @track_memory("photo_store.ingest")
+    def ingest(self, image_bytes, img=None):
+        """
+        Store a photo and its thumbnails unless the same bytes are already stored
+
+        Args:
+            image_bytes: Encoded image as uploaded
+            img: The decoded RGB array if the caller already has it (skips a second decode)
+
+        Returns:
+            Photo info with "deduplicated" set when nothing new was written
+
+        Raises:
+            ValueError: If the upload is empty, too large or not a decodable image
+            PhotoStoreFullError: If storing it would exceed PHOTO_STORE_MAX_GB
+        """
+        check_upload(image_bytes)
+        photo_id = hashlib.sha256(image_bytes).hexdigest()
+        existing = self.info(photo_id)
+        if existing is not None:
+            with self._lock:
+                self.deduplicated += 1
+            return dict(existing, deduplicated=True)
+
+        if img is None:
+            img = decode_image(image_bytes)
+        height, width = img.shape[:2]
+        variants = [(ORIGINAL, image_bytes, sniff_content_type(image_bytes), width, height)]
+        variants += [(str(size), make_thumbnail(img, size), "image/jpeg", size, size) for size in self.thumbnail_sizes]
+
+        locations = self._append([blob for _, blob, _, _, _ in variants])
+        now = time.time()
+        with self._lock:
+            # A concurrent upload of the same bytes may have won; its rows are kept
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO blobs (photo_id, variant, pack, offset, length, content_type, width, height, "
+                "created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(photo_id, variant, pack, offset, len(blob), content_type, w, h, now)
+                 for (variant, blob, content_type, w, h), (pack, offset) in zip(variants, locations)],
+            )
+            self._conn.commit()
+            self.ingested += 1
+        return dict(self.info(photo_id), deduplicated=False)
+
+    def info(self, photo_id):
+        """Original size/type and available thumbnail sizes, or None if unknown"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT variant, length, content_type, width, height, created_at FROM blobs WHERE photo_id = ?",
+                (photo_id,),
+            ).fetchall()
+        original = next((row for row in rows if row[0] == ORIGINAL), None)
+        if original is None:
+            return None
+        return {
+            "photo_id": photo_id,
+            "content_type": original[2],
+            "bytes": original[1],
+            "width": original[3],
+            "height": original[4],
+            "thumbnail_sizes": sorted(int(row[0]) for row in rows if row[0] != ORIGINAL),
+            "created_at": original[5],
+        }
+
+    def open_blob(self, photo_id, variant=ORIGINAL):
+        """
+        Zero-copy view of one stored variant
+
+        Returns:
+            (memoryview, content_type), or None if not stored
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT pack, offset, length, content_type FROM blobs WHERE photo_id = ? AND variant = ?",
+                (photo_id, variant),
+            ).fetchone()
+            if row is None:
+                return None
+            pack, offset, length, content_type = row
+            mapped = self._maps.get(pack)
+            if mapped is None or len(mapped) < offset + length:
+                # First read of this pack, or it grew since it was mapped. The old map is
+                # released once no response still holds a view of it.
+                with open(self._pack_path(pack), "rb") as f:
+                    mapped = self._maps[pack] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(mapped)[offset:offset + length], content_type
+
+    def stats(self):
+        with self._lock:
+            photos, original_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM blobs WHERE variant = ?", (ORIGINAL,)
+            ).fetchone()
+            thumbnail_bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(length), 0) FROM blobs WHERE variant != ?", (ORIGINAL,)
+            ).fetchone()[0]
+        packs = sorted(self.directory.glob("pack-*.bin"))
+        return {
+            "photos": photos,
+            "original_bytes": original_bytes,
+            "thumbnail_bytes": thumbnail_bytes,
+            "thumbnail_sizes": self.thumbnail_sizes,
+            "packs": len(packs),
+            "pack_bytes": sum(p.stat().st_size for p in packs),
+            "max_bytes": self.max_bytes,
+            "rejected_full": self.rejected_full,
+            "ingested": self.ingested,
+            "deduplicated": self.deduplicated,
+        }
+
+
+_store = None
+
+
+def get_photo_store():
+    """Process-wide store, created on first use"""
+    global _store
+    if _store is None:
+        _store = PhotoStore()
+    return _store
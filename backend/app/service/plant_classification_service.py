@@ -5,23 +5,77 @@ import numpy as np
 import cv2 as cv
 import json
 import os
+import re
+import threading
+import time
+from collections import deque
 from pathlib import Path
 import onnxruntime as ort
+from .care_profile_service import load_care_profiles, get_care_profile
+from .memory_diagnostics_service import track_memory, ort_session_options
 
 # Global variables for model session and mappings
 _session = None
+_fast_session = None
 _label_mapping = None
+_id_to_genus = None
 _confidence_thresholds = None
+_cascade_default_threshold = None
+_embedding_output = None
+_genus_lookup = None
 
 MODEL_DIR = Path(__file__).parent.parent.parent / "models"
 MODEL_PATH = MODEL_DIR / "model_fp32.onnx"  
 LABEL_MAPPING_PATH = MODEL_DIR / "label_mapping.json"
 CONFIDENCE_THRESHOLDS_PATH = MODEL_DIR / "confidence_threshold_results.json"
 
+# Cascade mode: a cheap model answers first, the full ViT only runs when the
+# cheap model's top-1 probability is below the class's threshold.
+CLASSIFIER_MODE = os.getenv("CLASSIFIER_MODE", "single")  # "single" or "cascade"
+CASCADE_MODEL_PATH = Path(os.getenv("CASCADE_MODEL_PATH", str(MODEL_DIR / "model_small.onnx")))
+# Used when the threshold file has no per-class entry: pick the lowest swept
+# threshold whose confident accuracy reaches this target (percent).
+CASCADE_TARGET_ACCURACY = float(os.getenv("CASCADE_TARGET_ACCURACY", "97.0"))
+CASCADE_THRESHOLD_OVERRIDE = os.getenv("CASCADE_THRESHOLD")
+
+# Penultimate-layer tensor to expose as image embeddings. If the export does not
+# list it as a graph output it is added at load time (requires the onnx package).
+EMBEDDING_OUTPUT_NAME = os.getenv("EMBEDDING_OUTPUT_NAME")
+
+
+class LatencyStats:
+    """Request counts and recent latencies (one per cascade tier, shadow model, ...)"""
+
+    def __init__(self, window: int = 1000):
+        self.count = 0
+        self.total_ms = 0.0
+        self.recent_ms = deque(maxlen=window)
+
+    def record(self, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.recent_ms.append(elapsed_ms)
+
+    def summary(self) -> dict:
+        recent = sorted(self.recent_ms)
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "p50_ms": round(recent[len(recent) // 2], 3) if recent else None,
+            "p95_ms": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 3) if recent else None,
+        }
+
+
+_stats_lock = threading.Lock()
+_observers = []
+_tier_stats = {"fast": LatencyStats(), "full": LatencyStats()}
+_cascade_counts = {"requests": 0, "escalations": 0}
+
 
 def initialize_model():
     """Initialize the ONNX model and load label mappings"""
-    global _session, _label_mapping, _confidence_thresholds
+    global _session, _fast_session, _label_mapping, _id_to_genus, _confidence_thresholds, _cascade_default_threshold
+    global _embedding_output
     
     if _session is not None:
         print("[PlantClassifier] Model already initialized")
@@ -30,43 +84,129 @@ def initialize_model():
     print("[PlantClassifier] Initializing model...")
     
     # Load ONNX model
-    _session = ort.InferenceSession(str(MODEL_PATH))
+    _session = _load_session(MODEL_PATH)
     print(f"[PlantClassifier] Model loaded from {MODEL_PATH}")
     
     # Load label mapping
     with open(LABEL_MAPPING_PATH, 'r') as f:
         _label_mapping = json.load(f)
     
+    # Create reverse mapping (id to genus name)
+    _id_to_genus = {v: k for k, v in _label_mapping['genus_to_id'].items()}
+    
     # Load confidence thresholds
     with open(CONFIDENCE_THRESHOLDS_PATH, 'r') as f:
         _confidence_thresholds = json.load(f)
+    _cascade_default_threshold = _select_cascade_threshold(_confidence_thresholds)
+    
+    if CLASSIFIER_MODE == "cascade":
+        if CASCADE_MODEL_PATH.exists():
+            _fast_session = ort.InferenceSession(str(CASCADE_MODEL_PATH), ort_session_options())
+            print(f"[PlantClassifier] Cascade fast model loaded from {CASCADE_MODEL_PATH} "
+                  f"(default escalation threshold {_cascade_default_threshold})")
+        else:
+            print(f"[PlantClassifier] Cascade model not found at {CASCADE_MODEL_PATH}, using single-model mode")
     
     print(f"[PlantClassifier] Loaded {len(_label_mapping.get('genus_to_id', {}))} plant classes")
+    
+    _embedding_output = _resolve_embedding_output(_session, len(_label_mapping['genus_to_id']))
+    if _embedding_output:
+        print(f"[PlantClassifier] Embeddings available from output '{_embedding_output}'")
+    
+    # Precompute genus -> care profile so results carry care info without extra round trips
+    load_care_profiles(_label_mapping['genus_to_id'])
     print("[PlantClassifier] Model ready for inference")
 
 
-def preprocess_image(image_bytes):
+def _load_session(path):
+    """Create an inference session, exposing EMBEDDING_OUTPUT_NAME as an extra output if needed"""
+    if EMBEDDING_OUTPUT_NAME:
+        import onnx
+        model = onnx.load(str(path))
+        if EMBEDDING_OUTPUT_NAME not in [o.name for o in model.graph.output]:
+            # Appended last so output[0] stays the logits
+            model.graph.output.append(onnx.ValueInfoProto(name=EMBEDDING_OUTPUT_NAME))
+            return ort.InferenceSession(model.SerializeToString(), ort_session_options())
+    return ort.InferenceSession(str(path), ort_session_options())
+
+
+def _resolve_embedding_output(session, num_classes):
+    """Name of the session output holding image features, or None"""
+    outputs = session.get_outputs()
+    if EMBEDDING_OUTPUT_NAME:
+        return EMBEDDING_OUTPUT_NAME if any(o.name == EMBEDDING_OUTPUT_NAME for o in outputs) else None
+    for output in outputs[1:]:
+        if output.shape and output.shape[-1] != num_classes:
+            return output.name
+    return None
+
+
+def _select_cascade_threshold(threshold_results):
+    """Pick the global escalation threshold from the threshold sweep results"""
+    if CASCADE_THRESHOLD_OVERRIDE is not None:
+        return float(CASCADE_THRESHOLD_OVERRIDE)
+    sweep = sorted(
+        (entry for entry in threshold_results.values() if isinstance(entry, dict) and "threshold" in entry),
+        key=lambda entry: entry["threshold"],
+    )
+    for entry in sweep:
+        if entry.get("num_confident") and entry.get("confident_accuracy", 0.0) >= CASCADE_TARGET_ACCURACY:
+            return entry["threshold"]
+    return 0.5
+
+
+def get_cascade_threshold(genus_name):
+    """Escalation threshold for a class: per-class value if present, else the sweep operating point"""
+    value = _confidence_thresholds.get(genus_name)
+    if isinstance(value, dict):
+        value = value.get("threshold")
+    if isinstance(value, (int, float)):
+        return float(value)
+    return _cascade_default_threshold
+
+
+def decode_image(image_bytes):
     """
-    Preprocess image for model input
+    Decode raw image bytes into an RGB uint8 array
     
     Args:
         image_bytes: Raw image bytes
         
     Returns:
-        Preprocessed numpy array ready for inference
+        numpy array of shape (H, W, 3)
     """
-    # Decode image from bytes
+    if not image_bytes:
+        raise ValueError("Empty image")
     nparr = np.frombuffer(image_bytes, np.uint8)
     img = cv.imdecode(nparr, cv.IMREAD_COLOR)
-    img = cv.cvtColor(img, cv.COLOR_BGR2RGB)
+    if img is None:
+        raise ValueError("Could not decode image")
+    return cv.cvtColor(img, cv.COLOR_BGR2RGB)
+
+
+def prepare_input(img, size=224, out=None):
+    """
+    Resize and normalize a decoded RGB image for model input
+    
+    Args:
+        img: RGB uint8 array of shape (H, W, 3)
+        size: Square input resolution expected by the model
+        out: Optional preallocated float32 array of shape (1, 3, size, size) to fill in place
+        
+    Returns:
+        float32 array of shape (1, 3, size, size)
+    """
+    img_resize = cv.resize(img, (size, size))
     
-    # Resize to 224x224
-    img_resize = cv.resize(img, (224, 224))
+    if out is not None:
+        # Normalize straight into the caller's buffer, no intermediate arrays
+        np.divide(img_resize.transpose(2, 0, 1), np.float32(255.0), out=out[0])
+        return out
     
     # Convert to array and normalize
     img_array = np.array(img_resize)
     img_array = img_array / 255.0  # Convert RGB to 0-1 range
-    img_array = np.transpose(img_array, (2, 0, 1))  # Convert to (3, 224, 224)
+    img_array = np.transpose(img_array, (2, 0, 1))  # Convert to (3, size, size)
     
     # Add batch dimension
     img_input = np.expand_dims(img_array, axis=0)
@@ -75,12 +215,40 @@ def preprocess_image(image_bytes):
     return img_input
 
 
+def preprocess_image(image_bytes):
+    """
+    Preprocess image for model input
+    
+    Args:
+        image_bytes: Raw image bytes
+        
+    Returns:
+        Preprocessed numpy array ready for inference
+    """
+    return prepare_input(decode_image(image_bytes))
+
+
+def model_input_size(session, default=224):
+    """Square input resolution declared by an ONNX session (default if dynamic)"""
+    height = session.get_inputs()[0].shape[2]
+    return height if isinstance(height, int) else default
+
+
+@track_memory("onnxruntime.run", ort_run=True)
+def run_inference(session, img_input):
+    """Run a session on a preprocessed batch and return softmax probabilities for the first image"""
+    input_name = session.get_inputs()[0].name
+    output = session.run(None, {input_name: img_input})
+    return softmax(output[0][0])
+
+
 def softmax(x):
     """Apply softmax to convert logits to probabilities"""
     exp_x = np.exp(x - np.max(x))  # Subtract max for numerical stability
     return exp_x / exp_x.sum()
 
 
+@track_memory("classify_plant")
 def classify_plant(image_bytes, top_k=5):
     """
     Classify plant species from image bytes
@@ -89,33 +257,71 @@ def classify_plant(image_bytes, top_k=5):
         image_bytes: Raw image bytes
         top_k: Number of top predictions to return
         
+    Returns:
+        Dictionary with classification results
+    """
+    return classify_image(decode_image(image_bytes), top_k)
+
+
+@track_memory("classify_image")
+def classify_image(img, top_k=5):
+    """
+    Classify plant species from an already decoded image
+    
+    Args:
+        img: RGB uint8 array of shape (H, W, 3), as returned by decode_image
+        top_k: Number of top predictions to return
+        
     Returns:
         Dictionary with classification results
     """
     if _session is None:
         raise RuntimeError("Model not initialized. Call initialize_model() first.")
     
-    # Preprocess image
-    img_input = preprocess_image(image_bytes)
+    start = time.perf_counter()
+    probabilities, tier = _classify_decoded(img)
+    elapsed_ms = (time.perf_counter() - start) * 1000
     
-    # Run inference
-    input_name = _session.get_inputs()[0].name
-    input_data = {input_name: img_input}
-    output = _session.run(None, input_data)
+    for observer in _observers:
+        try:
+            observer(img, probabilities, elapsed_ms, tier)
+        except Exception as e:
+            # A broken observer must not fail the classification it observes
+            print(f"[PlantClassifier] Observer {getattr(observer, '__qualname__', observer)} failed: {e!r}")
     
-    # Get logits and convert to probabilities
-    logits = output[0][0]
-    probabilities = softmax(logits)
+    result = format_predictions(probabilities, top_k)
+    result["tier"] = tier
+    return result
+
+
+def add_classification_observer(observer):
+    """
+    Call observer(img, probabilities, elapsed_ms, tier) after each classify_plant/classify_image
     
-    # Create reverse mapping (id to genus name)
-    id_to_genus = {v: k for k, v in _label_mapping['genus_to_id'].items()}
+    Observers run on the request path and must return quickly. An observer
+    that raises is logged and skipped; the classification still succeeds.
+    """
+    if observer not in _observers:
+        _observers.append(observer)
+
+
+def format_predictions(probabilities, top_k=5):
+    """
+    Build the classification response for one image's class probabilities
     
+    Args:
+        probabilities: Softmax output of shape (num_classes,)
+        top_k: Number of top predictions to return
+        
+    Returns:
+        Dictionary with top prediction and all top-k predictions
+    """
     # Get top predictions
     top_indices = np.argsort(probabilities)[-top_k:][::-1]
     
     predictions = []
     for idx in top_indices:
-        genus_name = id_to_genus[idx]
+        genus_name = _id_to_genus[idx]
         confidence = float(probabilities[idx])
         threshold = _confidence_thresholds.get(genus_name, 0.5)
         
@@ -124,7 +330,8 @@ def classify_plant(image_bytes, top_k=5):
             "confidence": confidence,
             "confidence_percent": f"{confidence * 100:.2f}%",
             "threshold": threshold,
-            "is_confident": confidence >= threshold
+            "is_confident": confidence >= threshold,
+            "care_profile": get_care_profile(int(idx))
         })
     
     return {
@@ -134,6 +341,163 @@ def classify_plant(image_bytes, top_k=5):
     }
 
 
+def get_genus_name(class_id):
+    """Genus label for a class id"""
+    return _id_to_genus[int(class_id)]
+
+
+def known_genus(plant_name):
+    """
+    Genus from label_mapping.json named in a free-form plant name, or None
+
+    Tries a parenthesized scientific name first ("Swiss cheese plant (Monstera
+    deliciosa)"), then any word that is a known genus. Works before the model
+    is loaded.
+    """
+    global _genus_lookup
+    if _genus_lookup is None:
+        with open(LABEL_MAPPING_PATH) as f:
+            _genus_lookup = {genus.lower(): genus for genus in json.load(f)["genus_to_id"]}
+    text = plant_name.strip()
+    for word in re.findall(r"\(([A-Za-z]+)", text) + re.findall(r"[A-Za-z]+", text):
+        genus = _genus_lookup.get(word.lower())
+        if genus:
+            return genus
+    return None
+
+
+def get_input_size():
+    """Square input resolution of the full model"""
+    if _session is None:
+        raise RuntimeError("Model not initialized. Call initialize_model() first.")
+    return model_input_size(_session)
+
+
+def classify_prepared(img_input, top_k=5):
+    """
+    Classify an already preprocessed (1, 3, 224, 224) input with the full model
+    
+    Returns:
+        Dictionary with classification results
+    """
+    if _session is None:
+        raise RuntimeError("Model not initialized. Call initialize_model() first.")
+    return format_predictions(run_inference(_session, img_input), top_k)
+
+
+def classify_batch(img_inputs, top_k=5):
+    """
+    Classify a batch of preprocessed images with the full model
+    
+    Args:
+        img_inputs: float32 array of shape (N, 3, 224, 224)
+        top_k: Number of top predictions per image
+        
+    Returns:
+        List of classification results, one per image
+    """
+    return [format_predictions(probabilities, top_k) for probabilities in batch_probabilities(img_inputs)]
+
+
+@track_memory("onnxruntime.run_batch", ort_run=True)
+def batch_probabilities(img_inputs):
+    """
+    Run the full model on a batch in one call (one call per image for fixed-batch exports)
+    
+    Args:
+        img_inputs: float32 array of shape (N, 3, 224, 224)
+        
+    Returns:
+        float32 array of shape (N, num_classes) with softmax probabilities
+    """
+    if _session is None:
+        raise RuntimeError("Model not initialized. Call initialize_model() first.")
+    
+    model_input = _session.get_inputs()[0]
+    if isinstance(model_input.shape[0], int):
+        # Export has a fixed batch dimension; feed one image at a time
+        logits = np.concatenate([
+            _session.run(None, {model_input.name: img_inputs[i:i + 1]})[0]
+            for i in range(len(img_inputs))
+        ])
+    else:
+        logits = _session.run(None, {model_input.name: img_inputs})[0]
+    
+    return np.stack([softmax(row) for row in logits])
+
+
+def extract_embedding(img):
+    """
+    Penultimate-layer features for a decoded image
+    
+    Args:
+        img: RGB uint8 array of shape (H, W, 3)
+        
+    Returns:
+        float32 vector (CLS token if the output is a token sequence)
+    """
+    if _session is None:
+        raise RuntimeError("Model not initialized. Call initialize_model() first.")
+    if _embedding_output is None:
+        raise RuntimeError("Loaded model does not expose an embedding output; set EMBEDDING_OUTPUT_NAME")
+    input_name = _session.get_inputs()[0].name
+    features = _session.run([_embedding_output], {input_name: prepare_input(img)})[0][0]
+    while features.ndim > 1:
+        features = features[0]
+    return features.astype(np.float32)
+
+
+def _classify_decoded(img):
+    """
+    Run the single model or the cascade on a decoded image
+    
+    Returns:
+        (probabilities, tier) where tier is "fast" or "full"
+    """
+    if _fast_session is None:
+        start = time.perf_counter()
+        probabilities = run_inference(_session, prepare_input(img))
+        _record_tier("full", start)
+        return probabilities, "full"
+    
+    start = time.perf_counter()
+    fast_probabilities = run_inference(_fast_session, prepare_input(img, model_input_size(_fast_session)))
+    _record_tier("fast", start)
+    
+    top_id = int(np.argmax(fast_probabilities))
+    escalate = fast_probabilities[top_id] < get_cascade_threshold(_id_to_genus[top_id])
+    with _stats_lock:
+        _cascade_counts["requests"] += 1
+        _cascade_counts["escalations"] += int(escalate)
+    if not escalate:
+        return fast_probabilities, "fast"
+    
+    start = time.perf_counter()
+    probabilities = run_inference(_session, prepare_input(img))
+    _record_tier("full", start)
+    return probabilities, "full"
+
+
+def _record_tier(tier, start):
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    with _stats_lock:
+        _tier_stats[tier].record(elapsed_ms)
+
+
+def get_cascade_stats():
+    """Escalation rate and per-tier latency since startup"""
+    with _stats_lock:
+        requests = _cascade_counts["requests"]
+        return {
+            "mode": "cascade" if _fast_session is not None else "single",
+            "requests": requests,
+            "escalations": _cascade_counts["escalations"],
+            "escalation_rate": round(_cascade_counts["escalations"] / requests, 4) if requests else None,
+            "default_threshold": _cascade_default_threshold,
+            "tiers": {name: stats.summary() for name, stats in _tier_stats.items()},
+        }
+
+
 def get_model_info():
     """Get information about the loaded model"""
     if _session is None:
@@ -145,5 +509,8 @@ def get_model_info():
         "num_classes": len(_label_mapping.get('genus_to_id', {})),
         "input_shape": [i.shape for i in _session.get_inputs()],
         "output_shape": [o.shape for o in _session.get_outputs()],
-        "model_type": "ONNX FP32"
+        "model_type": "ONNX FP32",
+        "mode": "cascade" if _fast_session is not None else "single",
+        "embedding_output": _embedding_output,
+        "cascade_model_path": str(CASCADE_MODEL_PATH) if _fast_session is not None else None
     }
@@ -1,25 +1,33 @@
 from typing import List, Optional
-from fastapi import HTTPException
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
 from app.models import PlantData
-from app.repository.plant_data_repository import PlantDataRepository
+from app.http_cache import catalog_cache
+from app.service.memory_diagnostics_service import track_memory
+from app.repository.plant_data_repository import PlantDataRepository, plant_data_repository
 
 class PlantDataService:
+    """Stateless service; one instance is shared and each call takes the request's session"""
+
     def __init__(self, repository: PlantDataRepository):
         self.repository = repository
 
-    def get_all_plants(self) -> List[PlantData]:
+    @track_memory("db.get_all_plants")
+    def get_all_plants(self, db: Session) -> List[Row]:
         """Get all plants from repository"""
-        return self.repository.find_all()
+        return self.repository.find_all(db)
 
-    def get_plant_by_id(self, plant_id: int) -> Optional[PlantData]:
+    @track_memory("db.get_plant_by_id")
+    def get_plant_by_id(self, db: Session, plant_id: int) -> Optional[Row]:
         """Get a plant by ID"""
-        return self.repository.find_by_id(plant_id)
+        return self.repository.find_by_id(db, plant_id)
 
-    def search_plant_by_name(self, name: str) -> List[PlantData]:
+    @track_memory("db.search_plant_by_name")
+    def search_plant_by_name(self, db: Session, name: str) -> List[Row]:
         """Search plants by name"""
-        return self.repository.find_by_name(name)
+        return self.repository.find_by_name(db, name)
 
-    def create_plant(self, plant_data: dict) -> PlantData:
+    def create_plant(self, db: Session, plant_data: dict) -> PlantData:
         """Create a new plant"""
         plant = PlantData(
             name=plant_data.get('name'),
@@ -31,12 +39,24 @@ class PlantDataService:
             difficulty_level=plant_data.get('difficulty_level'),
             image_url=plant_data.get('image_url')
         )
-        return self.repository.save(plant)
+        saved = self.repository.save(db, plant)
+        catalog_cache.invalidate()
+        return saved
 
-    def update_plant(self, plant_id: int, update_data: dict) -> Optional[PlantData]:
+    def update_plant(self, db: Session, plant_id: int, update_data: dict) -> Optional[Row]:
         """Update a plant"""
-        return self.repository.update(plant_id, update_data)
+        plant = self.repository.update(db, plant_id, update_data)
+        if plant:
+            catalog_cache.invalidate()
+        return plant
 
-    def delete_plant(self, plant_id: int) -> bool:
+    def delete_plant(self, db: Session, plant_id: int) -> bool:
         """Delete a plant"""
-        return self.repository.delete_by_id(plant_id)
\ No newline at end of file
+        deleted = self.repository.delete_by_id(db, plant_id)
+        if deleted:
+            catalog_cache.invalidate()
+        return deleted
+
+
+# Application-scoped instance
+plant_data_service = PlantDataService(plant_data_repository)
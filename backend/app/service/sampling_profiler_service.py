@@ -0,0 +1,141 @@
+"""
+On-demand statistical sampling profiler
+
+While a profile is running, a background thread snapshots every other
+thread's Python stack with sys._current_frames() at a fixed interval. Nothing
+is installed (no sys.setprofile/settrace hooks, no threads) while idle, so the
+profiler costs nothing until a profile is requested.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "60"))
+PROFILER_MIN_INTERVAL_MS = 1.0
+
+_running = threading.Lock()
+
+
+class ProfilerBusyError(RuntimeError):
+    pass
+
+
+def _frame_key(code, lineno):
+    filename = code.co_filename
+    return code.co_name, filename, lineno
+
+
+def _format_frame(frame_key):
+    name, filename, lineno = frame_key
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+def _sample_stacks(seconds, interval):
+    """Collect (thread name, root->leaf frame tuple) counts for the given duration"""
+    me = threading.get_ident()
+    counts = Counter()
+    samples = 0
+    deadline = time.perf_counter() + seconds
+    next_tick = time.perf_counter()
+    while next_tick < deadline:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_key(frame.f_code, frame.f_lineno))
+                frame = frame.f_back
+            stack.reverse()
+            counts[(names.get(ident, str(ident)), tuple(stack))] += 1
+        samples += 1
+        next_tick += interval
+        delay = next_tick - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            next_tick = time.perf_counter()  # fell behind; don't burst to catch up
+    return counts, samples
+
+
+def to_collapsed(counts):
+    """Brendan Gregg collapsed-stack text (flamegraph.pl, speedscope, inferno)"""
+    lines = []
+    for (thread_name, stack), count in counts.most_common():
+        frames = [thread_name] + [_format_frame(key).replace(";", ":") for key in stack]
+        lines.append(f"{';'.join(frames)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def to_speedscope(counts, interval_ms, name):
+    """speedscope 'sampled' profile JSON, one profile per thread"""
+    frame_index = {}
+    frames = []
+    per_thread = defaultdict(lambda: {"samples": [], "weights": []})
+    for (thread_name, stack), count in counts.items():
+        indices = []
+        for key in stack:
+            if key not in frame_index:
+                frame_index[key] = len(frames)
+                frames.append({"name": key[0], "file": key[1], "line": key[2]})
+            indices.append(frame_index[key])
+        per_thread[thread_name]["samples"].append(indices)
+        per_thread[thread_name]["weights"].append(count * interval_ms)
+
+    profiles = []
+    for thread_name, data in sorted(per_thread.items()):
+        profiles.append({
+            "type": "sampled",
+            "name": thread_name,
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": sum(data["weights"]),
+            "samples": data["samples"],
+            "weights": data["weights"],
+        })
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "IkigotchiGarden sampling profiler",
+        "shared": {"frames": frames},
+        "profiles": profiles,
+    }
+
+
+def run_profile(seconds=10.0, interval_ms=5.0, output_format="collapsed"):
+    """
+    Sample all threads for a fixed duration (blocking; call from a worker thread)
+
+    Args:
+        seconds: Profile duration, capped at PROFILER_MAX_SECONDS
+        interval_ms: Sampling interval
+        output_format: "collapsed" (text) or "speedscope" (dict)
+
+    Returns:
+        (profile, metadata) tuple
+    """
+    seconds = min(max(seconds, 0.1), PROFILER_MAX_SECONDS)
+    interval_ms = max(interval_ms, PROFILER_MIN_INTERVAL_MS)
+    if not _running.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already running")
+    try:
+        started = time.time()
+        wall_start = time.perf_counter()
+        counts, samples = _sample_stacks(seconds, interval_ms / 1000.0)
+        elapsed = time.perf_counter() - wall_start
+    finally:
+        _running.release()
+
+    metadata = {
+        "pid": os.getpid(),
+        "started_at": started,
+        "seconds": round(elapsed, 3),
+        "interval_ms": interval_ms,
+        "samples": samples,
+        "distinct_stacks": len(counts),
+    }
+    if output_format == "speedscope":
+        return to_speedscope(counts, interval_ms, f"pid {os.getpid()} @ {started:.0f}"), metadata
+    return to_collapsed(counts), metadata
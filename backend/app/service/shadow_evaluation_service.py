@@ -0,0 +1,182 @@
+"""
+Shadow evaluation of a candidate model on live classification traffic
+
+A sample of classify_plant requests is handed to a background thread that runs
+the candidate model and compares it with what the primary answered. Only a
+resize to the candidate's input size happens on the request path; requests
+that arrive while the bounded queue is full are dropped (and counted) rather
+than slowing responses down. The candidate's results are never returned to
+clients.
+"""
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+import cv2 as cv
+import numpy as np
+import onnxruntime as ort
+
+from .memory_diagnostics_service import ort_session_options
+from .plant_classification_service import (
+    LatencyStats, add_classification_observer, get_genus_name, model_input_size, prepare_input, run_inference
+)
+
+SHADOW_MODEL_PATH = os.getenv("SHADOW_MODEL_PATH")  # unset disables shadow mode
+SHADOW_SAMPLE_RATE = float(os.getenv("SHADOW_SAMPLE_RATE", "0.1"))
+SHADOW_QUEUE_SIZE = int(os.getenv("SHADOW_QUEUE_SIZE", "16"))
+SHADOW_TOP_K = 5
+
+_session = None
+_input_size = None
+_queue = None
+_worker = None
+_lock = threading.Lock()
+
+
+class _Comparison:
+    """Running agreement and latency statistics between primary and candidate"""
+
+    def __init__(self, recent_disagreements=20):
+        self.started_at = time.time()
+        self.sampled = 0
+        self.dropped = 0
+        self.evaluated = 0
+        self.errors = 0
+        self.last_error = None
+        self.top1_agree = 0
+        self.top5_overlap = 0
+        self.candidate_top1_in_primary_top5 = 0
+        self.confidence_delta_sum = 0.0
+        self.primary_latency = LatencyStats()
+        self.candidate_latency = LatencyStats()
+        self.latency_delta_sum = 0.0
+        self.tiers = {}
+        self.disagreements = deque(maxlen=recent_disagreements)
+
+    def record(self, primary, candidate, primary_ms, candidate_ms, tier):
+        primary_top = np.argsort(primary)[-SHADOW_TOP_K:][::-1]
+        candidate_top = np.argsort(candidate)[-SHADOW_TOP_K:][::-1]
+        agree = primary_top[0] == candidate_top[0]
+
+        self.evaluated += 1
+        self.top1_agree += int(agree)
+        self.top5_overlap += len(set(primary_top.tolist()) & set(candidate_top.tolist()))
+        self.candidate_top1_in_primary_top5 += int(candidate_top[0] in primary_top)
+        self.confidence_delta_sum += float(candidate[primary_top[0]] - primary[primary_top[0]])
+        self.primary_latency.record(primary_ms)
+        self.candidate_latency.record(candidate_ms)
+        self.latency_delta_sum += candidate_ms - primary_ms
+        self.tiers[tier] = self.tiers.get(tier, 0) + 1
+        if not agree:
+            self.disagreements.append({
+                "at": time.time(),
+                "primary": {"genus": get_genus_name(primary_top[0]),
+                            "confidence": round(float(primary[primary_top[0]]), 4)},
+                "candidate": {"genus": get_genus_name(candidate_top[0]),
+                              "confidence": round(float(candidate[candidate_top[0]]), 4)},
+            })
+
+    def report(self):
+        n = self.evaluated
+        return {
+            "since": self.started_at,
+            "sampled": self.sampled,
+            "dropped": self.dropped,
+            "evaluated": n,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "primary_tiers": dict(self.tiers),
+            "agreement": {
+                "top1": round(self.top1_agree / n, 4) if n else None,
+                "top5_overlap": round(self.top5_overlap / (n * SHADOW_TOP_K), 4) if n else None,
+                "candidate_top1_in_primary_top5": round(self.candidate_top1_in_primary_top5 / n, 4) if n else None,
+                "mean_confidence_delta": round(self.confidence_delta_sum / n, 4) if n else None,
+            },
+            "latency": {
+                "primary": self.primary_latency.summary(),
+                "candidate": self.candidate_latency.summary(),
+                "mean_delta_ms": round(self.latency_delta_sum / n, 3) if n else None,
+            },
+            "recent_disagreements": list(self.disagreements),
+        }
+
+
+_comparison = _Comparison()
+
+
+def start(model_path=SHADOW_MODEL_PATH):
+    """Load the candidate model and start observing classify_plant (no-op without a model path)"""
+    global _session, _input_size, _queue, _worker
+    if not model_path or _session is not None:
+        return False
+    if not Path(model_path).exists():
+        print(f"[ShadowEval] Candidate model not found at {model_path}, shadow mode disabled")
+        return False
+
+    _session = ort.InferenceSession(str(model_path), ort_session_options())
+    _input_size = model_input_size(_session)
+    _queue = queue.Queue(maxsize=SHADOW_QUEUE_SIZE)
+    _worker = threading.Thread(target=_run_worker, name="shadow-eval", daemon=True)
+    _worker.start()
+    add_classification_observer(_observe)
+    print(f"[ShadowEval] Shadowing {SHADOW_SAMPLE_RATE:.0%} of requests with {model_path} "
+          f"(queue {SHADOW_QUEUE_SIZE})")
+    return True
+
+
+def _observe(img, probabilities, elapsed_ms, tier):
+    """Request-path hook: sample, shrink the image and enqueue without blocking"""
+    if random.random() >= SHADOW_SAMPLE_RATE:
+        return
+    with _lock:
+        _comparison.sampled += 1
+    # Queue a small uint8 copy instead of the full decoded photo
+    resized = cv.resize(img, (_input_size, _input_size))
+    try:
+        _queue.put_nowait((resized, probabilities, elapsed_ms, tier))
+    except queue.Full:
+        with _lock:
+            _comparison.dropped += 1
+
+
+def _run_worker():
+    while True:
+        img, primary, primary_ms, tier = _queue.get()
+        try:
+            start = time.perf_counter()
+            candidate = run_inference(_session, prepare_input(img, _input_size))
+            candidate_ms = (time.perf_counter() - start) * 1000
+            if candidate.shape != primary.shape:
+                raise ValueError(f"Candidate has {candidate.shape[0]} classes, primary has {primary.shape[0]}")
+            with _lock:
+                _comparison.record(primary, candidate, primary_ms, candidate_ms, tier)
+        except Exception as e:
+            with _lock:
+                _comparison.errors += 1
+                _comparison.last_error = str(e)
+        finally:
+            _queue.task_done()
+
+
+def get_shadow_report():
+    """Agreement and latency comparison between the primary and candidate models"""
+    with _lock:
+        report = _comparison.report()
+    report["enabled"] = _session is not None
+    report["candidate_model"] = SHADOW_MODEL_PATH
+    report["sample_rate"] = SHADOW_SAMPLE_RATE
+    report["queue_depth"] = _queue.qsize() if _queue is not None else 0
+    report["queue_size"] = SHADOW_QUEUE_SIZE
+    return report
+
+
+def reset_shadow_stats():
+    """Start a fresh comparison window"""
+    global _comparison
+    with _lock:
+        _comparison = _Comparison()
+    return get_shadow_report()
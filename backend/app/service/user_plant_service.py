@@ -34,15 +34,11 @@ class UserPlantService:
         return self._to_dto(updated_plant)
 
     def delete_user_plant(self, plant_id: str) -> dict:
-        existing_plant = self.repository.find_by_id(plant_id)
-        if not existing_plant:
+        deleted_plant = self.repository.remove_by_id(plant_id)
+        if not deleted_plant:
             raise HTTPException(status_code=404, detail="Plant not found")
 
-        deleted = self.repository.delete_by_id(plant_id)
-        if not deleted:
-            raise HTTPException(status_code=500, detail="Failed to delete plant")
-
-        return {"message": f"Plant '{existing_plant.name}' deleted successfully"}
+        return {"message": f"Plant '{deleted_plant.name}' deleted successfully"}
 
     def _to_dto(self, plant: UserPlant) -> UserPlantDto:
         return UserPlantDto(
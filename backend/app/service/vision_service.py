@@ -7,6 +7,7 @@ from PIL import Image
 import json
 import os
 from typing import Optional, Tuple
+from app.service.memory_diagnostics_service import track_memory, ort_session_options
 
 # Get the path to the models directory
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
@@ -35,7 +36,7 @@ class VisionTransformerService:
             raise FileNotFoundError(f"Model not found at {MODEL_PATH}")
 
         print(f"Loading ONNX model from {MODEL_PATH}")
-        self.session = ort.InferenceSession(MODEL_PATH)
+        self.session = ort.InferenceSession(MODEL_PATH, ort_session_options())
         print("Model loaded successfully")
 
     def _load_labels(self):
@@ -79,6 +80,7 @@ class VisionTransformerService:
 
         return img_array
 
+    @track_memory("VisionTransformerService.predict", ort_run=True)
     def predict(self, image: Image.Image, confidence_threshold: float = 0.4) -> Optional[Tuple[str, float]]:
         """
         Predict the plant genus from an image.
@@ -0,0 +1,139 @@
+"""
+Catalog endpoint throughput: per-request ORM repositories vs the shared
+repository with prebuilt statements and Core row hydration
+
+The "before" routes reproduce the previous controller code (a new repository
+and service per request, db.query(...) built and compiled each call, full ORM
+objects). Both variants run in one in-process app against the same seeded
+SQLite database, with the HTTP representation cache bypassed so every request
+reaches the database. Run from the backend directory:
+    python -m benchmarks.catalog_rps_bench --plants 500 --requests 3000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'catalog.db')}"
+os.environ.pop("DATABASE_REPLICA_URLS", None)
+
+from fastapi import Depends, FastAPI, HTTPException, Query  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+import migrations  # noqa: E402
+from app.controller.plant_data_controller import PlantDataController  # noqa: E402
+from app.database import SessionLocal, engine, get_db  # noqa: E402
+from app.http_cache import catalog_cache  # noqa: E402
+from app.models import PlantData  # noqa: E402
+
+
+class LegacyPlantDataRepository:
+    """Read paths as they were before repositories became application-scoped"""
+
+    def __init__(self):
+        self.db = None
+
+    def set_db_session(self, db):
+        self.db = db
+
+    def find_all(self):
+        return self.db.query(PlantData).all()
+
+    def find_by_id(self, plant_id):
+        return self.db.query(PlantData).filter(PlantData.id == plant_id).first()
+
+    def find_by_name(self, name):
+        return self.db.query(PlantData).filter(PlantData.name.ilike(f"%{name}%")).all()
+
+
+class LegacyPlantDataService:
+    def __init__(self, repository):
+        self.repository = repository
+
+    def get_plant_by_id(self, plant_id):
+        return self.repository.find_by_id(plant_id)
+
+    def search_plant_by_name(self, name):
+        return self.repository.find_by_name(name)
+
+
+def build_app():
+    app = FastAPI()
+    controller = PlantDataController()
+    app.include_router(controller.router)
+
+    @app.get("/legacy/plants/search")
+    async def legacy_search(name: str = Query(...), db: Session = Depends(get_db)):
+        repo = LegacyPlantDataRepository()
+        repo.set_db_session(db)
+        service = LegacyPlantDataService(repo)
+        return [controller._plant_to_dict(plant) for plant in service.search_plant_by_name(name)]
+
+    @app.get("/legacy/plants/{plant_id}")
+    async def legacy_get(plant_id: int, db: Session = Depends(get_db)):
+        repo = LegacyPlantDataRepository()
+        repo.set_db_session(db)
+        service = LegacyPlantDataService(repo)
+        plant = service.get_plant_by_id(plant_id)
+        if not plant:
+            raise HTTPException(status_code=404, detail="Plant not found")
+        return controller._plant_to_dict(plant)
+
+    return app
+
+
+def seed(plants):
+    migrations.upgrade(engine)
+    db = SessionLocal()
+    try:
+        db.add_all([
+            PlantData(name=f"Plant {i}", scientific_name=f"Genus{i % 50} species{i}",
+                      description="x" * 200, care_instructions="Water weekly", watering_frequency_days=7,
+                      sunlight_requirement="medium", difficulty_level="easy")
+            for i in range(plants)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def measure(client, paths, requests):
+    # Warm up connection pool, compiled caches and route lookup
+    for path in paths[:50]:
+        client.get(path)
+    start = time.perf_counter()
+    for i in range(requests):
+        response = client.get(paths[i % len(paths)])
+        assert response.status_code == 200, response.text
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark catalog endpoint requests/sec before and after")
+    parser.add_argument("--plants", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=3000)
+    args = parser.parse_args()
+
+    seed(args.plants)
+    catalog_cache.ttl = -1  # every cached representation is stale, so each request queries
+    client = TestClient(build_app())
+
+    ids = [str(i) for i in range(1, args.plants + 1)]
+    terms = [f"Plant {i}" for i in range(0, args.plants, 7)]
+    cases = {
+        "GET /plants/{id}": ([f"/legacy/plants/{i}" for i in ids], [f"/api/plants/{i}" for i in ids]),
+        "GET /plants/search": ([f"/legacy/plants/search?name={t}" for t in terms],
+                               [f"/api/plants/search?name={t}" for t in terms]),
+    }
+    print(f"{args.plants} plants, {args.requests} sequential requests per case (in-process)")
+    print(f"{'endpoint':>20} {'before rps':>11} {'after rps':>10} {'speedup':>8}")
+    for name, (before_paths, after_paths) in cases.items():
+        before = measure(client, before_paths, args.requests)
+        after = measure(client, after_paths, args.requests)
+        print(f"{name:>20} {before:>11.0f} {after:>10.0f} {after / before:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Multi-plant latency vs crop count, against a single whole-image inference
+
+Compares, per crop grid: strided crop extraction + one batched ONNX call,
+the same crops run one session call at a time, and classify_plant on the
+whole image. Run from the backend directory:
+    python -m benchmarks.multi_crop_bench --image shelf.jpg
+    python -m benchmarks.multi_crop_bench --image shelf.jpg --model models/model_candidate.onnx
+"""
+import argparse
+import time
+from pathlib import Path
+
+from app.service import plant_classification_service as classifier
+from app.service.multi_plant_service import extract_crops, plan_crops
+
+GRIDS = [
+    ("1 scale, 50% overlap", [1.0], 0.5),
+    ("2 scales, 50% overlap", [1.0, 0.6], 0.5),
+    ("3 scales, 50% overlap", [1.0, 0.6, 0.4], 0.5),
+    ("3 scales, 67% overlap", [1.0, 0.6, 0.4], 0.67),
+]
+
+
+def best_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched multi-crop classification")
+    parser.add_argument("--image", required=True)
+    parser.add_argument("--model", help="ONNX model to use instead of MODEL_PATH")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.model:
+        classifier.MODEL_PATH = Path(args.model)
+    classifier.initialize_model()
+    image_bytes = Path(args.image).read_bytes()
+    img = classifier.decode_image(image_bytes)
+    size = classifier.get_input_size()
+
+    single = best_ms(lambda: classifier.classify_plant(image_bytes), args.repeat)
+    print(f"image {img.shape[1]}x{img.shape[0]}, whole-image classify_plant: {single:.1f} ms (best of {args.repeat})")
+    print(f"{'grid':>24} {'crops':>6} {'crop ms':>8} {'batched ms':>11} {'per-crop ms':>12} {'vs single':>10}")
+    for label, scales, overlap in GRIDS:
+        plan, count = plan_crops(img.shape[0], img.shape[1], size, scales, overlap, max_crops=10_000)
+        crop_ms = best_ms(lambda: extract_crops(img, plan, size), args.repeat)
+        batch, _ = extract_crops(img, plan, size)
+        batched = best_ms(lambda: classifier.batch_probabilities(batch), args.repeat)
+        looped = best_ms(lambda: [classifier.batch_probabilities(batch[i:i + 1]) for i in range(count)], args.repeat)
+        total = crop_ms + batched
+        print(f"{label:>24} {count:>6} {crop_ms:>8.1f} {batched:>11.1f} {looped:>12.1f} {total / single:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
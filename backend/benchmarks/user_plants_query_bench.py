@@ -0,0 +1,174 @@
+"""
+Garden query latency on a synthetic user_plants table, before and after the
+v002 indexes (and optionally v004 hash partitioning on PostgreSQL)
+
+Rows are generated inside the database (generate_series / recursive CTE), so
+loading 10M rows does not go through Python. Run from the backend directory:
+    python -m benchmarks.user_plants_query_bench --rows 10000000
+    python -m benchmarks.user_plants_query_bench --database-url postgresql://... --partitions 16
+
+The target database must be empty; the benchmark migrates it itself.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+
+import migrations
+
+QUERIES = {
+    # Active plants for one user in watering order (garden screen)
+    "garden": "SELECT id, plant_data_id, nickname, last_watered FROM user_plants "
+              "WHERE user_id = :user_id AND {active} ORDER BY last_watered LIMIT 50",
+    "garden_count": "SELECT COUNT(*) FROM user_plants WHERE user_id = :user_id AND {active}",
+    # Oldest-watered active plants across all users (reminder job)
+    "due_reminders": "SELECT id, user_id, last_watered FROM user_plants "
+                     "WHERE {active} AND last_watered < :cutoff ORDER BY last_watered LIMIT 500",
+}
+
+LOAD_SQL = {
+    "postgresql": """
+        INSERT INTO user_plants (user_id, plant_data_id, nickname, last_watered, is_active, created_at)
+        SELECT 'device-' || (random() * (:users - 1))::int,
+               1 + (random() * (:species - 1))::int,
+               'plant ' || n,
+               now() - random() * interval '60 days',
+               random() < :active_fraction,
+               now()
+        FROM generate_series(:start, :stop - 1) AS n
+    """,
+    "sqlite": """
+        WITH RECURSIVE s(n) AS (SELECT :start UNION ALL SELECT n + 1 FROM s WHERE n < :stop - 1)
+        INSERT INTO user_plants (user_id, plant_data_id, nickname, last_watered, is_active, created_at)
+        SELECT 'device-' || (abs(random()) % :users),
+               1 + abs(random()) % :species,
+               'plant ' || n,
+               datetime('now', '-' || (abs(random()) % 5184000) || ' seconds'),
+               (abs(random()) % 1000) < :active_fraction * 1000,
+               datetime('now')
+        FROM s
+    """,
+}
+
+# Must match the partial index predicates in v002 for the planner to use them
+ACTIVE = {"postgresql": "is_active", "sqlite": "is_active = 1"}
+
+
+def load_rows(engine, rows, users, species, active_fraction, batch):
+    dialect = engine.dialect.name
+    with engine.begin() as conn:
+        for i in range(1, species + 1):
+            conn.execute(text("INSERT INTO plant_data (id, name) VALUES (:id, :name)"), {"id": i, "name": f"Species {i}"})
+    for start in range(0, rows, batch):
+        with engine.begin() as conn:
+            conn.execute(text(LOAD_SQL[dialect]), {
+                "start": start, "stop": min(start + batch, rows), "users": users,
+                "species": species, "active_fraction": active_fraction,
+            })
+        print(f"  loaded {min(start + batch, rows):,} rows", end="\r", flush=True)
+    print()
+    analyze(engine)
+
+
+def analyze(engine):
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE user_plants" if engine.dialect.name == "postgresql" else "ANALYZE")
+
+
+def explain(conn, dialect, sql, params):
+    prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+    rows = conn.execute(text(prefix + sql), params).fetchall()
+    return " | ".join(str(row[-1]) for row in rows)
+
+
+def time_queries(engine, users, samples, max_seconds, seed=0):
+    dialect = engine.dialect.name
+    rng = random.Random(seed)
+    results = {}
+    with engine.connect() as conn:
+        if dialect == "sqlite":
+            cutoff = conn.execute(text("SELECT datetime('now', '-55 days')")).scalar()
+        else:
+            cutoff = conn.execute(text("SELECT now() - interval '55 days'")).scalar()
+        for name, template in QUERIES.items():
+            sql = template.format(active=ACTIVE.get(dialect, "is_active = TRUE"))
+            timings = []
+            deadline = time.perf_counter() + max_seconds
+            # Full scans on the baseline schema stop early at the time budget
+            while len(timings) < samples and (len(timings) < 3 or time.perf_counter() < deadline):
+                params = {"user_id": f"device-{rng.randrange(users)}", "cutoff": cutoff}
+                start = time.perf_counter()
+                conn.execute(text(sql), params).fetchall()
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            results[name] = {
+                "p50_ms": statistics.median(timings),
+                "p95_ms": timings[max(0, int(len(timings) * 0.95) - 1)],
+                "samples": len(timings),
+                "plan": explain(conn, dialect, sql, params),
+            }
+    return results
+
+
+def report(label, results):
+    print(f"\n{label}")
+    print(f"{'query':>14} {'n':>5} {'p50 ms':>9} {'p95 ms':>9}  plan")
+    for name, r in results.items():
+        print(f"{name:>14} {r['samples']:>5} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f}  {r['plan'][:110]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark user_plants garden queries vs indexes/partitioning")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--users", type=int, default=500_000)
+    parser.add_argument("--species", type=int, default=500)
+    parser.add_argument("--active-fraction", type=float, default=0.9)
+    parser.add_argument("--batch", type=int, default=1_000_000)
+    parser.add_argument("--samples", type=int, default=200, help="Queries per measurement")
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="Time budget per query measurement")
+    parser.add_argument("--database-url", help="Empty database to use (default: temporary SQLite file)")
+    parser.add_argument("--partitions", type=int, default=0, help="Also measure v004 hash partitioning (PostgreSQL)")
+    args = parser.parse_args()
+
+    tmp = None
+    url = args.database_url
+    if not url:
+        tmp = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(tmp.name, 'bench.db')}"
+    engine = create_engine(url)
+
+    migrations.upgrade(engine, target=1)
+    print(f"Loading {args.rows:,} rows for {args.users:,} users...")
+    start = time.perf_counter()
+    load_rows(engine, args.rows, args.users, args.species, args.active_fraction, args.batch)
+    print(f"Loaded in {time.perf_counter() - start:.1f}s")
+    report("Baseline (id, user_id indexes)", time_queries(engine, args.users, args.samples, args.max_seconds))
+
+    start = time.perf_counter()
+    migrations.upgrade(engine, target=3)
+    analyze(engine)
+    print(f"Indexes built in {time.perf_counter() - start:.1f}s")
+    report("With v002 composite/partial indexes", time_queries(engine, args.users, args.samples, args.max_seconds))
+
+    if args.partitions:
+        if engine.dialect.name != "postgresql":
+            print("\nPartitioning needs PostgreSQL, skipped")
+        else:
+            os.environ["USER_PLANTS_HASH_PARTITIONS"] = str(args.partitions)
+            start = time.perf_counter()
+            migrations.upgrade(engine, target=4)
+            print(f"Partitioned in {time.perf_counter() - start:.1f}s")
+            report(f"Hash-partitioned by user_id ({args.partitions} partitions)",
+                   time_queries(engine, args.users, args.samples, args.max_seconds))
+
+    engine.dispose()
+    if tmp:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Query latency of the memory-mapped VectorIndex against index size
+
+Run from the backend directory:
+    python -m benchmarks.vector_index_bench --sizes 10000 100000 1000000 --dim 384
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from app.service.embedding_service import VectorIndex
+
+
+def build_index(directory, size, dim, dtype, batch=100_000, seed=0):
+    rng = np.random.default_rng(seed)
+    index = VectorIndex(directory, dim=dim, dtype=dtype)
+    for start in range(0, size, batch):
+        n = min(batch, size - start)
+        index.add([f"photo-{start + i}" for i in range(n)], rng.standard_normal((n, dim), dtype=np.float32))
+    return index
+
+
+def time_queries(index, queries, k, batch_size, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in range(0, len(queries), batch_size):
+            index.search(queries[i:i + batch_size], k)
+        timings.append((time.perf_counter() - start) / len(queries))
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark VectorIndex query latency vs size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--dtype", default="float32", choices=["float16", "float32"])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    queries = np.random.default_rng(1).standard_normal((args.queries, args.dim), dtype=np.float32)
+    print(f"dim={args.dim} dtype={args.dtype} k={args.k}, ms per query (best of {args.repeat})")
+    print(f"{'vectors':>10} {'build s':>8} {'MB':>8} {'batch=1':>9} {'batch=32':>9}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            index = build_index(directory, size, args.dim, args.dtype)
+            build_s = time.perf_counter() - start
+            size_mb = size * args.dim * np.dtype(args.dtype).itemsize / 1e6
+            single = time_queries(index, queries, args.k, 1, args.repeat)
+            batched = time_queries(index, queries, args.k, 32, args.repeat)
+            print(f"{size:>10} {build_s:>8.1f} {size_mb:>8.0f} {single:>9.3f} {batched:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Train the product-quantization codebook used by /api/classify/embedding?format=pq
+Run this after the embedding index holds a representative sample of photos
+"""
+import argparse
+
+import numpy as np
+
+from app.service.embedding_service import PQ_CODEBOOK_PATH, ProductQuantizer, get_vector_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a PQ codebook from the embedding index")
+    parser.add_argument("--m", type=int, default=48, help="Sub-vectors (bytes per encoded embedding)")
+    parser.add_argument("--sample", type=int, default=50_000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    index = get_vector_index()
+    if len(index) < 256:
+        print(f"❌ Need at least 256 indexed embeddings, found {len(index)}")
+        return
+    rng = np.random.default_rng(0)
+    rows = np.sort(rng.choice(len(index), min(args.sample, len(index)), replace=False))
+    sample = np.asarray(index.vectors[rows], dtype=np.float32)
+
+    print(f"Training PQ (m={args.m}) on {len(sample)} embeddings...")
+    pq = ProductQuantizer.train(sample, m=args.m, iterations=args.iterations)
+    PQ_CODEBOOK_PATH.parent.mkdir(parents=True, exist_ok=True)
+    pq.save(PQ_CODEBOOK_PATH)
+    print(f"✅ Saved codebook to {PQ_CODEBOOK_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Offline bulk plant classification
+
+Streams images from a directory, a tar archive or a manifest file, decodes and
+preprocesses them in a process pool, classifies them in fixed-size ONNX batches
+and appends one JSON line per image. Re-running with the same output file skips
+images that already have a result, so interrupted runs resume.
+
+Usage:
+    python classify_bulk.py photos/ --output results.jsonl
+    python classify_bulk.py backlog.tar.gz --batch-size 32 --workers 8
+    python classify_bulk.py manifest.txt --model models/candidate.onnx
+"""
+import argparse
+import json
+import os
+import tarfile
+import time
+from itertools import islice
+from multiprocessing import Pool
+from pathlib import Path
+
+import numpy as np
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff"}
+
+
+def _is_image(name):
+    return Path(name).suffix.lower() in IMAGE_EXTENSIONS
+
+
+def iter_directory(root, done):
+    root = Path(root)
+    for path in sorted(root.rglob("*")):
+        key = str(path.relative_to(root))
+        if path.is_file() and _is_image(path.name) and key not in done:
+            yield key, path.read_bytes()
+
+
+def iter_tar(archive, done):
+    with tarfile.open(archive, "r:*") as tar:
+        for member in tar:
+            if member.isfile() and _is_image(member.name) and member.name not in done:
+                yield member.name, tar.extractfile(member).read()
+
+
+def iter_manifest(manifest, done):
+    """Manifest lines are either a path or JSON like {"key": ..., "path": ...}"""
+    base = Path(manifest).parent
+    with open(manifest) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                entry = json.loads(line)
+                path, key = entry["path"], entry.get("key", entry["path"])
+            else:
+                path = key = line
+            if key in done:
+                continue
+            full_path = Path(path) if os.path.isabs(path) else base / path
+            yield key, full_path.read_bytes()
+
+
+def iter_source(source, done):
+    if os.path.isdir(source):
+        return iter_directory(source, done)
+    if tarfile.is_tarfile(source):
+        return iter_tar(source, done)
+    return iter_manifest(source, done)
+
+
+def load_done_keys(output_path):
+    """Keys that already have a successful result in the output file"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # partially written last line from an interrupted run
+            if "error" not in record:
+                done.add(record["key"])
+    return done
+
+
+def _decode_and_prepare(item):
+    """Pool worker: raw bytes -> (key, model input or None, error or None)"""
+    from app.service.plant_classification_service import decode_image, prepare_input
+
+    key, image_bytes = item
+    try:
+        return key, prepare_input(decode_image(image_bytes))[0], None
+    except Exception as e:
+        return key, None, str(e)
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def run(args):
+    done = load_done_keys(args.output)
+    if done:
+        print(f"⏩ Resuming: {len(done)} images already classified")
+
+    # Fork the decode workers before ONNX Runtime starts its thread pools
+    pool = Pool(args.workers)
+
+    from app.service import plant_classification_service as classifier
+    if args.model:
+        classifier.MODEL_PATH = Path(args.model)
+    classifier.initialize_model()
+
+    processed = errors = 0
+    start = last_report = time.perf_counter()
+    # Bound in-flight work so huge archives never sit fully in memory
+    window = args.batch_size * args.workers * 2
+    try:
+        with open(args.output, "a", encoding="utf-8") as out:
+            for chunk in _batched(iter_source(args.source, done), window):
+                prepared = pool.imap(_decode_and_prepare, chunk, chunksize=max(1, args.batch_size // 4))
+                for batch in _batched(prepared, args.batch_size):
+                    ok = [(key, arr) for key, arr, err in batch if err is None]
+                    for key, _, err in batch:
+                        if err is not None:
+                            out.write(json.dumps({"key": key, "error": err}) + "\n")
+                            errors += 1
+                    if ok:
+                        results = classifier.classify_batch(np.stack([arr for _, arr in ok]), top_k=args.top_k)
+                        for (key, _), result in zip(ok, results):
+                            out.write(json.dumps({"key": key, **result}) + "\n")
+                    out.flush()
+                    processed += len(batch)
+
+                    now = time.perf_counter()
+                    if now - last_report >= args.report_every:
+                        print(f"📈 {processed} images, {processed / (now - start):.1f} images/sec, {errors} errors")
+                        last_report = now
+    finally:
+        pool.close()
+        pool.join()
+
+    elapsed = time.perf_counter() - start
+    rate = processed / elapsed if elapsed else 0.0
+    print(f"✅ Classified {processed} images in {elapsed:.1f}s ({rate:.1f} images/sec), {errors} errors -> {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classify a directory, tar archive or manifest of plant images")
+    parser.add_argument("source", help="Directory, .tar/.tar.gz archive, or manifest file")
+    parser.add_argument("--output", default="classifications.jsonl")
+    parser.add_argument("--model", help="ONNX model to use instead of MODEL_PATH")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--report-every", type=float, default=10.0, help="Seconds between progress lines")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
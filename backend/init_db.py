@@ -3,15 +3,16 @@ Database initialization script for Supabase PostgreSQL
 Run this script once to create tables and seed initial data
 """
 
-from app.database import engine, Base
+import migrations
+from app.database import engine
 from app.models import PlantData, UserPlant
 from sqlalchemy.orm import Session
 from datetime import datetime
 
 def create_tables():
-    """Create all database tables"""
-    print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
+    """Create or upgrade all database tables by applying pending migrations"""
+    print("Applying database migrations...")
+    migrations.upgrade(engine)
     print("✅ Tables created successfully!")
 
 def seed_plant_data():
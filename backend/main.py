@@ -1,17 +1,25 @@
+import asyncio
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 # from sqlalchemy.orm import Session
 
 # Import layers
-from app.repository.plant_data_repository import PlantDataRepository
 from app.repository.user_plant_repository import UserPlantRepository
-from app.service.plant_data_service import PlantDataService
+from app.service.plant_data_service import plant_data_service
 from app.service.user_plant_service import UserPlantService
 from app.controller.plant_data_controller import PlantDataController
 from app.controller.user_plant_controller import UserPlantController
 from app.controller.vision_controller import VisionController
 from app.controller.plant_classification_controller import router as classification_router
+from app.controller.admin_controller import router as admin_router
+from app.controller.assistant_controller import router as assistant_router
+from app.controller.garden_stats_controller import router as garden_stats_router
+from app.controller.photo_controller import router as photo_router
 from app.service.plant_classification_service import initialize_model
+from app.service import garden_stats_service, memory_diagnostics_service, gemini_proxy_service, shadow_evaluation_service
+from app.compression import CompressionMiddleware
+from app.rate_limit import RATE_LIMIT_HEADERS, RateLimitMiddleware
+from app.database import replica_pool
 
 # Create FastAPI app
 app = FastAPI(
@@ -20,6 +28,9 @@ app = FastAPI(
     description="Plant care companion API with Supabase PostgreSQL backend"
 )
 
+# Per-device token buckets for inference and catalog endpoints (inside CORS so 429s stay readable)
+app.add_middleware(RateLimitMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -27,15 +38,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=RATE_LIMIT_HEADERS,
 )
 
+# Compress JSON responses (gzip, or brotli when installed) above a size threshold
+app.add_middleware(CompressionMiddleware)
+
 
-# def get_plant_data_controller(db: Session = Depends(get_db)) -> PlantDataController:
-#     plant_data_repo = PlantDataRepository()
-#     plant_data_repo.set_db_session(db)
-#     plant_data_service = PlantDataService(plant_data_repo)
-#     return PlantDataController(plant_data_service)
-#
 # def get_user_plant_controller(db: Session = Depends(get_db)) -> UserPlantController:
 #     user_plant_repo = UserPlantRepository()
 #     user_plant_repo.set_db_session(db)
@@ -44,15 +53,52 @@ app.add_middleware(
 #     user_plant_controller = UserPlantController(user_plant_service)
 #     return plant_data_controller, user_plant_controller
 
-# Only register the classification router for now. Database-backed routers are disabled.
+# Plant data repository/service are application-scoped singletons taking a session per call.
+# The user plant router stays disabled until it gets the same treatment.
+app.include_router(PlantDataController(plant_data_service).router)
 app.include_router(classification_router)
+app.include_router(admin_router)
+app.include_router(assistant_router)
+app.include_router(garden_stats_router)
+app.include_router(photo_router)
+
+# Long-running startup tasks; the event loop only keeps weak references to tasks
+background_tasks = set()
+
+
+def start_background_task(coro):
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
 
 # Initialize ML model on startup
 @app.on_event("startup")
 async def startup_event():
+    if memory_diagnostics_service.MEMORY_DIAGNOSTICS:
+        memory_diagnostics_service.enable()
+    if memory_diagnostics_service.MEMORY_SOFT_LIMIT_MB > 0:
+        start_background_task(memory_diagnostics_service.memory_watchdog())
     print("[App] Initializing plant classification model...")
     initialize_model()
+    shadow_evaluation_service.start()
     print("[App] Model initialization complete")
+    garden_stats_service.load_snapshot()
+    if gemini_proxy_service.GEMINI_PREWARM_TOP > 0:
+        # Warm the genera users actually keep (from the garden stats snapshot)
+        popular = garden_stats_service.get_global_stats(gemini_proxy_service.GEMINI_PREWARM_TOP)["popular_genera"]
+        start_background_task(gemini_proxy_service.prewarm(
+            gemini_proxy_service.prewarm_genera(ranked=[entry["genus"] for entry in popular])
+        ))
+    if garden_stats_service.GARDEN_STATS_SNAPSHOT_SECONDS > 0:
+        start_background_task(garden_stats_service.snapshot_loop())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    for task in list(background_tasks):
+        task.cancel()
+    garden_stats_service.save_snapshot()
 
 # Root endpoint
 @app.get("/")
@@ -67,7 +113,7 @@ async def root():
 # Health check
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "version": "1.0.0", "database": "connected"}
+    return {"status": "healthy", "version": "1.0.0", "database": "connected", "replicas": replica_pool.status()}
 
 if __name__ == "__main__":
     import uvicorn
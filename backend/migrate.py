@@ -0,0 +1,34 @@
+"""
+Apply or revert versioned schema migrations (see migrations/__init__.py)
+
+Usage:
+    python migrate.py                 # apply all pending migrations
+    python migrate.py upgrade 2       # apply up to version 2
+    python migrate.py downgrade 1     # revert everything newer than version 1
+    python migrate.py status
+"""
+import argparse
+
+import migrations
+from app.database import engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Versioned schema migrations")
+    parser.add_argument("command", nargs="?", default="upgrade", choices=["upgrade", "downgrade", "status"])
+    parser.add_argument("target", nargs="?", type=int, help="Target version")
+    args = parser.parse_args()
+
+    if args.command == "upgrade":
+        migrations.upgrade(engine, args.target)
+    elif args.command == "downgrade":
+        if args.target is None:
+            parser.error("downgrade needs a target version (0 reverts everything)")
+        migrations.downgrade(engine, args.target)
+    else:
+        for migration, applied in migrations.status(engine):
+            print(f"{'✅' if applied else '⏳'} {migration}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Versioned schema migrations
+
+Each module in migrations/versions is named v<NNN>_<description>.py and defines
+upgrade(conn) and downgrade(conn). Applied versions are recorded in the
+schema_migrations table. A module may also define:
+
+    TRANSACTIONAL = False   run outside a transaction (CREATE INDEX CONCURRENTLY)
+    should_apply(conn)      return False to leave an optional migration pending
+
+Run with `python migrate.py` from the backend directory.
+"""
+import importlib
+import re
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+
+VERSIONS_DIR = Path(__file__).parent / "versions"
+MIGRATIONS_TABLE = "schema_migrations"
+
+_VERSION_FILE = re.compile(r"^v(\d+)_(\w+)\.py$")
+
+
+class Migration:
+    def __init__(self, version, name, module):
+        self.version = version
+        self.name = name
+        self.module = module
+        self.transactional = getattr(module, "TRANSACTIONAL", True)
+
+    def should_apply(self, conn):
+        check = getattr(self.module, "should_apply", None)
+        return check is None or check(conn)
+
+    def __repr__(self):
+        return f"v{self.version:03d}_{self.name}"
+
+
+def discover():
+    """All migrations on disk, ordered by version"""
+    migrations = []
+    for path in VERSIONS_DIR.glob("v*.py"):
+        match = _VERSION_FILE.match(path.name)
+        if match:
+            module = importlib.import_module(f"{__name__}.versions.{path.stem}")
+            migrations.append(Migration(int(match.group(1)), match.group(2), module))
+    migrations.sort(key=lambda m: m.version)
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration versions in {VERSIONS_DIR}")
+    return migrations
+
+
+def _ensure_table(engine):
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} "
+            "(version INTEGER PRIMARY KEY, name VARCHAR(200) NOT NULL, applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+        ))
+
+
+def applied_versions(engine):
+    _ensure_table(engine)
+    with engine.connect() as conn:
+        return {row[0] for row in conn.execute(text(f"SELECT version FROM {MIGRATIONS_TABLE}"))}
+
+
+def _run(engine, migration, direction):
+    """Run one migration step and record it in the same transaction when possible"""
+    if direction == "upgrade":
+        record = text(f"INSERT INTO {MIGRATIONS_TABLE} (version, name) VALUES (:version, :name)")
+    else:
+        record = text(f"DELETE FROM {MIGRATIONS_TABLE} WHERE version = :version")
+    params = {"version": migration.version, "name": migration.name}
+
+    start = time.perf_counter()
+    if migration.transactional:
+        with engine.begin() as conn:
+            getattr(migration.module, direction)(conn)
+            conn.execute(record, params)
+    else:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            getattr(migration.module, direction)(conn)
+            conn.execute(record, params)
+    print(f"[Migrations] {direction} {migration} ({time.perf_counter() - start:.1f}s)")
+
+
+def upgrade(engine, target=None):
+    """
+    Apply pending migrations up to and including target (default: all)
+
+    Returns:
+        List of applied migrations
+    """
+    applied = applied_versions(engine)
+    done = []
+    for migration in discover():
+        if target is not None and migration.version > target:
+            break
+        if migration.version in applied:
+            continue
+        with engine.connect() as conn:
+            wanted = migration.should_apply(conn)
+        if not wanted:
+            print(f"[Migrations] {migration} not enabled here, left pending")
+            continue
+        _run(engine, migration, "upgrade")
+        done.append(migration)
+    if not done:
+        print("[Migrations] Schema is up to date")
+    return done
+
+
+def downgrade(engine, target):
+    """
+    Revert applied migrations newer than target (0 reverts everything)
+
+    Returns:
+        List of reverted migrations
+    """
+    applied = applied_versions(engine)
+    done = []
+    for migration in reversed(discover()):
+        if migration.version <= target:
+            break
+        if migration.version in applied:
+            _run(engine, migration, "downgrade")
+            done.append(migration)
+    return done
+
+
+def status(engine):
+    """(migration, applied) pairs for every migration on disk"""
+    applied = applied_versions(engine)
+    known = {m.version for m in discover()}
+    for version in sorted(applied - known):
+        print(f"[Migrations] ⚠️  Version {version} is applied but missing from {VERSIONS_DIR}")
+    return [(migration, migration.version in applied) for migration in discover()]
@@ -0,0 +1,50 @@
+"""
+Baseline: plant_data and user_plants as created by Base.metadata.create_all
+
+Uses checkfirst, so databases initialized before migrations existed adopt
+this version without changes.
+"""
+from sqlalchemy import Boolean, Column, DateTime, Integer, MetaData, String, Table, Text
+from sqlalchemy.sql import func
+
+metadata = MetaData()
+
+plant_data = Table(
+    "plant_data", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(100), nullable=False, index=True),
+    Column("scientific_name", String(150)),
+    Column("description", Text),
+    Column("care_instructions", Text),
+    Column("watering_frequency_days", Integer),
+    Column("sunlight_requirement", String(50)),
+    Column("difficulty_level", String(20)),
+    Column("image_url", String(255)),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True)),
+)
+
+user_plants = Table(
+    "user_plants", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", String(100), nullable=False, index=True),
+    Column("plant_data_id", Integer, nullable=False),
+    Column("nickname", String(100)),
+    Column("date_planted", DateTime(timezone=True)),
+    Column("last_watered", DateTime(timezone=True)),
+    Column("last_fertilized", DateTime(timezone=True)),
+    Column("notes", Text),
+    Column("is_active", Boolean),
+    Column("custom_watering_frequency", Integer),
+    Column("location", String(100)),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True)),
+)
+
+
+def upgrade(conn):
+    metadata.create_all(conn, checkfirst=True)
+
+
+def downgrade(conn):
+    metadata.drop_all(conn, checkfirst=True)
@@ -0,0 +1,41 @@
+"""
+Indexes for the garden queries on user_plants
+
+- (user_id, is_active): a user's plants filtered by active state; replaces
+  the single-column user_id index, which is its prefix
+- (user_id, last_watered) WHERE active: a user's active plants in watering order
+- (last_watered) WHERE active: watering reminders across all users
+- (plant_data_id): catalog joins and the foreign key added in v003
+
+On PostgreSQL the indexes are built CONCURRENTLY so the table stays writable.
+"""
+TRANSACTIONAL = False
+
+# Partial index predicates must match the query text for SQLite's planner to use them
+ACTIVE = {"postgresql": "is_active", "sqlite": "is_active = 1"}
+
+
+def _indexes(dialect):
+    active = ACTIVE.get(dialect, "is_active = TRUE")
+    return [
+        ("ix_user_plants_user_id_is_active", "(user_id, is_active)", ""),
+        ("ix_user_plants_active_due", "(user_id, last_watered)", f" WHERE {active}"),
+        ("ix_user_plants_active_last_watered", "(last_watered)", f" WHERE {active}"),
+        ("ix_user_plants_plant_data_id", "(plant_data_id)", ""),
+    ]
+
+
+def upgrade(conn):
+    dialect = conn.dialect.name
+    concurrently = "CONCURRENTLY " if dialect == "postgresql" else ""
+    for name, columns, where in _indexes(dialect):
+        conn.exec_driver_sql(f"CREATE INDEX {concurrently}IF NOT EXISTS {name} ON user_plants {columns}{where}")
+    conn.exec_driver_sql(f"DROP INDEX {concurrently}IF EXISTS ix_user_plants_user_id")
+
+
+def downgrade(conn):
+    dialect = conn.dialect.name
+    concurrently = "CONCURRENTLY " if dialect == "postgresql" else ""
+    conn.exec_driver_sql(f"CREATE INDEX {concurrently}IF NOT EXISTS ix_user_plants_user_id ON user_plants (user_id)")
+    for name, _, _ in _indexes(dialect):
+        conn.exec_driver_sql(f"DROP INDEX {concurrently}IF EXISTS {name}")
@@ -0,0 +1,33 @@
+"""
+Foreign key user_plants.plant_data_id -> plant_data.id
+
+Added NOT VALID and then validated as separate autocommitted statements:
+ADD CONSTRAINT ... NOT VALID only holds its lock briefly, and VALIDATE
+CONSTRAINT scans existing rows under a lock that does not block writes. Run
+in one transaction, the ADD lock would be held through the whole scan. If
+validation fails, rerunning the migration skips the ADD and validates again.
+SQLite cannot add a constraint to an existing table; there the step is
+recorded but has no effect.
+"""
+TRANSACTIONAL = False
+
+CONSTRAINT = "fk_user_plants_plant_data_id"
+
+
+def upgrade(conn):
+    if conn.dialect.name == "sqlite":
+        print("[Migrations] SQLite cannot add a foreign key to an existing table, skipping constraint")
+        return
+    exists = conn.exec_driver_sql(f"SELECT 1 FROM pg_constraint WHERE conname = '{CONSTRAINT}'").first()
+    if exists is None:
+        conn.exec_driver_sql(
+            f"ALTER TABLE user_plants ADD CONSTRAINT {CONSTRAINT} "
+            "FOREIGN KEY (plant_data_id) REFERENCES plant_data (id) NOT VALID"
+        )
+    conn.exec_driver_sql(f"ALTER TABLE user_plants VALIDATE CONSTRAINT {CONSTRAINT}")
+
+
+def downgrade(conn):
+    if conn.dialect.name == "sqlite":
+        return
+    conn.exec_driver_sql(f"ALTER TABLE user_plants DROP CONSTRAINT IF EXISTS {CONSTRAINT}")
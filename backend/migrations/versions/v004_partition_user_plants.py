@@ -0,0 +1,93 @@
+"""
+Optional: hash-partition user_plants by user_id (PostgreSQL only)
+
+Enabled by setting USER_PLANTS_HASH_PARTITIONS to the number of partitions;
+otherwise the migration stays pending and can be applied later. Every query
+for one user then touches a single partition.
+
+The table is rebuilt (rename, create partitioned, copy, drop), which locks
+user_plants for the duration of the copy; run it in a maintenance window.
+A partitioned table's primary key must include the partition key, so the
+primary key becomes (id, user_id); ids still come from the same sequence.
+"""
+import os
+
+SECONDARY_INDEXES = [
+    "CREATE INDEX ix_user_plants_user_id_is_active ON {table} (user_id, is_active)",
+    "CREATE INDEX ix_user_plants_active_due ON {table} (user_id, last_watered) WHERE is_active",
+    "CREATE INDEX ix_user_plants_active_last_watered ON {table} (last_watered) WHERE is_active",
+    "CREATE INDEX ix_user_plants_plant_data_id ON {table} (plant_data_id)",
+]
+INDEX_NAMES = [
+    "ix_user_plants_user_id_is_active",
+    "ix_user_plants_active_due",
+    "ix_user_plants_active_last_watered",
+    "ix_user_plants_plant_data_id",
+]
+FOREIGN_KEY = ("ALTER TABLE user_plants ADD CONSTRAINT fk_user_plants_plant_data_id "
+               "FOREIGN KEY (plant_data_id) REFERENCES plant_data (id)")
+
+COLUMNS = """
+    id INTEGER NOT NULL DEFAULT nextval('user_plants_id_seq'),
+    user_id VARCHAR(100) NOT NULL,
+    plant_data_id INTEGER NOT NULL,
+    nickname VARCHAR(100),
+    date_planted TIMESTAMP WITH TIME ZONE,
+    last_watered TIMESTAMP WITH TIME ZONE,
+    last_fertilized TIMESTAMP WITH TIME ZONE,
+    notes TEXT,
+    is_active BOOLEAN,
+    custom_watering_frequency INTEGER,
+    location VARCHAR(100),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+    updated_at TIMESTAMP WITH TIME ZONE
+"""
+
+
+def partition_count():
+    return int(os.getenv("USER_PLANTS_HASH_PARTITIONS", "0"))
+
+
+def should_apply(conn):
+    return conn.dialect.name == "postgresql" and partition_count() > 0
+
+
+def _swap_out_old_table(conn, old_name):
+    """Rename the current table and free its index/constraint names for the new one"""
+    conn.exec_driver_sql(f"ALTER TABLE user_plants RENAME TO {old_name}")
+    conn.exec_driver_sql(f"ALTER INDEX user_plants_pkey RENAME TO {old_name}_pkey")
+    conn.exec_driver_sql(f"ALTER TABLE {old_name} DROP CONSTRAINT IF EXISTS fk_user_plants_plant_data_id")
+    for name in INDEX_NAMES + ["ix_user_plants_id", "ix_user_plants_user_id"]:
+        conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+
+
+def _finish_new_table(conn, old_name):
+    conn.exec_driver_sql(f"INSERT INTO user_plants SELECT * FROM {old_name}")
+    conn.exec_driver_sql("ALTER SEQUENCE user_plants_id_seq OWNED BY user_plants.id")
+    conn.exec_driver_sql(f"DROP TABLE {old_name}")
+    for statement in SECONDARY_INDEXES:
+        conn.exec_driver_sql(statement.format(table="user_plants"))
+    conn.exec_driver_sql(FOREIGN_KEY)
+    conn.exec_driver_sql("ANALYZE user_plants")
+
+
+def upgrade(conn):
+    partitions = partition_count()
+    _swap_out_old_table(conn, "user_plants_unpartitioned")
+    conn.exec_driver_sql(
+        f"CREATE TABLE user_plants ({COLUMNS}, PRIMARY KEY (id, user_id)) PARTITION BY HASH (user_id)"
+    )
+    for remainder in range(partitions):
+        conn.exec_driver_sql(
+            f"CREATE TABLE user_plants_p{remainder} PARTITION OF user_plants "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        )
+    _finish_new_table(conn, "user_plants_unpartitioned")
+    print(f"[Migrations] user_plants hash-partitioned by user_id into {partitions} partitions")
+
+
+def downgrade(conn):
+    _swap_out_old_table(conn, "user_plants_partitioned")
+    conn.exec_driver_sql(f"CREATE TABLE user_plants ({COLUMNS}, PRIMARY KEY (id))")
+    conn.exec_driver_sql("CREATE INDEX ix_user_plants_id ON user_plants (id)")
+    _finish_new_table(conn, "user_plants_partitioned")
@@ -0,0 +1,8 @@
+"""
+Shared test setup (run from backend/: python -m pytest tests)
+"""
+import os
+
+# app.database connects at import time: keep the suite off any real or replica database
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ["DATABASE_REPLICA_URLS"] = ""
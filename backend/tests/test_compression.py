@@ -0,0 +1,116 @@
+"""
+Response compression and encoding-specific ETags (run from backend/: python -m pytest tests)
+"""
+import asyncio
+import gzip
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app import compression
+from app.compression import CompressionMiddleware, select_encoding, strip_encoding_suffix
+from app.http_cache import RepresentationCache
+
+PAYLOAD = [{"id": i, "name": f"Fern {i}", "description": "frond " * 20} for i in range(50)]
+
+
+@pytest.mark.parametrize("accept,encodings,expected", [
+    ("gzip, deflate, br", ["br", "gzip"], "br"),
+    ("gzip, br;q=0", ["br", "gzip"], "gzip"),
+    ("br;q=0.5, gzip;q=1", ["br", "gzip"], "br"),  # server preference wins among accepted
+    ("*", ["gzip"], "gzip"),
+    ("*, gzip;q=0", ["gzip"], None),
+    ("identity", ["br", "gzip"], None),
+    ("", ["gzip"], None),
+])
+def test_select_encoding(accept, encodings, expected):
+    assert select_encoding(accept, encodings) == expected
+
+
+def test_brotli_only_offered_when_installed(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert compression.available_encodings("br,gzip") == ["gzip"]
+
+
+def test_strip_encoding_suffix():
+    assert strip_encoding_suffix('"abc-gzip"') == '"abc"'
+    assert strip_encoding_suffix('W/"abc-br"') == '"abc"'
+    assert strip_encoding_suffix('"abc"') == '"abc"'
+
+
+def make_client(encodings="br,gzip"):
+    app = FastAPI()
+    cache = RepresentationCache("public, max-age=60")
+
+    @app.get("/catalog")
+    async def catalog(request: Request):
+        return cache.respond(request, "all", lambda: PAYLOAD)
+
+    @app.get("/tiny")
+    async def tiny(request: Request):
+        return cache.respond(request, "tiny", lambda: {"ok": True})
+
+    app.add_middleware(CompressionMiddleware, encodings=encodings)
+    return TestClient(app)
+
+
+def test_gzip_response_has_its_own_etag():
+    client = make_client("gzip")
+    identity = client.get("/catalog", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+
+    response = client.get("/catalog", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.headers["etag"] == identity.headers["etag"][:-1] + '-gzip"'
+    assert response.json() == PAYLOAD  # httpx decodes transparently
+    assert len(response.content) > int(response.headers["content-length"])
+
+
+def test_small_bodies_are_not_compressed():
+    response = make_client("gzip").get("/tiny", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_revalidation_returns_304_per_encoding():
+    client = make_client("gzip")
+    gzipped = client.get("/catalog", headers={"Accept-Encoding": "gzip"})
+    etag = gzipped.headers["etag"]
+
+    not_modified = client.get("/catalog", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+    assert not_modified.content == b""
+
+    identity = client.get("/catalog", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert identity.status_code == 304
+    assert identity.headers["etag"] == etag[:-len('-gzip"')] + '"'
+
+
+def test_streamed_body_is_compressed_incrementally():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        for chunk in (b"leaf " * 100, b"stem " * 100):
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+    asyncio.run(CompressionMiddleware(app, encodings="gzip")(scope, None, send))
+    headers = dict(sent[0]["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    assert gzip.decompress(b"".join(m["body"] for m in sent[1:])) == b"leaf " * 100 + b"stem " * 100
+
+
+def test_brotli_round_trip():
+    pytest.importorskip("brotli")
+    response = make_client("br,gzip").get("/catalog", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["etag"].endswith('-br"')
+    assert response.json() == PAYLOAD
@@ -0,0 +1,101 @@
+"""
+Catalog crawler resume and retry behavior, against the local stub server (run from backend/: python -m pytest tests)
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "scraper"))
+httpx = pytest.importorskip("httpx")
+crawl_catalog = pytest.importorskip("crawl_catalog")
+from mock_plantcaretoday_server import MockPlantCareTodayHandler  # noqa: E402
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    monkeypatch.setattr(MockPlantCareTodayHandler, "requests_seen", {})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockPlantCareTodayHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/{{slug}}.html"
+    server.shutdown()
+
+
+def crawl(tmp_path, url_template, plants, **kwargs):
+    async def go():
+        async with httpx.AsyncClient() as client:
+            crawler = crawl_catalog.CatalogCrawler(
+                client,
+                crawl_catalog.HttpCache(str(tmp_path / "cache")),
+                crawl_catalog.Checkpoint(str(tmp_path / "checkpoint.txt")),
+                str(tmp_path / "out.jsonl"),
+                rate_per_host=0,
+                url_template=url_template,
+                **kwargs,
+            )
+            return await crawler.crawl([(name, None) for name in plants])
+
+    return asyncio.run(go())
+
+
+def read_records(tmp_path):
+    with open(tmp_path / "out.jsonl", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_resume_skips_written_plants_without_duplicates(tmp_path, stub):
+    stats = crawl(tmp_path, stub, ["Snake Plant", "Peace Lily"])
+    assert stats["fetched"] == 2
+
+    # Crash between writing the record and the checkpoint, plus a torn final line
+    (tmp_path / "checkpoint.txt").write_text("Snake Plant\n")
+    with open(tmp_path / "out.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"plant": "Fiddle Le')
+
+    stats = crawl(tmp_path, stub, ["Snake Plant", "Peace Lily", "Fiddle Leaf Fig"])
+    assert stats["skipped"] == 2
+    assert stats["fetched"] == 1
+    plants = [record["plant"] for record in read_records(tmp_path)]
+    assert sorted(plants) == ["Fiddle Leaf Fig", "Peace Lily", "Snake Plant"]
+    assert "likes bright, indirect light" in read_records(tmp_path)[-1]["summary"]
+
+
+def test_retry_waits_for_retry_after(tmp_path, stub, monkeypatch):
+    monkeypatch.setattr(MockPlantCareTodayHandler, "flaky", 1)
+    monkeypatch.setattr(MockPlantCareTodayHandler, "retry_after", 7)
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(delay, *args, **kwargs):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(crawl_catalog.asyncio, "sleep", fake_sleep)
+    stats = crawl(tmp_path, stub, ["Snake Plant"], backoff=0.01)
+    assert stats["fetched"] == 1
+    assert 7 in delays
+    assert MockPlantCareTodayHandler.requests_seen == {"snake-plant": 2}
+
+
+@pytest.mark.parametrize("value,expected", [
+    ("5", 5.0),
+    ("-3", 0.0),
+    ("100000", crawl_catalog.MAX_RETRY_AFTER),
+    ("soon", None),
+])
+def test_retry_after_seconds(value, expected):
+    response = httpx.Response(503, headers={"Retry-After": value})
+    assert crawl_catalog.retry_after_seconds(response) == expected
+
+
+def test_retry_after_http_date():
+    response = httpx.Response(503, headers={"Retry-After": formatdate(time.time() + 30, usegmt=True)})
+    assert 25 <= crawl_catalog.retry_after_seconds(response) <= 30
+    assert crawl_catalog.retry_after_seconds(httpx.Response(503)) is None
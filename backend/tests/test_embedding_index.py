@@ -0,0 +1,51 @@
+"""
+The persistent similarity index is only writable by admins (run from backend/: python -m pytest tests)
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import admin_auth
+from app.controller import plant_classification_controller
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(admin_auth, "ADMIN_TOKEN", "secret")
+    added = []
+    monkeypatch.setattr(plant_classification_controller, "decode_image", lambda data: data)
+    monkeypatch.setattr(plant_classification_controller, "extract_embedding", lambda image: [0.0])
+
+    class Index:
+        def add(self, keys, vector):
+            added.extend(keys)
+
+        def search(self, vector, k):
+            return [[("photo-1", 1.0)]]
+
+        def __len__(self):
+            return len(added)
+
+    monkeypatch.setattr(plant_classification_controller, "get_vector_index", Index)
+    app = FastAPI()
+    app.include_router(plant_classification_controller.router)
+    client = TestClient(app)
+    client.added = added
+    return client
+
+
+def test_index_write_requires_admin_token(client):
+    files = {"file": ("leaf.jpg", b"jpeg")}
+    assert client.post("/api/classify/embedding/index?key=x", files=files).status_code == 401
+    assert client.post("/api/classify/embedding/index?key=x", files=files,
+                       headers={"X-Admin-Token": "wrong"}).status_code == 401
+    response = client.post("/api/classify/embedding/index?key=x", files=files, headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert client.added == ["x"]
+
+
+def test_public_search_never_writes(client):
+    response = client.post("/api/classify/similar?k=1&key=x", files={"file": ("leaf.jpg", b"jpeg")})
+    assert response.status_code == 200
+    assert response.json()["results"] == [{"key": "photo-1", "score": 1.0}]
+    assert client.added == []
@@ -0,0 +1,76 @@
+"""
+Regression tests for garden_stats_service (run from backend/: python -m pytest tests)
+"""
+import importlib
+import json
+import time
+
+import pytest
+
+from app.service import garden_stats_service
+
+
+@pytest.fixture
+def stats(tmp_path, monkeypatch):
+    module = importlib.reload(garden_stats_service)
+    monkeypatch.setattr(module, "GARDEN_STATS_PATH", tmp_path / "garden_stats.json")
+    return module
+
+
+def test_huge_interval_is_rejected_without_touching_state(stats):
+    now = time.time()
+    stats.upsert_plant("u1", "p1", "Ficus", "kitchen", 7, now - 86400)
+    with pytest.raises(ValueError):
+        stats.upsert_plant("u1", "p2", "Ficus", "kitchen", 1e306, now)
+
+    assert stats.get_user_stats("u1")["plants"] == 1
+    assert stats.get_global_stats()["plants"] == 1
+    assert stats.remove_plant("u1", "p1")
+    assert stats.get_global_stats()["plants"] == 0
+
+
+def test_out_of_range_timestamps_are_rejected(stats):
+    stats.upsert_plant("u1", "p1", "Ficus", "kitchen", 7, time.time() - 86400)
+    with pytest.raises(ValueError):
+        stats.upsert_plant("u1", "p2", "Ficus", "kitchen", 7, 1e18)
+    with pytest.raises(ValueError):
+        stats.record_watering("u1", "p1", 1e18)
+    assert stats.get_global_stats()["adherence"]["waterings"] == 0
+
+
+def test_snapshot_with_invalid_rows_still_loads(stats):
+    now = time.time()
+    stats.upsert_plant("u1", "p1", "Ficus", "kitchen", 7, now - 86400)
+    stats.save_snapshot()
+    data = json.loads(stats.GARDEN_STATS_PATH.read_text())
+    data["plants"].append(["u1", "bad", {"genus": None, "location": "x",
+                                         "watering_interval_days": 1e306, "last_watered": now}])
+    data["plants"].append(["u2", "nan", {"genus": None, "location": "x",
+                                         "watering_interval_days": 7, "last_watered": float("nan")}])
+    stats.GARDEN_STATS_PATH.write_text(json.dumps(data))
+
+    assert stats.load_snapshot()
+    assert stats.get_global_stats()["plants"] == 1
+
+
+def test_unreadable_snapshot_is_ignored(stats):
+    stats.GARDEN_STATS_PATH.write_text("{not json")
+    assert not stats.load_snapshot()
+    assert stats.get_global_stats()["plants"] == 0
+
+
+def test_locations_and_genera_are_bounded(stats, monkeypatch):
+    monkeypatch.setattr(stats, "GARDEN_MAX_LOCATIONS", 5)
+    now = time.time()
+    for i in range(50):
+        stats.upsert_plant(f"u{i}", "p", f"made-up genus {i}", f"Room {i}", 1, now - 10 * 86400)
+
+    global_stats = stats.get_global_stats(top=100)
+    assert len(global_stats["plants_by_location"]) == 6  # 5 tracked + "other"
+    assert global_stats["plants_by_location"]["other"] == 45
+    assert global_stats["popular_genera"] == []
+    assert global_stats["overdue"]["total"] == 50
+
+    stats.upsert_plant("u0", "p", "Ficus lyrata", "  ROOM   1 ", 1, now - 10 * 86400)
+    assert stats.get_user_stats("u0")["genera"] == {"Ficus": 1}
+    assert stats.get_user_stats("u0")["plants_by_location"] == {"room 1": 1}
@@ -0,0 +1,64 @@
+"""
+HTTP caching helpers: byte ranges (run from backend/: python -m pytest tests)
+"""
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.http_cache import RangeNotSatisfiable, immutable_response, parse_range
+
+
+@pytest.mark.parametrize("header,expected", [
+    (None, None),
+    ("bytes=0-3", (0, 3)),
+    ("bytes=4-", (4, 9)),
+    ("bytes=-3", (7, 9)),
+    ("bytes=-30", (0, 9)),
+    ("bytes=5-100", (5, 9)),
+    ("bytes=9-9", (9, 9)),
+    ("bytes=5-3", None),   # last < first: invalid, ignored
+    ("bytes=--3", None),
+    ("bytes=a-3", None),
+    ("bytes=-", None),
+    ("bytes=0-1,3-4", None),
+    ("items=0-3", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 10) == expected
+
+
+@pytest.mark.parametrize("header,length", [("bytes=10-", 10), ("bytes=12-15", 10), ("bytes=-0", 10), ("bytes=-5", 0)])
+def test_unsatisfiable_range(header, length):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(header, length)
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.get("/blob")
+    async def blob(request: Request):
+        return immutable_response(request, b"0123456789", "application/octet-stream", '"abc"')
+
+    return TestClient(app)
+
+
+def test_invalid_range_gets_full_body(client):
+    response = client.get("/blob", headers={"Range": "bytes=5-3"})
+    assert response.status_code == 200
+    assert response.content == b"0123456789"
+
+
+def test_range_responses(client):
+    response = client.get("/blob", headers={"Range": "bytes=2-4"})
+    assert response.status_code == 206
+    assert response.content == b"234"
+    assert response.headers["content-range"] == "bytes 2-4/10"
+
+    response = client.get("/blob", headers={"Range": "bytes=20-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */10"
+
+    assert client.get("/blob", headers={"Range": "bytes=2-4", "If-Range": '"old"'}).status_code == 200
+    assert client.get("/blob", headers={"If-None-Match": '"abc"'}).status_code == 304
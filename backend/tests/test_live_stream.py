@@ -0,0 +1,54 @@
+"""
+Live stream debouncing (run from backend/: python -m pytest tests)
+"""
+import pytest
+
+from app.service import live_classification_service as live
+
+
+@pytest.fixture
+def stream(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(live, "get_input_size", lambda: 8)
+    monkeypatch.setattr(live, "LIVE_MIN_UPDATE_INTERVAL_MS", 150.0)
+    monkeypatch.setattr(live.time, "perf_counter", lambda: clock[0])
+    stream = live.LiveStream()
+    stream.clock = clock
+    return stream
+
+
+def result(genus, confidence):
+    return {"top_prediction": {"genus": genus, "confidence": confidence}}
+
+
+def test_final_change_inside_interval_is_flushed(stream):
+    assert stream.should_send(result("Ficus", 0.9))
+    stream.clock[0] += 0.05
+    assert not stream.should_send(result("Hedera", 0.8))
+    assert stream.flush_delay() == pytest.approx(0.1)
+    assert stream.take_due_update() is None
+
+    stream.clock[0] += 0.11
+    frame, flushed = stream.take_due_update()
+    assert flushed["top_prediction"]["genus"] == "Hedera"
+    assert stream.take_due_update() is None
+    assert stream.flush_delay() is None
+    assert stream.updates_sent == 2
+
+
+def test_return_to_sent_result_cancels_flush(stream):
+    assert stream.should_send(result("Ficus", 0.9))
+    stream.clock[0] += 0.05
+    assert not stream.should_send(result("Hedera", 0.8))
+    assert not stream.should_send(result("Ficus", 0.91))
+    stream.clock[0] += 0.2
+    assert stream.take_due_update() is None
+
+
+def test_newer_send_supersedes_pending(stream):
+    assert stream.should_send(result("Ficus", 0.9))
+    stream.clock[0] += 0.05
+    assert not stream.should_send(result("Hedera", 0.8))
+    stream.clock[0] += 0.2
+    assert stream.should_send(result("Rosa", 0.7))
+    assert stream.take_due_update() is None
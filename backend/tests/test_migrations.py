@@ -0,0 +1,69 @@
+"""
+Schema migrations round-trip on SQLite (run from backend/: python -m pytest tests)
+"""
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+import migrations
+
+V002_INDEXES = {
+    "ix_user_plants_user_id_is_active",
+    "ix_user_plants_active_due",
+    "ix_user_plants_active_last_watered",
+    "ix_user_plants_plant_data_id",
+}
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+
+
+def index_names(engine):
+    return {index["name"] for index in inspect(engine).get_indexes("user_plants")}
+
+
+def test_upgrade_downgrade_upgrade(engine):
+    applied = [m.version for m in migrations.upgrade(engine)]
+    assert applied == [1, 2, 3]  # v004 partitioning is PostgreSQL-only and stays pending
+    assert V002_INDEXES <= index_names(engine)
+    assert "ix_user_plants_user_id" not in index_names(engine)
+    assert migrations.upgrade(engine) == []
+
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO plant_data (name) VALUES ('Fern')"))
+        conn.execute(text("INSERT INTO user_plants (user_id, plant_data_id, is_active) VALUES ('u1', 1, 1)"))
+
+    assert [m.version for m in migrations.downgrade(engine, 1)] == [3, 2]
+    assert not V002_INDEXES & index_names(engine)
+    assert "ix_user_plants_user_id" in index_names(engine)
+
+    assert [m.version for m in migrations.upgrade(engine)] == [2, 3]
+    assert V002_INDEXES <= index_names(engine)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM user_plants")).scalar() == 1
+
+    assert [m.version for m in migrations.downgrade(engine, 0)] == [3, 2, 1]
+    assert set(inspect(engine).get_table_names()) == {migrations.MIGRATIONS_TABLE}
+    assert migrations.applied_versions(engine) == set()
+
+    assert [m.version for m in migrations.upgrade(engine)] == [1, 2, 3]
+    assert {"plant_data", "user_plants"} <= set(inspect(engine).get_table_names())
+
+
+def test_status_lists_pending_optional_migration(engine):
+    migrations.upgrade(engine)
+    status = {migration.version: applied for migration, applied in migrations.status(engine)}
+    assert status == {1: True, 2: True, 3: True, 4: False}
+
+
+def test_baseline_adopts_existing_schema(engine):
+    from app.database import Base
+    from app import models  # noqa: F401 - registers the tables
+
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO plant_data (name) VALUES ('Fern')"))
+    assert [m.version for m in migrations.upgrade(engine)] == [1, 2, 3]
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT name FROM plant_data")).scalar() == "Fern"
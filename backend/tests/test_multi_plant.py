@@ -0,0 +1,26 @@
+"""
+Crop planning limits for multi-plant mode (run from backend/: python -m pytest tests)
+"""
+import pytest
+
+from app.service.multi_plant_service import MULTI_MAX_ASPECT_RATIO, plan_crops
+
+
+@pytest.mark.parametrize("height,width", [(480, 640), (1000, 9999), (9999, 1000), (50, 499), (3000, 4000)])
+@pytest.mark.parametrize("max_crops", [1, 4, 24])
+def test_plan_never_exceeds_max_crops(height, width, max_crops):
+    plan, total = plan_crops(height, width, 224, [1.0, 0.6, 0.4], 0.67, max_crops)
+    assert plan
+    assert total == sum(rows * cols for _, _, _, rows, cols in plan)
+    assert total <= max_crops
+
+
+def test_windows_stay_inside_resized_image():
+    for resized_h, resized_w, stride, rows, cols in plan_crops(1000, 9999, 224, [1.0], 0.5, 8)[0]:
+        assert resized_h == 224 + stride * (rows - 1)
+        assert resized_w == 224 + stride * (cols - 1)
+
+
+def test_extreme_aspect_ratio_is_rejected():
+    with pytest.raises(ValueError):
+        plan_crops(50, int(50 * MULTI_MAX_ASPECT_RATIO) + 50, 224)
@@ -0,0 +1,29 @@
+"""
+Photo store upload limits (run from backend/: python -m pytest tests)
+"""
+import cv2 as cv
+import numpy as np
+import pytest
+
+from app.service.photo_store_service import PhotoStore, PhotoStoreFullError
+
+
+def _jpeg(seed):
+    img = np.random.default_rng(seed).integers(0, 255, (64, 96, 3), dtype=np.uint8)
+    return cv.imencode(".jpg", img)[1].tobytes()
+
+
+def test_empty_upload_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        PhotoStore(tmp_path).ingest(b"")
+
+
+def test_store_refuses_uploads_past_its_cap(tmp_path):
+    first = _jpeg(0)
+    store = PhotoStore(tmp_path, thumbnail_sizes=[32], max_bytes=len(first) * 2)
+    store.ingest(first)
+    with pytest.raises(PhotoStoreFullError):
+        store.ingest(_jpeg(1) * 2)
+    assert store.ingest(first)["deduplicated"]
+    assert store.stats()["photos"] == 1
+    assert store.stats()["rejected_full"] == 1
@@ -0,0 +1,73 @@
+"""
+Catalog repository: Core-row reads and single-statement updates (run from backend/: python -m pytest tests)
+"""
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+from app.controller.plant_data_controller import PlantDataController
+from app.database import Base, ReplicaPool, RoutingSession
+from app.http_cache import catalog_cache
+from app.models import PlantData
+from app.service.plant_data_service import plant_data_service as service
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'catalog.db'}")
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(database, "replica_pool", ReplicaPool([]))
+    session = sessionmaker(class_=RoutingSession, autoflush=False, bind=engine)()
+    session.add_all([PlantData(name="Boston Fern", scientific_name="Nephrolepis exaltata"),
+                     PlantData(name="Snake Plant", scientific_name="Dracaena trifasciata")])
+    session.commit()
+    session.statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        session.statements.append(statement.split()[0].upper())
+
+    yield session
+    session.close()
+
+
+def test_reads_return_core_rows(db):
+    plants = service.get_all_plants(db)
+    assert all(isinstance(plant, Row) for plant in plants)
+    assert not db.identity_map  # nothing hydrated into ORM instances
+    assert service.get_plant_by_id(db, 2).name == "Snake Plant"
+    assert service.get_plant_by_id(db, 99) is None
+    assert [plant.name for plant in service.search_plant_by_name(db, "FERN")] == ["Boston Fern"]
+
+    as_dict = PlantDataController(service)._plant_to_dict(plants[0])
+    assert as_dict["name"] == "Boston Fern"
+    assert as_dict["scientific_name"] == "Nephrolepis exaltata"
+
+
+def test_update_is_one_returning_statement(db):
+    plant = service.update_plant(db, 1, {"description": "Likes humidity", "id": 7, "bogus": "x"})
+    assert db.statements == ["UPDATE"]
+    assert plant.id == 1
+    assert plant.description == "Likes humidity"
+    assert plant.updated_at is not None  # onupdate default applied by the Core UPDATE
+    assert service.get_plant_by_id(db, 1).description == "Likes humidity"
+
+
+def test_update_missing_plant_returns_none(db):
+    assert service.update_plant(db, 99, {"name": "Ghost"}) is None
+    assert service.update_plant(db, 99, {"bogus": "x"}) is None
+    assert service.update_plant(db, 2, {"bogus": "x"}).name == "Snake Plant"
+
+
+def test_writes_invalidate_catalog_cache(db, monkeypatch):
+    calls = []
+    monkeypatch.setattr(catalog_cache, "invalidate", lambda: calls.append(1))
+    service.update_plant(db, 1, {"name": "Sword Fern"})
+    service.update_plant(db, 99, {"name": "Ghost"})
+    assert service.delete_plant(db, 2)
+    assert not service.delete_plant(db, 2)
+    assert len(calls) == 2
+    assert [plant.name for plant in service.get_all_plants(db)] == ["Sword Fern"]
@@ -0,0 +1,45 @@
+"""
+Device and per-address rate limiting (run from backend/: python -m pytest tests)
+"""
+from app.rate_limit import Budget, DevicesPerAddress, LocalBucketStore, RateLimiter
+
+
+def _limiter(burst=2, ip_multiplier=2, max_devices=3):
+    budget = Budget("inference", 0.001, burst, ("/api/classify/plant",))
+    return RateLimiter([budget], LocalBucketStore(), ip_multiplier=ip_multiplier,
+                       devices=DevicesPerAddress(max_devices, window=600)), budget
+
+
+def test_rotating_device_ids_hit_the_address_backstop():
+    limiter, budget = _limiter()
+    allowed = [limiter.check_client(f"dev-{i}", "10.0.0.1", budget, "/p").allowed for i in range(10)]
+    # Each new id has a fresh bucket, but the address allows burst * multiplier
+    assert allowed.count(True) == 4
+    assert limiter.check_client(None, "10.0.0.2", budget, "/p").allowed
+
+
+def test_new_device_ids_per_address_are_capped():
+    limiter, budget = _limiter(burst=100, ip_multiplier=0)
+    for i in range(3):
+        assert limiter.check_client(f"dev-{i}", "10.0.0.1", budget, "/p").allowed
+    limiter.check_client("dev-new", "10.0.0.1", budget, "/p")
+    assert limiter.devices.refused == 1
+    # Known ids and other addresses are unaffected
+    limiter.check_client("dev-0", "10.0.0.1", budget, "/p")
+    limiter.check_client("dev-new", "10.0.0.2", budget, "/p")
+    assert limiter.devices.refused == 1
+
+
+def test_device_ids_expire_after_the_window():
+    devices = DevicesPerAddress(max_devices=1, window=10)
+    assert devices.admit("a", "one", 0.0)
+    assert not devices.admit("a", "two", 5.0)
+    assert devices.admit("a", "two", 11.0)
+
+
+def test_live_stats_is_not_billed_as_inference():
+    from app.rate_limit import rate_limiter
+    assert rate_limiter.budget_for("/api/classify/live/stats", "GET") is None
+    assert rate_limiter.budget_for("/api/classify/live").name == "inference"
+    assert rate_limiter.budget_for("/api/photos", "POST").name == "inference"
+    assert rate_limiter.budget_for("/api/photos/abc", "GET").name == "catalog"
@@ -0,0 +1,79 @@
+"""
+Read-replica routing, read-your-writes and failover (run from backend/: python -m pytest tests)
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+from app.database import Base, ReplicaPool, RoutingSession
+from app.models import PlantData
+from app.repository.plant_data_repository import plant_data_repository as repo
+
+
+def make_engine(path, *names):
+    engine = create_engine(f"sqlite:///{path}")
+    if names:
+        Base.metadata.create_all(engine)
+        with sessionmaker(bind=engine)() as db:
+            db.add_all(PlantData(name=name) for name in names)
+            db.commit()
+    return engine
+
+
+@pytest.fixture
+def primary(tmp_path, monkeypatch):
+    engine = make_engine(tmp_path / "primary.db", "Primary Fern")
+    monkeypatch.setattr(database, "engine", engine)
+    return engine
+
+
+def use_replicas(monkeypatch, *replicas, retry_seconds=60):
+    pool = ReplicaPool(list(replicas), retry_seconds=retry_seconds)
+    monkeypatch.setattr(database, "replica_pool", pool)
+    return pool
+
+
+def session(primary):
+    return sessionmaker(class_=RoutingSession, autoflush=False, bind=primary)()
+
+
+def names(rows):
+    return sorted(row.name for row in rows)
+
+
+def test_reads_go_to_replica_and_writes_to_primary(tmp_path, primary, monkeypatch):
+    use_replicas(monkeypatch, make_engine(tmp_path / "replica.db", "Replica Fern"))
+    with session(primary) as db:
+        assert names(repo.find_all(db)) == ["Replica Fern"]
+        repo.save(db, PlantData(name="New Fern"))
+        # Pinned after the write: the session sees its own insert
+        assert names(repo.find_all(db)) == ["New Fern", "Primary Fern"]
+    with session(primary) as db:
+        assert names(repo.find_all(db)) == ["Replica Fern"]
+
+
+def test_core_write_pins_session_to_primary(tmp_path, primary, monkeypatch):
+    use_replicas(monkeypatch, make_engine(tmp_path / "replica.db", "Replica Fern"))
+    with session(primary) as db:
+        assert repo.update(db, 1, {"name": "Renamed Fern"}).name == "Renamed Fern"
+        assert names(repo.find_all(db)) == ["Renamed Fern"]
+
+
+def test_failing_replica_falls_back_to_primary(tmp_path, primary, monkeypatch):
+    broken = make_engine(tmp_path / "empty.db")  # no tables: every read raises
+    pool = use_replicas(monkeypatch, broken)
+    with session(primary) as db:
+        assert names(repo.find_all(db)) == ["Primary Fern"]
+    assert pool.status() == [{"host": str(tmp_path / "empty.db"), "healthy": False}]
+    assert pool.choose() is None
+    with session(primary) as db:
+        assert names(repo.find_all(db)) == ["Primary Fern"]
+
+
+def test_failed_replica_returns_after_probe(tmp_path, monkeypatch):
+    replica = make_engine(tmp_path / "replica.db", "Replica Fern")
+    pool = use_replicas(monkeypatch, replica, retry_seconds=0)
+    pool.mark_failed(replica)
+    assert pool.choose() is replica
+    assert pool.status()[0]["healthy"]
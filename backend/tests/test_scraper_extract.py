@@ -0,0 +1,43 @@
+"""
+Every fast extractor must agree with the BeautifulSoup reference (run from backend/: python -m pytest tests)
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "scraper"))
+extract = pytest.importorskip("extract")
+
+PAGES = {
+    "normal": '<div class="entry-content"><p>a <b>b</b></p><p>c</p></div>',
+    "blank": "  \n ",
+    "no content div": "<p>x</p>",
+    "comment only": "<!-- nothing here -->",
+    "xml declaration": '<?xml version="1.0" encoding="ISO-8859-1"?>'
+                       '<html><body><div class="entry-content"><p>café</p></div></body></html>',
+    "meta charset": '<html><head><meta charset="iso-8859-1"></head>'
+                    '<body><div class="entry-content"><p>café ☃</p></div></body></html>',
+    "truncated": '<div class="entry-content"><p>a</p><p>b',
+}
+
+
+@pytest.mark.parametrize("name", [n for n in extract.available_extractors() if n != "bs4"])
+@pytest.mark.parametrize("page", PAGES)
+def test_matches_bs4(name, page):
+    html = PAGES[page]
+    assert extract.get_extractor(name)(html) == extract.extract_bs4(html)
+
+
+def test_meta_charset_does_not_override_decoded_text():
+    html = PAGES["meta charset"]
+    assert extract.extract_streaming(html) == "café ☃"
+    assert extract.extract_streaming(html, chunk_size=7) == "café ☃"
+
+
+def test_bad_page_does_not_abort_batch(tmp_path):
+    (tmp_path / "good.html").write_text(PAGES["normal"], encoding="utf-8")
+    (tmp_path / "bad.html").write_bytes(b"\xff\xfe not utf-8")
+    records = list(extract.extract_cache(str(tmp_path), processes=1))
+    assert sorted(r["summary"] for r in records) == ["", "ab\n\nc"]
+    assert sum("error" in r for r in records) == 1
@@ -0,0 +1,65 @@
+"""
+Benchmarks the article extractors over saved sample pages.
+
+Usage:
+    python bench_extract.py output/http_cache
+    python bench_extract.py page1.html page2.html --repeat 5
+
+Reports pages/s and MB/s per extractor, plus whether its output matches the
+original BeautifulSoup parser on every page.
+"""
+import argparse
+import glob
+import os
+import time
+
+from extract import available_extractors, get_extractor
+
+
+def load_pages(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.html"))))
+        else:
+            files.append(path)
+    pages = []
+    for path in files:
+        with open(path, encoding="utf-8") as f:
+            pages.append(f.read())
+    return pages
+
+
+def bench(extractor, pages, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        outputs = [extractor(page) for page in pages]
+        best = min(best, time.perf_counter() - start)
+    return best, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare article extractor throughput")
+    parser.add_argument("paths", nargs="+", help="HTML files or directories of *.html")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_pages(args.paths)
+    if not pages:
+        print("❌ No pages found")
+        return
+    total_mb = sum(len(p.encode("utf-8")) for p in pages) / 1e6
+    print(f"📄 {len(pages)} pages, {total_mb:.2f} MB, best of {args.repeat}\n")
+
+    baseline_time, baseline = bench(get_extractor("bs4"), pages, args.repeat)
+    print(f"{'extractor':<12}{'pages/s':>10}{'MB/s':>9}{'speedup':>9}  matches bs4")
+    for name in available_extractors():
+        elapsed, outputs = (baseline_time, baseline) if name == "bs4" else bench(get_extractor(name), pages, args.repeat)
+        matches = sum(a == b for a, b in zip(outputs, baseline))
+        print(f"{name:<12}{len(pages) / elapsed:>10.1f}{total_mb / elapsed:>9.2f}"
+              f"{baseline_time / elapsed:>8.1f}x  {matches}/{len(pages)}")
+
+
+if __name__ == "__main__":
+    main()
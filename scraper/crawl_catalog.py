@@ -0,0 +1,299 @@
+"""
+Concurrent, rate-limited, resumable PlantCareToday crawler.
+
+Reads a list of plants (one per line, optionally "name<TAB>url"), fetches each
+article through a pooled async HTTP client with per-host rate limiting and
+retries, and appends the cleaned text as JSONL. Fetched pages are kept in an
+on-disk cache and finished plants in a checkpoint file, so an interrupted run
+picks up where it stopped.
+
+Usage:
+    python crawl_catalog.py plants.txt
+
+Offline, against the stub server in mock_plantcaretoday_server.py:
+    python mock_plantcaretoday_server.py --port 8001 --flaky 1
+    python crawl_catalog.py plants.txt --url-template "http://127.0.0.1:8001/{slug}.html"
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import httpx
+
+from extract import get_extractor
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRY_AFTER = 300  # seconds; longer server requests are clamped
+
+
+def slugify(plant_name):
+    return plant_name.strip().lower().replace(" ", "-")
+
+
+def read_plant_list(path):
+    """Reads plant names (and optional explicit URLs) from a text file."""
+    plants = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            name, _, url = line.partition("\t")
+            plants.append((name.strip(), url.strip() or None))
+    return plants
+
+
+def retry_after_seconds(response):
+    """Seconds asked for by a Retry-After header (delta or HTTP date), or None."""
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+def read_written_plants(path):
+    """
+    Plants that already have a record in the JSONL output.
+
+    A record is written before its checkpoint line, so after a crash between
+    the two the output is the source of truth. A torn last line (crash mid
+    write) is cut off so the next append starts on a fresh line.
+    """
+    if not os.path.exists(path):
+        return set()
+    with open(path, "rb") as f:
+        data = f.read()
+    complete = data.rfind(b"\n") + 1
+    if complete < len(data):
+        with open(path, "r+b") as f:
+            f.truncate(complete)
+    plants = set()
+    for line in data[:complete].splitlines():
+        try:
+            plants.add(json.loads(line)["plant"])
+        except (ValueError, KeyError, TypeError):
+            continue
+    return plants
+
+
+class HostRateLimiter:
+    """Spaces requests to each host at least 1/rate seconds apart."""
+
+    def __init__(self, rate_per_host):
+        self.interval = 1.0 / rate_per_host if rate_per_host > 0 else 0.0
+        self._next_slot = {}
+        self._locks = {}
+
+    async def wait(self, host):
+        if not self.interval:
+            return
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class HttpCache:
+    """On-disk cache of successful page fetches, keyed by URL hash."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + ".html", base + ".json"
+
+    def get(self, url):
+        body_path, _ = self._paths(url)
+        if not os.path.exists(body_path):
+            return None
+        with open(body_path, encoding="utf-8") as f:
+            return f.read()
+
+    def put(self, url, html):
+        body_path, meta_path = self._paths(url)
+        # Write body first and meta last so a crash never leaves meta without a body
+        tmp_path = body_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(html)
+        os.replace(tmp_path, body_path)
+        with open(meta_path, "w") as f:
+            json.dump({"url": url, "fetched_at": time.time()}, f)
+
+
+class Checkpoint:
+    """Append-only record of plants that have been fully processed."""
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        if os.path.exists(path):
+            with open(path) as f:
+                self.done = {line.rstrip("\n") for line in f if line.strip()}
+
+    def mark(self, plant_name):
+        self.done.add(plant_name)
+        with open(self.path, "a") as f:
+            f.write(plant_name + "\n")
+
+
+class CatalogCrawler:
+    def __init__(self, client, cache, checkpoint, output_path,
+                 rate_per_host=1.0, concurrency=8, retries=3, backoff=1.0,
+                 url_template=None, use_search=False, extractor="auto"):
+        self.client = client
+        self.cache = cache
+        self.checkpoint = checkpoint
+        self.output_path = output_path
+        self.limiter = HostRateLimiter(rate_per_host)
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.retries = retries
+        self.backoff = backoff
+        self.url_template = url_template
+        self.use_search = use_search
+        self.extract = get_extractor(extractor)
+        self.stats = {"fetched": 0, "cached": 0, "failed": 0, "skipped": 0}
+
+    async def resolve_url(self, plant_name, url):
+        if url:
+            return url
+        if self.url_template:
+            return self.url_template.format(slug=slugify(plant_name), name=plant_name)
+        if self.use_search:
+            # DuckDuckGo's client is synchronous; keep it off the event loop
+            from scrape_plantcaretoday import search_plantcaretoday
+            return await asyncio.to_thread(search_plantcaretoday, plant_name)
+        return None
+
+    async def fetch(self, url):
+        """Fetches a page through the cache, rate limiter and retry loop."""
+        cached = self.cache.get(url)
+        if cached is not None:
+            self.stats["cached"] += 1
+            return cached
+
+        host = urlsplit(url).netloc
+        for attempt in range(self.retries + 1):
+            await self.limiter.wait(host)
+            retry_after = None
+            try:
+                response = await self.client.get(url)
+            except httpx.TransportError as e:
+                error = str(e)
+            else:
+                if response.status_code == 200:
+                    self.cache.put(url, response.text)
+                    self.stats["fetched"] += 1
+                    return response.text
+                if response.status_code not in RETRY_STATUSES:
+                    print(f"❌ {url} returned {response.status_code}")
+                    return None
+                error = f"HTTP {response.status_code}"
+                retry_after = retry_after_seconds(response)
+            if attempt < self.retries:
+                delay = self.backoff * (2 ** attempt) * (1 + random.random() * 0.25)
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
+                print(f"🔁 {url}: {error}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+        print(f"❌ Giving up on {url}")
+        return None
+
+    def write_record(self, record):
+        with open(self.output_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    async def crawl_one(self, plant_name, url):
+        async with self.semaphore:
+            url = await self.resolve_url(plant_name, url)
+            if not url:
+                print("❌ No article found for:", plant_name)
+                self.stats["failed"] += 1
+                return
+            html = await self.fetch(url)
+
+        if html is None:
+            self.stats["failed"] += 1
+            return
+        self.write_record({
+            "plant": plant_name,
+            "source": "plantcaretoday.com",
+            "url": url,
+            "summary": self.extract(html),
+        })
+        self.checkpoint.mark(plant_name)
+        print(f"✅ {plant_name}")
+
+    async def crawl(self, plants):
+        done = self.checkpoint.done | read_written_plants(self.output_path)
+        pending = []
+        for plant_name, url in plants:
+            if plant_name in done:
+                self.stats["skipped"] += 1
+            else:
+                pending.append(self.crawl_one(plant_name, url))
+        await asyncio.gather(*pending)
+        return self.stats
+
+
+async def run(args):
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    plants = read_plant_list(args.plants_file)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    headers = {"User-Agent": "IkigotchiGarden-crawler/1.0"}
+    async with httpx.AsyncClient(limits=limits, headers=headers, timeout=args.timeout,
+                                 follow_redirects=True) as client:
+        crawler = CatalogCrawler(
+            client,
+            HttpCache(args.cache_dir),
+            Checkpoint(args.checkpoint),
+            args.output,
+            rate_per_host=args.rate,
+            concurrency=args.concurrency,
+            retries=args.retries,
+            url_template=args.url_template,
+            use_search=args.search,
+            extractor=args.extractor,
+        )
+        start = time.perf_counter()
+        stats = await crawler.crawl(plants)
+    print(f"🌿 Done in {time.perf_counter() - start:.1f}s: {stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl PlantCareToday care articles into JSONL")
+    parser.add_argument("plants_file", help="Text file with one plant per line (optionally 'name<TAB>url')")
+    parser.add_argument("--output", default="output/catalog.jsonl")
+    parser.add_argument("--checkpoint", default="output/crawl_checkpoint.txt")
+    parser.add_argument("--cache-dir", default="output/http_cache")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=1.0, help="Max requests per second per host")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=20.0)
+    parser.add_argument("--url-template", help="e.g. 'http://127.0.0.1:8001/{slug}.html' for a local stub server")
+    parser.add_argument("--search", action="store_true", help="Resolve article URLs via DuckDuckGo")
+    parser.add_argument("--extractor", default="auto", help="bs4, lxml, selectolax, stream or auto (see extract.py)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Pluggable article-text extractors for PlantCareToday pages.
+
+Every extractor returns the same thing the original BeautifulSoup version did:
+the stripped text of each <p> inside the first div.entry-content, joined with
+blank lines (or "" when there is no such div).
+
+    bs4         BeautifulSoup + html.parser (pure Python reference)
+    lxml        lxml.html, C parser + XPath
+    selectolax  selectolax (lexbor backend), CSS selectors
+    stream      lxml pull parser that stops feeding once the content div closes
+    auto        fastest installed of selectolax > lxml > bs4
+
+Batch mode extracts every page in the crawler's on-disk HTML cache using a
+process pool:
+
+    python extract.py --cache-dir output/http_cache --output output/extracted.jsonl
+"""
+import argparse
+import glob
+import json
+import os
+import time
+from multiprocessing import Pool
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:
+    etree = lxml_html = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    try:  # selectolax < 0.3.13 only ships the modest backend
+        from selectolax.parser import HTMLParser as SelectolaxParser
+    except ImportError:
+        SelectolaxParser = None
+
+# str input is already decoded: UTF-8 encode it and make the parser trust that over <meta charset>/<?xml?>
+_UTF8_HTML_PARSER = lxml_html.HTMLParser(encoding="utf-8") if lxml_html is not None else None
+
+CONTENT_DIV_XPATH = "//div[contains(concat(' ', normalize-space(@class), ' '), ' entry-content ')]"
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+def _join(paragraphs):
+    return "\n\n".join(paragraphs)
+
+
+def _has_content_class(class_attr):
+    return "entry-content" in (class_attr or "").split()
+
+
+def extract_bs4(html):
+    soup = BeautifulSoup(html, "html.parser")
+    content = soup.find("div", class_="entry-content")
+    if not content:
+        return ""
+    return _join(p.get_text(strip=True) for p in content.find_all("p"))
+
+
+def _lxml_paragraph_text(p):
+    # text() nodes only (skips comments), each stripped, like bs4's get_text(strip=True)
+    return "".join(t.strip() for t in p.xpath(".//text()"))
+
+
+def extract_lxml(html):
+    if not html.strip():
+        return ""
+    parser = None
+    if isinstance(html, str):
+        html, parser = html.encode("utf-8"), _UTF8_HTML_PARSER
+    try:
+        tree = lxml_html.fromstring(html, parser=parser)
+    except etree.ParserError:
+        return ""  # nothing but comments/whitespace
+    content = tree.xpath(CONTENT_DIV_XPATH)
+    if not content:
+        return ""
+    return _join(_lxml_paragraph_text(p) for p in content[0].iter("p"))
+
+
+def extract_selectolax(html):
+    content = SelectolaxParser(html).css_first("div.entry-content")
+    if content is None:
+        return ""
+    return _join(p.text(deep=True, separator="", strip=True) for p in content.css("p"))
+
+
+def extract_streaming(html, chunk_size=STREAM_CHUNK_SIZE):
+    """Feeds the page in chunks and stops as soon as the content div has closed."""
+    if isinstance(html, str):
+        data = html.encode("utf-8")
+        parser = etree.HTMLPullParser(events=("start", "end"), encoding="utf-8")
+    else:
+        data = html
+        parser = etree.HTMLPullParser(events=("start", "end"))
+    if not data.strip():
+        return ""
+    content = None
+    paragraphs = []
+
+    def consume():
+        """Handles parsed events; True once the content div has closed."""
+        nonlocal content
+        for event, element in parser.read_events():
+            if content is None:
+                if event == "start" and element.tag == "div" and _has_content_class(element.get("class")):
+                    content = element
+                continue
+            if event != "end":
+                continue
+            if element is content:
+                return True
+            if element.tag == "p":
+                paragraphs.append(_lxml_paragraph_text(element))
+        return False
+
+    for offset in range(0, len(data), chunk_size):
+        parser.feed(data[offset:offset + chunk_size])
+        if consume():
+            return _join(paragraphs)
+
+    # Content div never closed explicitly (truncated page); closing emits the implied end tags
+    try:
+        parser.close()
+    except etree.XMLSyntaxError:
+        return ""  # nothing parseable, e.g. only a comment
+    consume()
+    return _join(paragraphs) if content is not None else ""
+
+
+EXTRACTORS = {
+    "bs4": extract_bs4,
+    "lxml": extract_lxml if lxml_html is not None else None,
+    "selectolax": extract_selectolax if SelectolaxParser is not None else None,
+    "stream": extract_streaming if etree is not None else None,
+}
+
+
+def available_extractors():
+    return [name for name, fn in EXTRACTORS.items() if fn is not None]
+
+
+def get_extractor(name="auto"):
+    """Returns the extractor function for a name, or the fastest installed one for 'auto'."""
+    if name == "auto":
+        for candidate in ("selectolax", "lxml", "bs4"):
+            if EXTRACTORS[candidate] is not None:
+                return EXTRACTORS[candidate]
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown extractor '{name}'. Choose from: auto, {', '.join(EXTRACTORS)}")
+    if EXTRACTORS[name] is None:
+        raise ImportError(f"Extractor '{name}' is not installed")
+    return EXTRACTORS[name]
+
+
+def _extract_cached_page(job):
+    body_path, extractor_name = job
+    meta_path = body_path[:-len(".html")] + ".json"
+    url = None
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            url = json.load(f).get("url")
+    try:
+        with open(body_path, encoding="utf-8") as f:
+            html = f.read()
+        return {"url": url, "summary": get_extractor(extractor_name)(html)}
+    except Exception as e:
+        # One unreadable page must not abort the whole batch
+        return {"url": url, "summary": "", "error": f"{type(e).__name__}: {e}"}
+
+
+def extract_cache(cache_dir, extractor="auto", processes=None, chunksize=16):
+    """
+    Extracts every cached page using a process pool.
+
+    Yields {"url", "summary"} records in completion order; a page that cannot be
+    read or parsed yields an empty summary and an "error".
+    """
+    jobs = [(path, extractor) for path in sorted(glob.glob(os.path.join(cache_dir, "*.html")))]
+    if processes == 1:
+        yield from map(_extract_cached_page, jobs)
+        return
+    with Pool(processes) as pool:
+        yield from pool.imap_unordered(_extract_cached_page, jobs, chunksize=chunksize)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract article text from the crawler's HTML cache")
+    parser.add_argument("--cache-dir", default="output/http_cache")
+    parser.add_argument("--output", default="output/extracted.jsonl")
+    parser.add_argument("--extractor", default="auto", choices=["auto", *EXTRACTORS])
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = 0
+    with open(args.output, "w", encoding="utf-8") as out:
+        for record in extract_cache(args.cache_dir, args.extractor, args.processes):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    elapsed = time.perf_counter() - start
+    print(f"✅ Extracted {count} pages in {elapsed:.2f}s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Minimal local stand-in for PlantCareToday articles, for exercising crawl_catalog.py offline.
+
+Every /<slug>.html returns a small article with a div.entry-content. With
+--flaky N, the first N requests for each page get a 503 with Retry-After so
+the crawler's retry path runs too.
+
+Usage:
+    python mock_plantcaretoday_server.py --port 8001 --flaky 1
+    python crawl_catalog.py plants.txt --url-template "http://127.0.0.1:8001/{slug}.html"
+"""
+import argparse
+import re
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+ARTICLE_PATH = re.compile(r"^/([a-z0-9-]+)\.html$")
+
+
+def make_article(slug):
+    name = slug.replace("-", " ").title()
+    return (
+        f"<html><head><title>{name} Care</title></head><body>"
+        f"<nav><p>Menu</p></nav>"
+        f'<div class="entry-content">'
+        f"<p>{name} likes bright, indirect light.</p>"
+        f"<p>Water {name} when the top inch of soil is dry.</p>"
+        f"</div><footer><p>Footer</p></footer></body></html>"
+    )
+
+
+class MockPlantCareTodayHandler(BaseHTTPRequestHandler):
+    flaky = 0
+    retry_after = 1
+    requests_seen = {}
+    _lock = threading.Lock()
+
+    def _send(self, status, body, headers=()):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        match = ARTICLE_PATH.match(self.path)
+        if not match:
+            return self._send(404, "<html><body>Not found</body></html>")
+        slug = match.group(1)
+        with self._lock:
+            seen = self.requests_seen.get(slug, 0)
+            self.requests_seen[slug] = seen + 1
+        if seen < self.flaky:
+            return self._send(503, "<html><body>Busy</body></html>", [("Retry-After", str(self.retry_after))])
+        return self._send(200, make_article(slug))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a mock PlantCareToday article server")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--flaky", type=int, default=0, help="503 the first N requests for each page")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with each 503")
+    args = parser.parse_args()
+    MockPlantCareTodayHandler.flaky = args.flaky
+    MockPlantCareTodayHandler.retry_after = args.retry_after
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), MockPlantCareTodayHandler)
+    print(f"🌿 Mock PlantCareToday on http://127.0.0.1:{args.port}/<slug>.html")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Minimal local stand-in for the Trefle API, for exercising TrefleClient offline.
+
+Usage:
+    python mock_trefle_server.py --port 8766 --plants 45
+    TREFLE_BASE_URL=http://127.0.0.1:8766/api/v1 python trefle_request.py
+"""
+import argparse
+import json
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+PAGE_SIZE = 20
+
+
+def make_plants(count):
+    return [
+        {"id": i, "slug": f"plant-{i}", "common_name": f"snake plant {i}",
+         "scientific_name": f"Sansevieria mock{i}"}
+        for i in range(1, count + 1)
+    ]
+
+
+class MockTrefleHandler(BaseHTTPRequestHandler):
+    plants = make_plants(45)
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if "token" not in query:
+            return self._send(401, {"error": True, "message": "Unauthorized"})
+
+        parts = url.path.rstrip("/").split("/")[3:]  # strip "", "api", "v1"
+        if parts == ["plants", "search"]:
+            q = query.get("q", [""])[0].lower()
+            page = int(query.get("page", ["1"])[0])
+            matches = [p for p in self.plants if q in p["common_name"]]
+            start = (page - 1) * PAGE_SIZE
+            links = {"self": f"/api/v1/plants/search?page={page}&q={q}"}
+            if start + PAGE_SIZE < len(matches):
+                links["next"] = f"/api/v1/plants/search?page={page + 1}&q={q}"
+            return self._send(200, {"data": matches[start:start + PAGE_SIZE], "links": links,
+                                    "meta": {"total": len(matches)}})
+        if len(parts) == 2 and parts[0] == "plants":
+            plant = next((p for p in self.plants if str(p["id"]) == parts[1]), None)
+        elif len(parts) == 2 and parts[0] == "species":
+            plant = next((p for p in self.plants if p["slug"] == parts[1]), None)
+        else:
+            plant = None
+        if plant is None:
+            return self._send(404, {"error": True, "message": "Not found"})
+        return self._send(200, {"data": {**plant, "duration": ["perennial"], "edible": False,
+                                         "main_species": {"growth": {"light": 3}}}})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a mock Trefle API server")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--plants", type=int, default=45)
+    args = parser.parse_args()
+    MockTrefleHandler.plants = make_plants(args.plants)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), MockTrefleHandler)
+    print(f"🌿 Mock Trefle API on http://127.0.0.1:{args.port}/api/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
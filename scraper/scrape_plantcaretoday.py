@@ -1,6 +1,6 @@
 import requests
-from bs4 import BeautifulSoup
 from duckduckgo_search import DDGS
+from extract import get_extractor
 import json
 import os
 import re
@@ -14,15 +14,9 @@ def search_plantcaretoday(plant_name):
             return results[0]["href"]
     return None
 
-def clean_text(html):
+def clean_text(html, extractor="auto"):
     """Cleans and extracts paragraph text from the article."""
-    soup = BeautifulSoup(html, "html.parser")
-    content = soup.find("div", class_="entry-content")
-    if not content:
-        return ""
-
-    paragraphs = content.find_all("p")
-    return "\n\n".join(p.get_text(strip=True) for p in paragraphs)
+    return get_extractor(extractor)(html)
 
 def save_plant_data(plant_name, text):
     """Saves the cleaned article to a local JSON file."""
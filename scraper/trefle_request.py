@@ -1,55 +1,181 @@
+import json
 import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 load_dotenv()
 TREFLE_TOKEN = os.getenv("TREFLE_TOKEN")
 
-BASE_URL = "https://trefle.io/api/v1"
+BASE_URL = os.getenv("TREFLE_BASE_URL", "https://trefle.io/api/v1")
+CACHE_PATH = os.getenv("TREFLE_CACHE_PATH", "output/trefle_cache.sqlite")
+CACHE_TTL = float(os.getenv("TREFLE_CACHE_TTL", str(7 * 24 * 3600)))
 
-def search_plant(query):
-    url = f"{BASE_URL}/plants/search"
-    params = {
-        'token': TREFLE_TOKEN,
-        'q': query
-    }
 
-    response = requests.get(url, params=params)
-    response.raise_for_status()
-    data = response.json()
-    return data['data']  # List of plants
+class TrefleCache:
+    """SQLite-backed cache of Trefle JSON responses with a TTL."""
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL):
+        self.ttl = ttl
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, body TEXT NOT NULL, fetched_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(path, params):
+        # The token is a credential, not part of the resource identity
+        items = sorted((k, str(v)) for k, v in (params or {}).items() if k != "token")
+        return path + "?" + "&".join(f"{k}={v}" for k, v in items)
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT body, fetched_at FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return json.loads(row[0])
+
+    def put(self, key, data):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, body, fetched_at) VALUES (?, ?, ?)",
+                (key, json.dumps(data), time.time()),
+            )
+            self._conn.commit()
+
+    def purge_expired(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE fetched_at < ?", (time.time() - self.ttl,))
+            self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+class TrefleClient:
+    """Trefle API client with a pooled, retrying session and an optional response cache."""
+
+    def __init__(self, token=TREFLE_TOKEN, base_url=BASE_URL, cache=None,
+                 pool_size=10, retries=3, timeout=20):
+        self.token = token
+        self.base_url = base_url.rstrip("/")
+        self.cache = cache
+        self.timeout = timeout
+        self.pool_size = pool_size
+
+        self.session = requests.Session()
+        retry = Retry(total=retries, backoff_factor=0.5,
+                      status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET",))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _get(self, path, params=None):
+        params = dict(params or {})
+        key = TrefleCache.make_key(path, params) if self.cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        params["token"] = self.token
+        response = self.session.get(f"{self.base_url}{path}", params=params, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        if key:
+            self.cache.put(key, data)
+        return data
+
+    def search_plant(self, query, page=1):
+        """Returns a single page of search results."""
+        return self._get("/plants/search", {"q": query, "page": page})["data"]
+
+    def iter_search(self, query, max_pages=None):
+        """Lazily yields every plant matching a query, fetching pages only as they are consumed."""
+        page = 1
+        while max_pages is None or page <= max_pages:
+            body = self._get("/plants/search", {"q": query, "page": page})
+            yield from body.get("data", [])
+            if not body.get("links", {}).get("next"):
+                return
+            page += 1
+
+    def get_plant_details(self, plant_id):
+        return self._get(f"/plants/{plant_id}")["data"]
+
+    def get_species_details(self, slug):
+        return self._get(f"/species/{slug}")["data"]
+
+    def _fetch_many(self, fetch, keys, max_workers):
+        with ThreadPoolExecutor(max_workers=max_workers or self.pool_size) as executor:
+            return list(executor.map(fetch, keys))
+
+    def get_many_plant_details(self, plant_ids, max_workers=None):
+        """Fetches plant details concurrently over the shared connection pool, preserving order."""
+        return self._fetch_many(self.get_plant_details, plant_ids, max_workers)
+
+    def get_many_species_details(self, slugs, max_workers=None):
+        """Fetches species details concurrently over the shared connection pool, preserving order."""
+        return self._fetch_many(self.get_species_details, slugs, max_workers)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_default_client = None
+
+
+def _client():
+    global _default_client
+    if _default_client is None:
+        _default_client = TrefleClient()
+    return _default_client
+
+
+def search_plant(query):
+    return _client().search_plant(query)
 
 
 def get_plant_details(plant_id):
-    url = f"{BASE_URL}/plants/{plant_id}"
-    params = {'token': TREFLE_TOKEN}
-    response = requests.get(url, params=params)
-    response.raise_for_status()
-    return response.json()['data']
+    return _client().get_plant_details(plant_id)
 
 
 def get_species_details(slug):
-    url = f"{BASE_URL}/species/{slug}"
-    params = {'token': TREFLE_TOKEN}
-    response = requests.get(url, params=params)
-    response.raise_for_status()
-    return response.json()['data']
+    return _client().get_species_details(slug)
 
 
 # Example usage:
-results = search_plant("snake plant")
-if results:
-    plant = results[0]
-    print(f"\n🌿 Found: {plant['common_name']} ({plant['scientific_name']})")
-    
-    plant_details = get_plant_details(plant['id'])
-    print("\n📘 Plant Details:")
-    print(f"  Duration: {plant_details.get('duration')}")
-    print(f"  Edible: {plant_details.get('edible')}")
-    print(f"  Light: {plant_details.get('main_species', {}).get('growth', {}).get('light')}")
-
-    species_info = get_species_details(plant['slug'])
-    print("\n📗 Species Info:")
-    print(f"  Growth Form: {species_info.get('main_species', {}).get('specifications', {}).get('growth_form')}")
-    print(f"  Growth Rate: {species_info.get('main_species', {}).get('growth', {}).get('growth_rate')}")
+if __name__ == "__main__":
+    with TrefleClient(cache=TrefleCache()) as client:
+        results = client.search_plant("snake plant")
+        if results:
+            plant = results[0]
+            print(f"\n🌿 Found: {plant['common_name']} ({plant['scientific_name']})")
+
+            plant_details, = client.get_many_plant_details([plant['id']])
+            print("\n📘 Plant Details:")
+            print(f"  Duration: {plant_details.get('duration')}")
+            print(f"  Edible: {plant_details.get('edible')}")
+            print(f"  Light: {plant_details.get('main_species', {}).get('growth', {}).get('light')}")
 
+            species_info = client.get_species_details(plant['slug'])
+            print("\n📗 Species Info:")
+            print(f"  Growth Form: {species_info.get('main_species', {}).get('specifications', {}).get('growth_form')}")
+            print(f"  Growth Rate: {species_info.get('main_species', {}).get('growth', {}).get('growth_rate')}")
@@ -4,6 +4,7 @@ import { getWateringInterval } from '../utils/getWateringInterval';
 import { saveCustomPlants, loadCustomPlants } from '../utils/storage';
 import { scale, verticalScale, moderateScale } from '../utils/layout';
 import { scheduleNotificationForPlant } from '../utils/notificationScheduler';
+import { reportPlant } from '../utils/gardenStatsService';
 
 export default function AddPlantScreen({ navigation, plants, setPlants, customPlants, setCustomPlants }) {
   const [name, setName] = useState('');
@@ -64,6 +65,7 @@ export default function AddPlantScreen({ navigation, plants, setPlants, customPl
     newPlant.notifId = notifId;
 
     setPlants([...plants, newPlant]);
+    reportPlant(newPlant);
 
     setTimeout(() => {
       navigation.goBack();
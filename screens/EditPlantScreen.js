@@ -12,6 +12,7 @@ import { loadPlants, savePlants } from '../utils/storage';
 import { detectPlantGenus } from '../utils/visionService';
 import { scale, verticalScale, moderateScale } from '../utils/layout';
 import { scheduleNotificationForPlant } from '../utils/notificationScheduler';
+import { reportPlant, reportPlantRemoved, reportWatering } from '../utils/gardenStatsService';
 
 export default function EditPlantScreen({ route, navigation }) {
   const bounceAnim = useRef(new Animated.Value(1)).current;
@@ -72,6 +73,7 @@ export default function EditPlantScreen({ route, navigation }) {
     const updatedPlant = updated.find(p => p.id === plant.id);
     if (updatedPlant) {
       await scheduleNotificationForPlant(updatedPlant);
+      reportPlant(updatedPlant);
     }
 
     navigation.goBack();
@@ -90,6 +92,7 @@ export default function EditPlantScreen({ route, navigation }) {
             const plants = await loadPlants();
             const updated = plants.filter(p => p.id !== plant.id);
             await savePlants(updated);
+            reportPlantRemoved(plant.id);
             navigation.goBack();
           }
         }
@@ -112,6 +115,7 @@ export default function EditPlantScreen({ route, navigation }) {
     });
 
     await savePlants(updated);
+    reportWatering(plant, now.toISOString());
 
     // 2. Schedule new notification using utility
     const updatedPlant = updated.find(p => p.id === plant.id);
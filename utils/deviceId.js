@@ -0,0 +1,27 @@
+/**
+ * Anonymous per-install device id
+ * Sent as X-Device-Id so the backend can apply per-device rate limits and garden stats.
+ */
+import AsyncStorage from '@react-native-async-storage/async-storage';
+
+const DEVICE_ID_KEY = 'DEVICE_ID';
+
+let deviceIdPromise = null;
+
+/**
+ * Stable anonymous id for this install
+ * @returns {Promise<string>}
+ */
+export function getDeviceId() {
+  if (!deviceIdPromise) {
+    deviceIdPromise = (async () => {
+      let id = await AsyncStorage.getItem(DEVICE_ID_KEY);
+      if (!id) {
+        id = `device-${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 10)}`;
+        await AsyncStorage.setItem(DEVICE_ID_KEY, id);
+      }
+      return id;
+    })();
+  }
+  return deviceIdPromise;
+}
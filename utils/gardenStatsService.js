@@ -0,0 +1,59 @@
+/**
+ * Garden Stats Service
+ * Reports plant and watering events to the backend's incremental garden statistics.
+ * Reporting is fire-and-forget: failures are logged and never block the UI.
+ */
+import { getDeviceId } from './deviceId';
+
+const API_BASE_URL = 'http://localhost:8000';
+
+async function send(method, path, body) {
+  try {
+    const deviceId = await getDeviceId();
+    const response = await fetch(`${API_BASE_URL}/api/garden/users/${encodeURIComponent(deviceId)}${path}`, {
+      method,
+      headers: { 'Content-Type': 'application/json', 'X-Device-Id': deviceId },
+      body: body ? JSON.stringify(body) : undefined,
+    });
+    if (!response.ok && response.status !== 404) {
+      console.log('[GardenStats] Event rejected:', response.status);
+    }
+    return response.status;
+  } catch (e) {
+    console.log('[GardenStats] Failed to report event:', e.message);
+    return null;
+  }
+}
+
+/**
+ * Add or update a plant in the stats (after create or edit)
+ * @param {object} plant - Stored plant object
+ */
+export function reportPlant(plant) {
+  return send('PUT', `/plants/${encodeURIComponent(plant.id)}`, {
+    genus: plant.genus || null,
+    location: plant.location || null,
+    watering_interval_days: plant.wateringInterval || null,
+    last_watered: plant.lastWatered || null,
+  });
+}
+
+/**
+ * Record a watering; plants added before stats reporting existed are registered instead
+ * @param {object} plant - Stored plant object (before the watering)
+ * @param {string} wateredAt - ISO timestamp
+ */
+export async function reportWatering(plant, wateredAt) {
+  const status = await send('POST', `/plants/${encodeURIComponent(plant.id)}/waterings`, { watered_at: wateredAt });
+  if (status === 404) {
+    await reportPlant({ ...plant, lastWatered: wateredAt });
+  }
+}
+
+/**
+ * Remove a deleted plant from the stats
+ * @param {string} plantId
+ */
+export function reportPlantRemoved(plantId) {
+  return send('DELETE', `/plants/${encodeURIComponent(plantId)}`);
+}
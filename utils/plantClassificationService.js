@@ -3,6 +3,7 @@
  * Communicates with the AI backend for plant species identification
  */
 import axios from 'axios';
+import { getDeviceId } from './deviceId';
 
 const API_BASE_URL = 'http://localhost:8000';
 
@@ -31,6 +32,7 @@ export async function classifyPlantWithAI(imageUri) {
         headers: {
           'Content-Type': 'multipart/form-data',
           'Accept': 'application/json',
+          'X-Device-Id': await getDeviceId(),
         },
       }
     );
@@ -40,10 +42,48 @@ export async function classifyPlantWithAI(imageUri) {
     return apiResponse.data;
   } catch (error) {
     console.error('[PlantClassification] Error calling AI backend:', error.response?.data || error.message);
+    if (error.response?.status === 429) {
+      const retryAfter = error.response.headers?.['retry-after'];
+      throw new Error(`Too many identifications, please try again${retryAfter ? ` in ${retryAfter}s` : ' shortly'}.`);
+    }
     throw new Error('Failed to classify plant with AI model. Please try again.');
   }
 }
 
+/**
+ * Open a live classification stream for camera preview frames
+ * Send small JPEG frames as fast as the camera produces them; the backend
+ * only classifies the newest one and pushes an update when the result changes.
+ * @param {Object} handlers - { onPrediction, onStats, onError, deviceId } (deviceId from getDeviceId())
+ * @param {number} topK - Number of predictions per update
+ * @returns {{ sendFrame: Function, close: Function }}
+ */
+export function openLiveClassification({ onPrediction, onStats, onError, deviceId } = {}, topK = 3) {
+  const device = deviceId ? `&device_id=${encodeURIComponent(deviceId)}` : '';
+  const socket = new WebSocket(`${API_BASE_URL.replace(/^http/, 'ws')}/api/classify/live?top_k=${topK}${device}`);
+  socket.binaryType = 'arraybuffer';
+
+  socket.onmessage = (event) => {
+    const message = JSON.parse(event.data);
+    if (message.type === 'prediction') onPrediction?.(message);
+    else if (message.type === 'stats') onStats?.(message);
+    else if (message.type === 'error') onError?.(new Error(message.detail));
+    else if (message.type === 'throttled') onError?.(new Error(`Too many frames, slowing down for ${message.retry_after}s`));
+  };
+  socket.onerror = () => onError?.(new Error('Live classification connection failed'));
+  socket.onclose = (event) => {
+    if (event.code === 1008) onError?.(new Error('Too many requests, please try again shortly'));
+  };
+
+  return {
+    // frame: ArrayBuffer of an encoded (JPEG/PNG) downscaled camera frame
+    sendFrame: (frame) => {
+      if (socket.readyState === WebSocket.OPEN) socket.send(frame);
+    },
+    close: () => socket.close(),
+  };
+}
+
 /**
  * Extract genus from a plant name string
  * @param {string} plantName - Plant name (common or scientific)